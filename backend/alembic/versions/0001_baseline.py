@@ -0,0 +1,146 @@
+"""baseline: esquema inicial creado hasta ahora por Base.metadata.create_all
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Las bases de datos creadas con create_all ya tienen estas tablas
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(length=150), nullable=False),
+            sa.Column("surname", sa.String(length=150), nullable=True),
+            sa.Column("center", sa.String(length=255), nullable=True),
+            sa.Column("phone", sa.String(length=20), nullable=True),
+            sa.Column("email", sa.String(length=255), nullable=False),
+            sa.Column("hashed_password", sa.String(length=255), nullable=False),
+            sa.Column("role", sa.String(length=50), nullable=False),
+            sa.Column("avatar", sa.String(length=100000), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+        op.create_index("ix_users_id", "users", ["id"])
+
+    if "tca_phrases" not in existing:
+        op.create_table(
+            "tca_phrases",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("tca_type", sa.String(length=100), nullable=False),
+            sa.Column("phrase", sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_tca_phrases_id", "tca_phrases", ["id"])
+        op.create_index("ix_tca_phrases_tca_type", "tca_phrases", ["tca_type"])
+
+    if "therapist_patients" not in existing:
+        op.create_table(
+            "therapist_patients",
+            sa.Column("therapist_id", sa.Integer(), nullable=False),
+            sa.Column("patient_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["patient_id"], ["users.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["therapist_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("therapist_id", "patient_id"),
+        )
+
+    if "patient_profiles" not in existing:
+        op.create_table(
+            "patient_profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("birthdate", sa.Date(), nullable=True),
+            sa.Column("gender", sa.String(length=50), nullable=True),
+            sa.Column("treatment", sa.String(length=100), nullable=True),
+            sa.Column("notes", sa.Text(), nullable=True),
+            sa.Column("last_activity_type", sa.String(length=50), nullable=True),
+            sa.Column("last_tca_type", sa.String(length=100), nullable=True),
+            sa.Column("last_voice_uri", sa.Text(), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+        op.create_index("ix_patient_profiles_id", "patient_profiles", ["id"])
+
+    if "psychologist_profiles" not in existing:
+        op.create_table(
+            "psychologist_profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("specialty", sa.String(length=150), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+        op.create_index("ix_psychologist_profiles_id", "psychologist_profiles", ["id"])
+
+    if "patient_drawings" not in existing:
+        op.create_table(
+            "patient_drawings",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=100), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("image_data", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("patient_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["patient_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_patient_drawings_id", "patient_drawings", ["id"])
+
+    if "patient_avatars" not in existing:
+        op.create_table(
+            "patient_avatars",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("hair_style", sa.String(length=50), nullable=True),
+            sa.Column("hair_color", sa.String(length=50), nullable=True),
+            sa.Column("eye_color", sa.String(length=50), nullable=True),
+            sa.Column("eyebrow_style", sa.String(length=50), nullable=True),
+            sa.Column("skin_tone", sa.String(length=50), nullable=True),
+            sa.Column("face_shape", sa.String(length=50), nullable=True),
+            sa.Column("patient_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["patient_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_patient_avatars_id", "patient_avatars", ["id"])
+
+    if "conversation_logs" not in existing:
+        op.create_table(
+            "conversation_logs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("transcript", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column("patient_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["patient_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_conversation_logs_id", "conversation_logs", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("conversation_logs")
+    op.drop_table("patient_avatars")
+    op.drop_table("patient_drawings")
+    op.drop_table("psychologist_profiles")
+    op.drop_table("patient_profiles")
+    op.drop_table("therapist_patients")
+    op.drop_table("tca_phrases")
+    op.drop_table("users")
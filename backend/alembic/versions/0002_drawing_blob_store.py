@@ -0,0 +1,93 @@
+"""drawing blob store: mueve image_data (base64) al almacén direccionado por contenido
+
+Revision ID: 0002_drawing_blob_store
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+"""
+import base64
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.blob_store import blob_store, decode_image_data
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_drawing_blob_store"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("patient_drawings")}
+
+    with op.batch_alter_table("patient_drawings") as batch_op:
+        if "image_hash" not in columns:
+            batch_op.add_column(sa.Column("image_hash", sa.String(length=64), nullable=True))
+            batch_op.create_index("ix_patient_drawings_image_hash", ["image_hash"])
+        if "image_size" not in columns:
+            batch_op.add_column(sa.Column("image_size", sa.Integer(), nullable=True))
+        if "image_mime" not in columns:
+            batch_op.add_column(sa.Column("image_mime", sa.String(length=100), nullable=True))
+        batch_op.alter_column("image_data", existing_type=sa.Text(), nullable=True)
+
+    # Copia cada imagen al blob store y vacía la columna; fila a fila para no cargarlo todo en memoria
+    drawings = sa.table(
+        "patient_drawings",
+        sa.column("id", sa.Integer),
+        sa.column("image_data", sa.Text),
+        sa.column("image_hash", sa.String),
+        sa.column("image_size", sa.Integer),
+        sa.column("image_mime", sa.String),
+    )
+    pending_ids = bind.execute(
+        sa.select(drawings.c.id).where(drawings.c.image_hash.is_(None), drawings.c.image_data.is_not(None))
+    ).scalars().all()
+    for drawing_id in pending_ids:
+        image_data = bind.execute(
+            sa.select(drawings.c.image_data).where(drawings.c.id == drawing_id)
+        ).scalar_one()
+        try:
+            data, mime_type = decode_image_data(image_data)
+        except ValueError:
+            # Dejamos la fila como está; el endpoint devolverá 404 para esa imagen
+            continue
+        bind.execute(
+            drawings.update()
+            .where(drawings.c.id == drawing_id)
+            .values(image_hash=blob_store.put(data), image_size=len(data), image_mime=mime_type, image_data=None)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    drawings = sa.table(
+        "patient_drawings",
+        sa.column("id", sa.Integer),
+        sa.column("image_data", sa.Text),
+        sa.column("image_hash", sa.String),
+        sa.column("image_mime", sa.String),
+    )
+    rows = bind.execute(
+        sa.select(drawings.c.id, drawings.c.image_hash, drawings.c.image_mime).where(drawings.c.image_data.is_(None))
+    ).all()
+    for drawing_id, image_hash, image_mime in rows:
+        encoded = base64.b64encode(blob_store.read(image_hash)).decode("ascii")
+        bind.execute(
+            drawings.update()
+            .where(drawings.c.id == drawing_id)
+            .values(image_data=f"data:{image_mime};base64,{encoded}")
+        )
+
+    with op.batch_alter_table("patient_drawings") as batch_op:
+        batch_op.drop_index("ix_patient_drawings_image_hash")
+        batch_op.drop_column("image_mime")
+        batch_op.drop_column("image_size")
+        batch_op.drop_column("image_hash")
+        batch_op.alter_column("image_data", existing_type=sa.Text(), nullable=False)
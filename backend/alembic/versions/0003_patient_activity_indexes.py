@@ -0,0 +1,38 @@
+"""patient activity indexes: índices por paciente para contar y ordenar su historial
+
+Revision ID: 0003_patient_activity_indexes
+Revises: 0002_drawing_blob_store
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_patient_activity_indexes"
+down_revision: Union[str, Sequence[str], None] = "0002_drawing_blob_store"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_patient_drawings_patient_created", "patient_drawings", ["patient_id", "created_at"]),
+    ("ix_conversation_logs_patient_created", "conversation_logs", ["patient_id", "created_at"]),
+    ("ix_patient_avatars_patient_id", "patient_avatars", ["patient_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,45 @@
+"""avatar created_at: fecha de creación en patient_avatars para paginar por (created_at, id)
+
+Revision ID: 0004_avatar_created_at
+Revises: 0003_patient_activity_indexes
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_avatar_created_at"
+down_revision: Union[str, Sequence[str], None] = "0003_patient_activity_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    columns = {c["name"] for c in inspector.get_columns("patient_avatars")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("patient_avatars")}
+
+    # recreate="always": SQLite no admite ADD COLUMN con un default no constante;
+    # al copiar la tabla las filas existentes reciben CURRENT_TIMESTAMP
+    with op.batch_alter_table("patient_avatars", recreate="always") as batch_op:
+        if "created_at" not in columns:
+            batch_op.add_column(sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True))
+        if "ix_patient_avatars_patient_id" in indexes:
+            batch_op.drop_index("ix_patient_avatars_patient_id")
+        if "ix_patient_avatars_patient_created" not in indexes:
+            batch_op.create_index("ix_patient_avatars_patient_created", ["patient_id", "created_at"])
+
+    op.execute("UPDATE patient_avatars SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("patient_avatars") as batch_op:
+        batch_op.drop_index("ix_patient_avatars_patient_created")
+        batch_op.drop_column("created_at")
+        batch_op.create_index("ix_patient_avatars_patient_id", ["patient_id"])
@@ -0,0 +1,74 @@
+"""user search index: FTS5 (SQLite) o trigramas (PostgreSQL) para buscar pacientes
+
+Revision ID: 0005_user_search_index
+Revises: 0004_avatar_created_at
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_user_search_index"
+down_revision: Union[str, Sequence[str], None] = "0004_avatar_created_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de app/models/user_search.py en el momento de esta migración
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS users_search USING fts5(
+        name, surname, email, center,
+        content='users', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_search(rowid, name, surname, email, center)
+        VALUES (new.id, new.name, new.surname, new.email, new.center);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, name, surname, email, center)
+        VALUES ('delete', old.id, old.name, old.surname, old.email, old.center);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF name, surname, email, center ON users BEGIN
+        INSERT INTO users_search(users_search, rowid, name, surname, email, center)
+        VALUES ('delete', old.id, old.name, old.surname, old.email, old.center);
+        INSERT INTO users_search(rowid, name, surname, email, center)
+        VALUES (new.id, new.name, new.surname, new.email, new.center);
+    END""",
+    # Indexa los usuarios que ya existían
+    "INSERT INTO users_search(users_search) VALUES ('rebuild')",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS users_search_au",
+    "DROP TRIGGER IF EXISTS users_search_ad",
+    "DROP TRIGGER IF EXISTS users_search_ai",
+    "DROP TABLE IF EXISTS users_search",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users USING gin "
+    "((lower(coalesce(name, '') || ' ' || coalesce(surname, '') || ' ' || email || ' ' || coalesce(center, ''))) gin_trgm_ops)",
+]
+
+POSTGRES_DOWNGRADE = ["DROP INDEX IF EXISTS ix_users_search_trgm"]
+
+
+def _statements(sqlite: list, postgresql: list) -> list:
+    return {"sqlite": sqlite, "postgresql": postgresql}.get(op.get_bind().dialect.name, [])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in _statements(SQLITE_UPGRADE, POSTGRES_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in _statements(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE):
+        op.execute(statement)
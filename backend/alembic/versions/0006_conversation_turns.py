@@ -0,0 +1,56 @@
+"""conversation turns: sesiones de conversación guardadas turno a turno
+
+Revision ID: 0006_conversation_turns
+Revises: 0005_user_search_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_conversation_turns"
+down_revision: Union[str, Sequence[str], None] = "0005_user_search_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    # Las sesiones por turnos no guardan el transcript completo
+    with op.batch_alter_table("conversation_logs") as batch_op:
+        batch_op.alter_column("transcript", existing_type=sa.Text(), nullable=True)
+
+    if "conversation_turns" not in inspector.get_table_names():
+        op.create_table(
+            "conversation_turns",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("conversation_id", sa.Integer(), sa.ForeignKey("conversation_logs.id"), nullable=False),
+            sa.Column("seq", sa.Integer(), nullable=False),
+            sa.Column("speaker", sa.String(length=20), nullable=False),
+            sa.Column("text", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.UniqueConstraint("conversation_id", "seq", name="uq_conversation_turns_conversation_seq"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Antes de volver a NOT NULL, guardamos el texto de las sesiones por turnos
+    label = "CASE t.speaker WHEN 'ai' THEN 'AI' ELSE 'Patient' END || ': ' || t.text"
+    if op.get_bind().dialect.name == "postgresql":
+        joined = f"SELECT string_agg({label}, chr(10) ORDER BY t.seq) FROM conversation_turns t WHERE t.conversation_id = conversation_logs.id"
+    else:
+        joined = (
+            f"SELECT group_concat(line, char(10)) FROM (SELECT {label} AS line FROM conversation_turns t "
+            "WHERE t.conversation_id = conversation_logs.id ORDER BY t.seq)"
+        )
+    op.execute(f"UPDATE conversation_logs SET transcript = COALESCE(({joined}), '') WHERE transcript IS NULL")
+    op.drop_table("conversation_turns")
+    with op.batch_alter_table("conversation_logs") as batch_op:
+        batch_op.alter_column("transcript", existing_type=sa.Text(), nullable=False)
@@ -0,0 +1,77 @@
+"""conversation search index: FTS5 (SQLite) o tsvector (PostgreSQL) sobre transcripts y turnos
+
+Revision ID: 0007_conversation_search_index
+Revises: 0006_conversation_turns
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_conversation_search_index"
+down_revision: Union[str, Sequence[str], None] = "0006_conversation_turns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copia de app/models/conversation_search.py en el momento de esta migración
+SQLITE_UPGRADE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS conversation_search USING fts5(
+        body, conversation_id UNINDEXED, patient_id UNINDEXED,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS conversation_search_log_ai AFTER INSERT ON conversation_logs
+    WHEN new.transcript IS NOT NULL BEGIN
+        INSERT INTO conversation_search(body, conversation_id, patient_id)
+        VALUES (new.transcript, new.id, new.patient_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS conversation_search_log_ad AFTER DELETE ON conversation_logs BEGIN
+        DELETE FROM conversation_search WHERE conversation_id = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS conversation_search_turn_ai AFTER INSERT ON conversation_turns BEGIN
+        INSERT INTO conversation_search(body, conversation_id, patient_id)
+        SELECT new.text, l.id, l.patient_id FROM conversation_logs l WHERE l.id = new.conversation_id;
+    END""",
+    # Reindexa todo lo existente (la tabla pudo crearla create_all sin las filas antiguas)
+    "DELETE FROM conversation_search",
+    """INSERT INTO conversation_search(body, conversation_id, patient_id)
+    SELECT transcript, id, patient_id FROM conversation_logs WHERE transcript IS NOT NULL""",
+    """INSERT INTO conversation_search(body, conversation_id, patient_id)
+    SELECT t.text, l.id, l.patient_id FROM conversation_turns t JOIN conversation_logs l ON l.id = t.conversation_id""",
+]
+
+SQLITE_DOWNGRADE = [
+    "DROP TRIGGER IF EXISTS conversation_search_turn_ai",
+    "DROP TRIGGER IF EXISTS conversation_search_log_ad",
+    "DROP TRIGGER IF EXISTS conversation_search_log_ai",
+    "DROP TABLE IF EXISTS conversation_search",
+]
+
+POSTGRES_UPGRADE = [
+    "CREATE INDEX IF NOT EXISTS ix_conversation_logs_transcript_fts ON conversation_logs "
+    "USING gin (to_tsvector('simple', coalesce(transcript, '')))",
+    "CREATE INDEX IF NOT EXISTS ix_conversation_turns_text_fts ON conversation_turns USING gin (to_tsvector('simple', text))",
+]
+
+POSTGRES_DOWNGRADE = [
+    "DROP INDEX IF EXISTS ix_conversation_turns_text_fts",
+    "DROP INDEX IF EXISTS ix_conversation_logs_transcript_fts",
+]
+
+
+def _statements(sqlite: list, postgresql: list) -> list:
+    return {"sqlite": sqlite, "postgresql": postgresql}.get(op.get_bind().dialect.name, [])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for statement in _statements(SQLITE_UPGRADE, POSTGRES_UPGRADE):
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for statement in _statements(SQLITE_DOWNGRADE, POSTGRES_DOWNGRADE):
+        op.execute(statement)
@@ -0,0 +1,41 @@
+"""bulk ingest client keys: clave de idempotencia del cliente en dibujos, avatares y conversaciones
+
+Revision ID: 0008_bulk_ingest_client_keys
+Revises: 0007_conversation_search_index
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_bulk_ingest_client_keys"
+down_revision: Union[str, Sequence[str], None] = "0007_conversation_search_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["patient_drawings", "patient_avatars", "conversation_logs"]
+
+# Sin batch_alter_table: recrear conversation_logs en SQLite borraría los triggers del
+# índice de búsqueda. ADD/DROP COLUMN e índices aparte funcionan en ambos motores.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for table in TABLES:
+        if "client_key" not in {c["name"] for c in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column("client_key", sa.String(64), nullable=True))
+        name = f"uq_{table}_patient_client_key"
+        if name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, ["patient_id", "client_key"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"uq_{table}_patient_client_key", table_name=table)
+        op.drop_column(table, "client_key")
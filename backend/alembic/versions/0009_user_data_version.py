@@ -0,0 +1,31 @@
+"""user data version: contador de cambios por usuario para los ETag de las lecturas
+
+Revision ID: 0009_user_data_version
+Revises: 0008_bulk_ingest_client_keys
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_user_data_version"
+down_revision: Union[str, Sequence[str], None] = "0008_bulk_ingest_client_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ADD COLUMN directo (sin recrear users, que perdería los triggers de users_search)
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("users")}
+    if "data_version" not in columns:
+        op.add_column("users", sa.Column("data_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "data_version")
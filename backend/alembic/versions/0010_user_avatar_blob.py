@@ -0,0 +1,106 @@
+"""user avatar blob: mueve users.avatar al blob store y deja en users solo su hash
+
+Revision ID: 0010_user_avatar_blob
+Revises: 0009_user_data_version
+Create Date: 2026-10-18
+
+"""
+import base64
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.blob_store import blob_store, decode_image_data
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_user_avatar_blob"
+down_revision: Union[str, Sequence[str], None] = "0009_user_data_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Sin batch_alter_table: recrear users borraría los triggers de users_search.
+# SQLite (>= 3.35) y PostgreSQL admiten ADD/DROP COLUMN directamente.
+
+# Los avatares que no son imágenes no caben en el blob store: se guardan aquí tal cual
+# antes de borrar la columna (y el downgrade los devuelve a users.avatar)
+UNCONVERTED_TABLE = "users_avatar_unconverted"
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    columns = {c["name"] for c in sa.inspect(bind).get_columns("users")}
+    if "avatar_hash" not in columns:
+        op.add_column("users", sa.Column("avatar_hash", sa.String(length=64), nullable=True))
+    if "avatar_mime" not in columns:
+        op.add_column("users", sa.Column("avatar_mime", sa.String(length=100), nullable=True))
+    if "avatar" not in columns:
+        return
+
+    users = sa.table(
+        "users",
+        sa.column("id", sa.Integer),
+        sa.column("avatar", sa.String),
+        sa.column("avatar_hash", sa.String),
+        sa.column("avatar_mime", sa.String),
+    )
+    pending_ids = bind.execute(sa.select(users.c.id).where(users.c.avatar.is_not(None))).scalars().all()
+    lost = []
+    for user_id in pending_ids:
+        avatar = bind.execute(sa.select(users.c.avatar).where(users.c.id == user_id)).scalar_one()
+        try:
+            data, mime_type = decode_image_data(avatar)
+        except ValueError:
+            lost.append(user_id)
+            continue
+        bind.execute(
+            users.update().where(users.c.id == user_id).values(avatar_hash=blob_store.put(data), avatar_mime=mime_type)
+        )
+    if lost:
+        unconverted = op.create_table(
+            UNCONVERTED_TABLE,
+            sa.Column("user_id", sa.Integer(), primary_key=True),
+            sa.Column("avatar", sa.Text(), nullable=False),
+        )
+        for user_id in lost:
+            avatar = bind.execute(sa.select(users.c.avatar).where(users.c.id == user_id)).scalar_one()
+            bind.execute(unconverted.insert().values(user_id=user_id, avatar=avatar))
+        logger.warning("Avatars of users %s are not images: kept as they were in table %s", lost, UNCONVERTED_TABLE)
+
+    op.drop_column("users", "avatar")
+
+    if bind.dialect.name == "sqlite":
+        # Reescribe la tabla sin el espacio que ocupaban los avatares (fuera de la transacción)
+        with op.get_context().autocommit_block():
+            op.execute("VACUUM")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    op.add_column("users", sa.Column("avatar", sa.String(length=100000), nullable=True))
+    users = sa.table(
+        "users",
+        sa.column("id", sa.Integer),
+        sa.column("avatar", sa.String),
+        sa.column("avatar_hash", sa.String),
+        sa.column("avatar_mime", sa.String),
+    )
+    rows = bind.execute(
+        sa.select(users.c.id, users.c.avatar_hash, users.c.avatar_mime).where(users.c.avatar_hash.is_not(None))
+    ).all()
+    for user_id, avatar_hash, avatar_mime in rows:
+        encoded = base64.b64encode(blob_store.read(avatar_hash)).decode("ascii")
+        bind.execute(users.update().where(users.c.id == user_id).values(avatar=f"data:{avatar_mime};base64,{encoded}"))
+    if UNCONVERTED_TABLE in sa.inspect(bind).get_table_names():
+        unconverted = sa.table(UNCONVERTED_TABLE, sa.column("user_id", sa.Integer), sa.column("avatar", sa.String))
+        for user_id, avatar in bind.execute(sa.select(unconverted.c.user_id, unconverted.c.avatar)).all():
+            bind.execute(users.update().where(users.c.id == user_id).values(avatar=avatar))
+        op.drop_table(UNCONVERTED_TABLE)
+    op.drop_column("users", "avatar_mime")
+    op.drop_column("users", "avatar_hash")
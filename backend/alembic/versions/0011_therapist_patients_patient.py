@@ -0,0 +1,33 @@
+"""therapist patients patient index: terapeutas de un paciente sin recorrer toda la tabla
+
+Revision ID: 0011_therapist_patients_patient
+Revises: 0010_user_avatar_blob
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_therapist_patients_patient"
+down_revision: Union[str, Sequence[str], None] = "0010_user_avatar_blob"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# La clave primaria empieza por therapist_id; cada evento de un paciente busca por patient_id
+INDEX_NAME = "ix_therapist_patients_patient_id"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    indexes = {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("therapist_patients")}
+    if INDEX_NAME not in indexes:
+        op.create_index(INDEX_NAME, "therapist_patients", ["patient_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX_NAME, table_name="therapist_patients")
@@ -0,0 +1,52 @@
+# en backend/app/api/deps.py
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.data_versions import make_etag, read_data_versions
+from ..crud.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+from ..database import get_async_db
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+) -> dict:
+    """
+    Parámetros comunes de los listados paginados por cursor.
+    """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"cursor": cursor, "limit": limit}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return if_none_match.strip() == "*" or etag in if_none_match
+
+
+def conditional_get(user_param: str, include_therapists: bool = False):
+    """
+    Dependencia para GET cuyo contenido depende de un usuario (el de la ruta, en
+    `user_param`) y, si se indica, de sus terapeutas. Pone ETag a la respuesta y, si el
+    cliente ya tiene esa versión (If-None-Match), responde 304 antes de consultar nada más.
+    """
+    async def dependency(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+        try:
+            user_id = int(request.path_params[user_param])
+        except (KeyError, ValueError):
+            return  # FastAPI ya rechaza el parámetro con 422
+        versions = await read_data_versions(db, user_id, include_therapists)
+        if not versions:
+            return  # el usuario no existe: el endpoint responde 404
+        resource = request.url.path + ("?" + request.url.query if request.url.query else "")
+        headers = {"ETag": make_etag(resource, versions), "Cache-Control": "private, no-cache"}
+        if etag_matches(request, headers["ETag"]):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -1,22 +1,36 @@
 # backend/app/api/endpoints/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ... import schemas, crud
-from ...database import get_db
-from ...core.security import verify_password, create_access_token
+from ...database import get_async_db
+from ...core.security import create_access_token
+from ...core.password_pool import PASSWORD_HASH_RETRY_AFTER, PasswordPoolBusy, password_pool
 
 router = APIRouter(tags=["auth"])
 
+def _busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": str(PASSWORD_HASH_RETRY_AFTER)},
+    )
+
+# bcrypt va al pool de procesos: un pico de logins no bloquea el event loop
+# ni deja sin hilos al resto de endpoints
 @router.post("/login", response_model=schemas.Token) # genera un JWT con {"sub": user.email, "role": user.role} y devuelve además el UserRead completo para tu frontend
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
     # OAuth2PasswordRequestForm usa "username" → aquí será el email
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await crud.get_user_by_email(db, email=form_data.username)
+    try:
+        valid = user is not None and await password_pool.verify(form_data.password, user.hashed_password)
+    except PasswordPoolBusy:
+        raise _busy_exception()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -31,15 +45,19 @@ def login(
     }
 
 @router.post("/register", response_model=schemas.UserRead)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Registra un nuevo usuario en la base de datos.
     """
-    db_user = crud.get_user_by_email(db, email=user.email)
+    db_user = await crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El email ya está registrado. Por favor, inicia sesión."
         )
-    new_user = crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await password_pool.hash(user.password)
+    except PasswordPoolBusy:
+        raise _busy_exception()
+    new_user = await crud.create_user(db=db, user=user, hashed_password=hashed_password)
     return new_user
@@ -1,16 +1,29 @@
 # en backend/app/api/endpoints/avatars.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from ... import schemas, crud
-from ...database import get_db
+from ...database import get_async_db
+from ..deps import conditional_get, page_params
 
 router = APIRouter()
 
 @router.post("/users/{user_id}/avatars/", response_model=schemas.AvatarRead)
-def create_avatar_for_user(user_id: int, avatar: schemas.AvatarCreate, db: Session = Depends(get_db)):
-    return crud.create_patient_avatar(db=db, avatar=avatar, patient_id=user_id)
+async def create_avatar_for_user(user_id: int, avatar: schemas.AvatarCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_patient_avatar(db=db, avatar=avatar, patient_id=user_id)
 
-@router.get("/users/{user_id}/avatars/", response_model=List[schemas.AvatarRead])
-def read_user_avatars(user_id: int, db: Session = Depends(get_db)):
-    return crud.get_avatars_by_patient(db=db, patient_id=user_id)
+@router.post("/users/{user_id}/avatars/bulk", response_model=schemas.BulkIngestResult)
+async def create_avatars_bulk(user_id: int, batch: schemas.AvatarBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    if await crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await crud.create_patient_avatars_bulk(db=db, items=batch.items, patient_id=user_id)
+
+@router.get("/users/{user_id}/avatars/", response_model=schemas.Page[schemas.AvatarRead], dependencies=[Depends(conditional_get("user_id"))])
+async def read_user_avatars(user_id: int, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    return await crud.get_avatars_by_patient(db=db, patient_id=user_id, **page)
+
+@router.get("/users/{user_id}/avatars/latest", response_model=schemas.AvatarRead, dependencies=[Depends(conditional_get("user_id"))])
+async def read_user_latest_avatar(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    avatar = await crud.get_latest_avatar(db=db, patient_id=user_id)
+    if not avatar:
+        raise HTTPException(status_code=404, detail="No avatars found")
+    return avatar
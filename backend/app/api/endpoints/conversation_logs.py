@@ -1,16 +1,121 @@
 # en backend/app/api/endpoints/conversation_logs.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from ... import schemas, crud
-from ...database import get_db
+from ...database import AsyncSessionLocal, get_async_db
+from ...core.phrase_catalog import phrase_catalog
+from ...core.serialization import json_response
+from ...crud.pagination import MAX_PAGE_SIZE
+from ..deps import conditional_get, page_params
 
 router = APIRouter()
 
+CONVERSATION_LOG_PAGE = TypeAdapter(schemas.Page[schemas.ConversationLogRead])
+
 @router.post("/users/{user_id}/conversations/", response_model=schemas.ConversationLogRead)
-def create_new_conversation_log(user_id: int, log: schemas.ConversationLogCreate, db: Session = Depends(get_db)):
-    return crud.create_conversation_log(db=db, log=log, patient_id=user_id)
+async def create_new_conversation_log(user_id: int, log: schemas.ConversationLogCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_conversation_log(db=db, log=log, patient_id=user_id)
+
+@router.post("/users/{user_id}/conversations/bulk", response_model=schemas.BulkIngestResult)
+async def create_conversation_logs_bulk(user_id: int, batch: schemas.ConversationLogBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Sube de una vez los logs guardados sin conexión; cada uno lleva su client_key para
+    que reenviar el lote no los duplique.
+    """
+    if await crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await crud.create_conversation_logs_bulk(db=db, items=batch.items, patient_id=user_id)
+
+@router.get("/users/{user_id}/conversations/", response_model=schemas.Page[schemas.ConversationLogRead], dependencies=[Depends(conditional_get("user_id"))])
+async def get_conversation_logs(user_id: int, response: Response, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    page = await crud.get_conversation_logs_by_patient(db=db, patient_id=user_id, **page)
+    return json_response(CONVERSATION_LOG_PAGE, page, response)
+
+@router.get("/users/{user_id}/conversations/latest", response_model=schemas.ConversationLogRead, dependencies=[Depends(conditional_get("user_id"))])
+async def get_latest_conversation_log(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    log = await crud.get_latest_conversation_log(db=db, patient_id=user_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="No conversations found")
+    return log
+
+# Búsqueda de texto completo en las conversaciones de los pacientes del terapeuta
+@router.get("/therapists/{therapist_id}/conversations/search", response_model=schemas.Page[schemas.ConversationSearchHit])
+async def search_therapist_conversations(
+    therapist_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    patient_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        return await crud.search_conversations_for_therapist(
+            db=db, therapist_id=therapist_id, query=q, patient_id=patient_id, cursor=cursor, limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+# --- Sesiones por turnos ---
+@router.post("/users/{user_id}/conversations/sessions", response_model=schemas.ConversationSessionRead)
+async def create_conversation_session(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await crud.create_conversation_session(db=db, patient_id=user_id)
+
+@router.get("/conversations/{log_id}", response_model=schemas.ConversationLogRead)
+async def read_conversation_log(log_id: int, db: AsyncSession = Depends(get_async_db)):
+    log = await crud.get_conversation_log(db=db, log_id=log_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return log
+
+# Alternativa HTTP al WebSocket para clientes que no pueden mantenerlo abierto
+@router.post("/conversations/{log_id}/turns", response_model=schemas.ConversationTurnAck)
+async def append_conversation_turns(log_id: int, batch: schemas.ConversationTurnBatch, db: AsyncSession = Depends(get_async_db)):
+    stored = await crud.append_conversation_turns(db=db, log_id=log_id, turns=batch.turns)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Conversation session not found")
+    return {"stored": stored}
+
+@router.websocket("/conversations/{log_id}/ws")
+async def conversation_socket(websocket: WebSocket, log_id: int, tca_type: str = "general"):
+    """
+    Mensajes del cliente (JSON):
+      {"type": "turn", "seq": 0, "speaker": "ai" | "patient", "text": "..."}  -> {"type": "ack", "stored": [0]}
+      {"type": "turns", "turns": [...]}                                       -> {"type": "ack", "stored": [...]}
+      {"type": "next_phrase", "tca_type": "..."} (tca_type opcional)          -> {"type": "phrase", "phrase": {...}}
+    Los errores se responden con {"type": "error", "detail": "..."} sin cerrar el socket.
+    """
+    # Sesiones cortas por mensaje: no retenemos una conexión del pool mientras el socket está abierto
+    async with AsyncSessionLocal() as db:
+        if not await crud.is_turn_session(db, log_id):
+            await websocket.close(code=4404)
+            return
+    await websocket.accept()
 
-@router.get("/users/{user_id}/conversations/", response_model=List[schemas.ConversationLogRead])
-def get_conversation_logs(user_id: int, db: Session = Depends(get_db)):
-    return crud.get_conversation_logs_by_patient(db=db, patient_id=user_id)
\ No newline at end of file
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            kind = message.get("type") if isinstance(message, dict) else None
+            if kind in ("turn", "turns"):
+                try:
+                    batch = schemas.ConversationTurnBatch(turns=message["turns"] if kind == "turns" else [message])
+                except (ValidationError, KeyError, TypeError) as exc:
+                    await websocket.send_json({"type": "error", "detail": str(exc)})
+                    continue
+                async with AsyncSessionLocal() as db:
+                    stored = await crud.append_conversation_turns(db=db, log_id=log_id, turns=batch.turns)
+                await websocket.send_json({"type": "ack", "stored": stored or []})
+            elif kind == "next_phrase":
+                await phrase_catalog.ensure_loaded()
+                # Misma sesión del catálogo para toda la conversación: no se repiten frases
+                phrase = phrase_catalog.sample(message.get("tca_type") or tca_type, session_id=f"conversation-{log_id}")
+                await websocket.send_json({"type": "phrase", "phrase": phrase})
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown message type"})
+    except WebSocketDisconnect:
+        pass
@@ -1,27 +1,128 @@
 # backend/app/api/endpoints/drawings.py
 # trabaja siempre con el usuario autenticado, evitando pasar user_id en la URL y cerrando un posible agujero de seguridad
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
 from ... import schemas, crud
-from ...database import get_db
+from ...database import get_async_db
+from ...core.blob_store import BlobTooLarge, blob_store
+from ..deps import conditional_get, etag_matches, page_params
+from ...core.thumbnails import THUMBNAIL_MIME, ensure_thumbnail
+from ...core.serialization import json_response
 
 router = APIRouter()
 
+# Los listados se serializan con estos adaptadores (response_model queda para la documentación)
+DRAWING_PAGE = TypeAdapter(schemas.Page[schemas.DrawingRead])
+DRAWING_SUMMARY_PAGE = TypeAdapter(schemas.Page[schemas.DrawingSummary])
+
 # Crear dibujo
 @router.post("/users/{user_id}/drawings/", response_model=schemas.DrawingRead)
-def create_drawing(user_id: int, drawing: schemas.DrawingCreate, db: Session = Depends(get_db)):
-    return crud.create_patient_drawing(db, drawing, user_id)
+async def create_drawing(user_id: int, drawing: schemas.DrawingCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        return await crud.create_patient_drawing(db, drawing, user_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+# Subida binaria: el cuerpo es la imagen (image/png, image/webp o image/jpeg), sin base64 ni JSON
+@router.post("/users/{user_id}/drawings/upload", response_model=schemas.DrawingRead)
+async def upload_drawing(
+    user_id: int,
+    request: Request,
+    title: Optional[str] = Query(None, max_length=100),
+    description: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    # Todo lo que se puede rechazar sin leer el cuerpo se rechaza antes
+    mime_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if mime_type not in crud.UPLOAD_SIGNATURES:
+        raise HTTPException(status_code=415, detail=f"Unsupported image type, expected one of {', '.join(crud.UPLOAD_SIGNATURES)}")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > crud.DRAWING_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {crud.DRAWING_MAX_BYTES} bytes")
+    if await crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    try:
+        return await crud.create_patient_drawing_from_stream(db, user_id, request.stream(), mime_type, title, description)
+    except BlobTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+# Subida en lote (tablets que sincronizan lo dibujado sin conexión)
+@router.post("/users/{user_id}/drawings/bulk", response_model=schemas.BulkIngestResult)
+async def create_drawings_bulk(user_id: int, batch: schemas.DrawingBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    if await crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await crud.create_patient_drawings_bulk(db, batch.items, user_id)
 
 # Listar dibujos de paciente
-@router.get("/users/{user_id}/drawings/", response_model=List[schemas.DrawingRead])
-def read_user_drawings(user_id: int, db: Session = Depends(get_db)):
-    return crud.get_drawings_by_patient(db, user_id)
+@router.get("/users/{user_id}/drawings/", response_model=schemas.Page[schemas.DrawingRead], dependencies=[Depends(conditional_get("user_id"))])
+async def read_user_drawings(user_id: int, response: Response, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    return json_response(DRAWING_PAGE, await crud.get_drawings_by_patient(db, user_id, **page), response)
+
+# Listado ligero (miniaturas) de los dibujos de un paciente
+@router.get("/users/{user_id}/drawings/summary", response_model=schemas.Page[schemas.DrawingSummary], dependencies=[Depends(conditional_get("user_id"))])
+async def read_user_drawing_summaries(user_id: int, response: Response, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    return json_response(DRAWING_SUMMARY_PAGE, await crud.get_drawing_summaries_by_patient(db, user_id, **page), response)
+
+# Último dibujo del paciente
+@router.get("/users/{user_id}/drawings/latest", response_model=schemas.DrawingRead, dependencies=[Depends(conditional_get("user_id"))])
+async def read_user_latest_drawing(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    drawing = await crud.get_latest_drawing(db, user_id)
+    if not drawing:
+        raise HTTPException(status_code=404, detail="No drawings found")
+    return drawing
 
 # Listar dibujos de un paciente para un terapeuta
-@router.get("/therapists/{therapist_id}/patients/{patient_id}/drawings", response_model=List[schemas.DrawingRead])
-def get_drawings_for_therapist(therapist_id: int, patient_id: int, db: Session = Depends(get_db)):
-    drawings = crud.get_patient_drawings_for_therapist(db, therapist_id, patient_id)
-    if not drawings:
+@router.get("/therapists/{therapist_id}/patients/{patient_id}/drawings", response_model=schemas.Page[schemas.DrawingRead], dependencies=[Depends(conditional_get("patient_id"))])
+async def get_drawings_for_therapist(therapist_id: int, patient_id: int, response: Response, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    drawings = await crud.get_patient_drawings_for_therapist(db, therapist_id, patient_id, **page)
+    if drawings is None:
+        raise HTTPException(status_code=403, detail="Patient not assigned to therapist or not found")
+    return json_response(DRAWING_PAGE, drawings, response)
+
+# Listado ligero (miniaturas) de los dibujos de un paciente para un terapeuta
+@router.get("/therapists/{therapist_id}/patients/{patient_id}/drawings/summary", response_model=schemas.Page[schemas.DrawingSummary], dependencies=[Depends(conditional_get("patient_id"))])
+async def get_drawing_summaries_for_therapist(therapist_id: int, patient_id: int, response: Response, page: dict = Depends(page_params), db: AsyncSession = Depends(get_async_db)):
+    drawings = await crud.get_patient_drawing_summaries_for_therapist(db, therapist_id, patient_id, **page)
+    if drawings is None:
         raise HTTPException(status_code=403, detail="Patient not assigned to therapist or not found")
-    return drawings
+    return json_response(DRAWING_SUMMARY_PAGE, drawings, response)
+
+# Imagen de un dibujo, servida desde el blob store (soporta ETag y Range)
+@router.get("/{drawing_id}/image")
+async def read_drawing_image(drawing_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    drawing = await crud.get_drawing(db, drawing_id)
+    if drawing:
+        drawing = await crud.ensure_drawing_blob(db, drawing)
+    if not drawing:
+        raise HTTPException(status_code=404, detail="Drawing not found")
+
+    # El hash del contenido es un ETag fuerte: la imagen de un dibujo nunca cambia
+    headers = {"ETag": f'"{drawing.image_hash}"', "Cache-Control": "private, max-age=86400"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(blob_store.path_for(drawing.image_hash), media_type=drawing.image_mime, headers=headers)
+
+# Miniatura de un dibujo (se genera al guardar; para filas antiguas, en la primera petición)
+@router.get("/{drawing_id}/thumbnail")
+async def read_drawing_thumbnail(drawing_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    drawing = await crud.get_drawing(db, drawing_id)
+    if drawing:
+        drawing = await crud.ensure_drawing_blob(db, drawing)
+    if not drawing:
+        raise HTTPException(status_code=404, detail="Drawing not found")
+
+    path = await run_in_threadpool(ensure_thumbnail, drawing.image_hash)
+    if path is None:
+        # Formato que no sabemos reducir (p. ej. SVG): servimos el original
+        return await read_drawing_image(drawing_id, request, db)
+
+    headers = {"ETag": f'"{drawing.image_hash}-thumb"', "Cache-Control": "private, max-age=86400"}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=THUMBNAIL_MIME, headers=headers)
@@ -1,17 +1,23 @@
 # en backend/app/api/endpoints/phrases.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ... import crud, schemas
-from ...database import get_db
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from ... import schemas
+from ...core.phrase_catalog import phrase_catalog
 
 router = APIRouter()
 
+async def get_phrase_catalog():
+    # Solo abre una sesión cuando el catálogo está obsoleto (ver core/phrase_catalog.py)
+    await phrase_catalog.ensure_loaded()
+    return phrase_catalog
+
 @router.get("/phrases/{tca_type}", response_model=schemas.TcaPhraseRead)
-def read_random_phrase(tca_type: str, db: Session = Depends(get_db)):
-    phrase = crud.get_random_phrase_by_type(db=db, tca_type=tca_type)
+async def read_random_phrase(tca_type: str, response: Response, session_id: Optional[str] = None, catalog = Depends(get_phrase_catalog)):
+    # Si no hay frases para ese tipo, el catálogo devuelve una genérica ("general")
+    # session_id (opcional, lo genera el cliente): no repite frases dentro de la misma sesión
+    phrase = catalog.sample(tca_type, session_id=session_id)
+    # Cada llamada debe dar una frase nueva: ni el navegador ni un proxy pueden reutilizarla
+    response.headers["Cache-Control"] = "no-store"
     if not phrase:
-        # Opcional: devolver una frase genérica si no se encuentra ninguna para ese tipo
-        phrase = crud.get_random_phrase_by_type(db=db, tca_type="general")
-        if not phrase:
-            raise HTTPException(status_code=404, detail="No phrases found")
+        raise HTTPException(status_code=404, detail="No phrases found")
     return phrase
@@ -1,69 +1,188 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import asyncio
+import json
 
-from ... import models, schemas, crud
-from ...database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+
+from ... import schemas, crud
+from ...database import AsyncSessionLocal, get_async_db
 from ...core.security import get_current_user
+from ...core.principal_cache import Principal
+from ..deps import conditional_get, etag_matches
+from ...core.blob_store import blob_store
+from ...core.event_broker import event_broker
+from ...core.serialization import json_response
+from ...core.patient_export import EXPORTERS, MEDIA_TYPES, parse_cursor
 
 router = APIRouter()
 
+# Listado de pacientes del terapeuta: se serializa directamente a JSON desde los objetos ORM
+THERAPIST_ROSTER = TypeAdapter(schemas.TherapistWithProfile)
+
+EVENTS_KEEPALIVE_SECONDS = 15
+# El feed se cierra solo pasado este tiempo y EventSource vuelve a conectar: así un
+# reinicio del servidor no se queda esperando a las conexiones abiertas
+EVENTS_MAX_SECONDS = 300
+
 # --- ENDPOINT PARA ACTUALIZAR PERFIL DE PACIENTE ---
 @router.put("/patients/{patient_id}/profile", response_model=schemas.PatientWithProfile)
-def update_patient_profile_endpoint(patient_id: int, profile_in: schemas.PatientProfileUpdate, db: Session = Depends(get_db)):
-    updated_user = crud.update_patient_profile(db=db, patient_id=patient_id, profile_in=profile_in)
+async def update_patient_profile_endpoint(patient_id: int, profile_in: schemas.PatientProfileUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_user = await crud.update_patient_profile(db=db, patient_id=patient_id, profile_in=profile_in)
     if not updated_user:
         raise HTTPException(status_code=404, detail="Patient not found")
     return updated_user
 
-@router.get("/search/", response_model=List[schemas.UserRead])
-def search_patients(name: Optional[str] = None, db: Session = Depends(get_db)):
+@router.get("/search/", response_model=List[schemas.UserSearchResult])
+async def search_patients(
+    name: Optional[str] = None,
+    limit: int = Query(crud.SEARCH_PAGE_SIZE, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=crud.SEARCH_MAX_RESULTS),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Busca pacientes por nombre. Solo devuelve usuarios con el rol 'patient'.
+    Busca pacientes por nombre, apellidos, email o centro (por prefijo, ordenados por relevancia).
+    Solo devuelve usuarios con el rol 'patient'; como mucho crud.SEARCH_MAX_RESULTS en total.
     """
     if not name:
         return []
-    patients = crud.search_users_by_name(db=db, name=name)
+    patients = await crud.search_users_by_name(db=db, name=name, limit=limit, offset=offset)
     return patients
 
+@router.get("/{user_id}/dashboard", response_model=schemas.PatientDashboardRead, dependencies=[Depends(conditional_get("user_id"))])
+async def read_patient_dashboard(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Contadores y última actividad del paciente, sin descargar sus listados.
+    """
+    dashboard = await crud.get_patient_dashboard(db=db, patient_id=user_id)
+    if dashboard is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return dashboard
+
+@router.get("/{user_id}/export")
+async def export_patient_record(
+    user_id: int,
+    format: Literal["ndjson", "zip"] = "ndjson",
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Descarga en streaming todo el historial del paciente (perfil, dibujos, avatares y
+    conversaciones). Con `cursor` (el último "cursor" recibido) se reanuda una descarga cortada.
+    """
+    try:
+        parse_cursor(cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if await crud.get_user(db, user_id=user_id) is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    filename = f"patient-{user_id}.{format}"
+    return StreamingResponse(
+        EXPORTERS[format](user_id, cursor),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 @router.get("/me", response_model=schemas.UserReadWithProfile)
-def read_users_me(current_user: models.User = Depends(get_current_user)):
-    return current_user
+async def read_users_me(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    user = await crud.get_user_with_profiles(db, user_id=current_user.id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.post("/therapists/{therapist_id}/patients", response_model=schemas.TherapistWithProfile)
-def assign_patient(therapist_id: int, patient_id: int, db: Session = Depends(get_db)):
-    therapist = crud.assign_patient_to_therapist(db, therapist_id, patient_id)
+async def assign_patient(therapist_id: int, patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    therapist = await crud.assign_patient_to_therapist(db, therapist_id, patient_id)
     if not therapist:
         raise HTTPException(status_code=404, detail="Therapist or patient not found")
     return schemas.TherapistWithProfile.model_validate(therapist)
 
 @router.delete("/therapists/{therapist_id}/patients/{patient_id}", response_model=schemas.TherapistWithProfile)
-def remove_patient(therapist_id: int, patient_id: int, db: Session = Depends(get_db)):
-    therapist = crud.remove_patient_from_therapist(db, therapist_id, patient_id)
+async def remove_patient(therapist_id: int, patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    therapist = await crud.remove_patient_from_therapist(db, therapist_id, patient_id)
     if not therapist:
         raise HTTPException(status_code=404, detail="Therapist or patient not found")
     return schemas.TherapistWithProfile.model_validate(therapist)
 
-@router.get("/therapists/{therapist_id}/patients", response_model=schemas.TherapistWithProfile)
-def get_patients_of_therapist(therapist_id: int, db: Session = Depends(get_db)):
-    therapist = db.query(models.User).filter(models.User.id == therapist_id, models.User.role == "psychologist").first()
+# ETag: cambia al asignar o quitar pacientes y al editar el perfil de cualquiera de ellos
+@router.get("/therapists/{therapist_id}/patients", response_model=schemas.TherapistWithProfile, dependencies=[Depends(conditional_get("therapist_id"))])
+async def get_patients_of_therapist(therapist_id: int, response: Response, db: AsyncSession = Depends(get_async_db)):
+    therapist = await crud.get_therapist_with_patients(db, therapist_id)
     if not therapist:
         raise HTTPException(status_code=404, detail="Therapist not found")
-    return schemas.TherapistWithProfile.model_validate(therapist)
+    return json_response(THERAPIST_ROSTER, therapist, response)
+
+# Feed de eventos (Server-Sent Events) con la actividad de los pacientes del terapeuta
+@router.get("/therapists/{therapist_id}/events")
+async def stream_therapist_events(therapist_id: int):
+    # Sesión propia y corta: el feed no retiene una conexión de la base de datos mientras está abierto
+    async with AsyncSessionLocal() as db:
+        therapist = await crud.get_user(db, therapist_id)
+    if therapist is None or therapist.role != "psychologist":
+        raise HTTPException(status_code=404, detail="Therapist not found")
 
-@router.get("/patients/{patient_id}/therapists", response_model=List[schemas.PatientWithTherapists])
-def get_therapists_of_patient(patient_id: int, db: Session = Depends(get_db)):
-    patient = db.query(models.User).filter(models.User.id == patient_id, models.User.role == "patient").first()
+    queue = event_broker.subscribe(therapist_id)
+
+    async def events():
+        try:
+            yield "retry: 2000\nevent: ready\ndata: {}\n\n"
+            deadline = asyncio.get_running_loop().time() + EVENTS_MAX_SECONDS
+            while asyncio.get_running_loop().time() < deadline:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:  # el servidor se está apagando
+                    break
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            event_broker.unsubscribe(therapist_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Incluye los terapeutas con sus listados de pacientes: el ETag combina las versiones de todos ellos
+@router.get("/patients/{patient_id}/therapists", response_model=List[schemas.PatientWithTherapists], dependencies=[Depends(conditional_get("patient_id", include_therapists=True))])
+async def get_therapists_of_patient(patient_id: int, db: AsyncSession = Depends(get_async_db)):
+    patient = await crud.get_patient_with_therapists(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return [schemas.PatientWithTherapists.model_validate(patient)]
 
 @router.put("/{user_id}/avatar", response_model=schemas.UserRead)
-def update_user_avatar_endpoint(user_id: int, avatar: schemas.UserAvatarUpdate, db: Session = Depends(get_db)):
+async def update_user_avatar_endpoint(user_id: int, avatar: schemas.UserAvatarUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Update user avatar.
     """
-    db_user = crud.update_user_avatar(db=db, user_id=user_id, avatar_data=avatar.avatar)
+    try:
+        db_user = await crud.update_user_avatar(db=db, user_id=user_id, avatar_data=avatar.avatar)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return db_user
\ No newline at end of file
+    return db_user
+
+# Imagen del avatar, servida desde el blob store
+@router.get("/{user_id}/avatar")
+async def read_user_avatar(user_id: int, request: Request, v: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    avatar = await crud.get_user_avatar(db, user_id)
+    if avatar is None or not blob_store.exists(avatar[0]):
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    avatar_hash, avatar_mime = avatar
+    headers = {
+        "ETag": f'"{avatar_hash}"',
+        # Con ?v= del hash actual (la URL de UserRead.avatar) el contenido no cambia nunca
+        "Cache-Control": "private, max-age=31536000, immutable" if v == avatar_hash[:12] else "private, no-cache",
+        # Los avatares suelen ser SVG subidos por el usuario: que no ejecuten scripts si se abren directamente
+        "Content-Security-Policy": "default-src 'none'; style-src 'unsafe-inline'; sandbox",
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(blob_store.path_for(avatar_hash), media_type=avatar_mime, headers=headers)
\ No newline at end of file
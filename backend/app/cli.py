@@ -0,0 +1,569 @@
+# en backend/app/cli.py
+# Órdenes de administración: python -m app <orden> ...
+# Cada orden importa lo que necesita al ejecutarse, así `--help` no abre la base de datos.
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+async def _close_connections():
+    # Sin esto el hilo de aiosqlite mantiene vivo el proceso al terminar
+    from .core.write_queue import write_queue
+    from .database import async_engine, writer_engine
+
+    await write_queue.shutdown()
+    await writer_engine.dispose()
+    await async_engine.dispose()
+
+
+def _file_mode(args) -> str:
+    return "ab" if args.cursor and args.format == "ndjson" else "wb"
+
+
+async def _export(args) -> int:
+    from .core.patient_export import EXPORTERS
+
+    try:
+        output = sys.stdout.buffer if args.output == "-" else open(args.output, _file_mode(args))
+        try:
+            async for chunk in EXPORTERS[args.format](args.user_id, args.cursor):
+                output.write(chunk)
+        finally:
+            if output is not sys.stdout.buffer:
+                output.close()
+    finally:
+        await _close_connections()
+    return 0
+
+
+def export_command(args) -> int:
+    """
+    Exporta el historial de un paciente a un fichero (o a stdout con -o -).
+    Con --cursor, en NDJSON se añade al final del fichero lo que falte; en ZIP se genera
+    un archivo nuevo solo con lo pendiente.
+    """
+    from .core.patient_export import parse_cursor
+
+    try:
+        parse_cursor(args.cursor)
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    return asyncio.run(_export(args))
+
+
+async def _seed() -> int:
+    from .core.schema_check import SchemaOutOfDate, check_schema
+    from .database import AsyncSessionLocal, async_engine
+    from .initial_data import seed_db
+
+    try:
+        await check_schema(async_engine, mode="strict")
+        async with AsyncSessionLocal() as db:
+            await seed_db(db)
+    except SchemaOutOfDate as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        await _close_connections()
+    print("Initial data seeded")
+    return 0
+
+
+def seed_command(args) -> int:
+    """
+    Crea los usuarios de prueba y las frases de ejemplo si no existen (se puede repetir).
+    """
+    return asyncio.run(_seed())
+
+
+def _pool_sizes(connections: int, workers: int) -> tuple[int, int]:
+    # Reparte el máximo de conexiones entre los workers: mitad fijas, mitad de desbordamiento
+    per_worker = max(1, connections // workers)
+    pool_size = max(1, per_worker // 2)
+    return pool_size, per_worker - pool_size
+
+
+async def _check_schema_once() -> str | None:
+    from .core.schema_check import SchemaOutOfDate, check_schema
+    from .database import async_engine
+
+    try:
+        await check_schema(async_engine)
+    except SchemaOutOfDate as exc:
+        return str(exc)
+    finally:
+        await async_engine.dispose()
+    return None
+
+
+def serve_command(args) -> int:
+    """
+    Servidor de producción: N workers de uvicorn vigilados por un proceso supervisor, que
+    reinicia los que terminan (también tras --max-requests peticiones). Con SIGTERM cada
+    worker deja de aceptar conexiones y termina las peticiones en curso antes de salir.
+    """
+    import uvicorn
+
+    pool_size, max_overflow = _pool_sizes(args.db_connections, args.workers)
+    # Los workers se lanzan como procesos nuevos y heredan este entorno
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+    # Si el esquema no está al día se falla aquí, una vez, y no en cada worker en bucle
+    error = asyncio.run(_check_schema_once())
+    if error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+    from .core.event_broker import EVENT_BROKER_BACKEND
+
+    if args.workers > 1 and EVENT_BROKER_BACKEND == "memory":
+        # Cada worker solo avisaría a los feeds conectados a él mismo
+        print(
+            "warning: EVENT_BROKER_BACKEND=memory with several workers, therapist dashboards will miss "
+            "events published by other workers (use EVENT_BROKER_BACKEND=postgres)",
+            file=sys.stderr,
+        )
+
+    print(
+        f"Serving on {args.host}:{args.port} with {args.workers} workers "
+        f"(DB pool {pool_size}+{max_overflow} per worker, restart every {args.max_requests or 'unlimited'} requests)"
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        log_level=args.log_level,
+    )
+    return 0
+
+
+def worker_command(args) -> int:
+    """
+    Workers de la cola de trabajos (core/jobs.py): --processes procesos que ejecutan lo que
+    las escrituras de la API dejan pendiente. Con SIGTERM o Ctrl+C terminan el trabajo en
+    curso y salen; lo que quede en la tabla lo recogen al volver a arrancar.
+    """
+    import logging
+
+    from .core.jobs import run_workers
+
+    error = asyncio.run(_check_schema_once())
+    if error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    print(f"Running {args.processes} job workers (polling every {args.poll_interval:g} s)")
+    run_workers(args.processes, args.poll_interval, args.log_level.upper())
+    return 0
+
+
+# Se mide en un proceso nuevo: en este ya están importados sqlalchemy, fastapi...
+IMPORT_PROBE = "import time; start = time.perf_counter(); import app.main; print(time.perf_counter() - start)"
+READY_TIMEOUT = 30
+
+
+def _measure_import() -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.split()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _launch_server(port: int, workers: int = 1) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+
+
+def _wait_until_ready(server: subprocess.Popen, port: int, start: float):
+    while time.perf_counter() - start < READY_TIMEOUT:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/readyz", timeout=1):
+                return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.01)
+    raise RuntimeError(f"server not ready after {READY_TIMEOUT} s")
+
+
+def _measure_ready() -> float:
+    # Desde que se lanza el proceso hasta la primera respuesta HTTP correcta
+    port = _free_port()
+    start = time.perf_counter()
+    server = _launch_server(port)
+    try:
+        _wait_until_ready(server, port, start)
+        return time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _summary(samples: list[float], digits: int = 1) -> dict:
+    ms = [sample * 1000 for sample in samples]
+    return {
+        "min_ms": round(min(ms), digits), "median_ms": round(statistics.median(ms), digits), "max_ms": round(max(ms), digits)
+    }
+
+
+def bench_startup_command(args) -> int:
+    """
+    Mide el tiempo de `import app.main` y el tiempo hasta servir la primera petición.
+    Con --json la salida se puede guardar para comparar entre versiones.
+    """
+    try:
+        results = {
+            "import": _summary([_measure_import() for _ in range(args.runs)]),
+            "ready": _summary([_measure_ready() for _ in range(args.runs)]),
+        }
+    except (RuntimeError, subprocess.CalledProcessError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({"runs": args.runs, **results}))
+    else:
+        for name, summary in results.items():
+            print(f"{name:<8} min {summary['min_ms']:>8.1f} ms  median {summary['median_ms']:>8.1f} ms  max {summary['max_ms']:>8.1f} ms")
+    return 0
+
+
+# Listados de ejemplo para bench-serialization: textos largos, como los transcripts reales
+BENCH_TEXT = "Paciente: hoy he dibujado la casa de mis abuelos con el jardín y el perro. " * 20
+
+
+def _bench_listings(items: int) -> dict:
+    """
+    Para cada listado: (tipo de respuesta, contenido como lo devolvía el endpoint antes,
+    contenido como lo devuelve ahora, transformación que hacía el endpoint antes).
+    """
+    from datetime import datetime, timezone
+
+    from . import models, schemas
+
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    drawings = [
+        {"id": i, "patient_id": 1, "created_at": created_at, "title": f"Dibujo {i}", "description": BENCH_TEXT,
+         "image_hash": f"{i:064x}", "image_size": 48213, "image_mime": "image/webp"}
+        for i in range(items)
+    ]
+    logs = [{"id": i, "patient_id": 1, "created_at": created_at, "transcript": BENCH_TEXT} for i in range(items)]
+    therapist = models.User(id=0, name="Terapeuta", email="t@example.com", role="psychologist", hashed_password="")
+    therapist.patients = [
+        models.User(
+            id=i, name=f"Paciente {i}", surname="Apellido", email=f"p{i}@example.com", role="patient", hashed_password="",
+            avatar_hash=f"{i:064x}", patient_profile=models.PatientProfile(treatment="TCA", notes=BENCH_TEXT),
+        )
+        for i in range(1, items + 1)
+    ]
+    return {
+        "drawings": (
+            schemas.Page[schemas.DrawingRead],
+            {"items": [models.PatientDrawing(**row) for row in drawings], "next_cursor": None},
+            {"items": drawings, "next_cursor": None},
+            None,
+        ),
+        "conversations": (
+            schemas.Page[schemas.ConversationLogRead],
+            {"items": [models.ConversationLog(id=log["id"], patient_id=1, created_at=created_at, stored_transcript=BENCH_TEXT) for log in logs], "next_cursor": None},
+            {"items": logs, "next_cursor": None},
+            None,
+        ),
+        "therapist_roster": (schemas.TherapistWithProfile, therapist, therapist, schemas.TherapistWithProfile.model_validate),
+    }
+
+
+async def _time_serialization(items: int, runs: int) -> dict:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_model_field
+    from pydantic import TypeAdapter
+
+    from .core.serialization import json_response
+
+    results = {}
+    for name, (response_type, before, after, endpoint_step) in _bench_listings(items).items():
+        # Antes: response_model de FastAPI (validar y convertir a dicts) y json.dumps en JSONResponse
+        field = create_model_field(name="Response", type_=response_type, mode="serialization")
+
+        async def old_path():
+            content = endpoint_step(before) if endpoint_step else before
+            return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+        adapter = TypeAdapter(response_type)
+        old_samples, new_samples = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            old_body = await old_path()
+            old_samples.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            new_body = json_response(adapter, after).body
+            new_samples.append(time.perf_counter() - start)
+        if json.loads(old_body) != json.loads(new_body):
+            raise RuntimeError(f"{name}: the fast path changes the response body")
+        results[name] = {"before": _summary(old_samples, 3), "after": _summary(new_samples, 3), "bytes": len(new_body)}
+    return results
+
+
+def bench_serialization_command(args) -> int:
+    """
+    Compara, para los listados grandes, el tiempo de serialización de antes (objetos ORM a
+    través del response_model y json.dumps) con la vía rápida de core.serialization. No
+    usa la base de datos: mide solo la conversión a JSON de --items elementos.
+    """
+    try:
+        results = asyncio.run(_time_serialization(args.items, args.runs))
+    except RuntimeError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps({"items": args.items, "runs": args.runs, **results}))
+    else:
+        for name, result in results.items():
+            before, after = result["before"]["median_ms"], result["after"]["median_ms"]
+            speedup = before / after if after else float("inf")
+            print(f"{name:<17} before {before:>8.3f} ms  after {after:>8.3f} ms  ({speedup:.1f}x, {result['bytes']} bytes)")
+    return 0
+
+
+def generate_command(args) -> int:
+    """
+    Carga una clínica sintética (terapeutas, pacientes, dibujos y conversaciones) en la base
+    de datos de DATABASE_URL, SQLite o PostgreSQL. --scale multiplica todos los tamaños.
+    """
+    from .core.schema_check import SchemaOutOfDate, check_schema
+    from .core.synthetic_data import generate_clinic
+    from .database import async_engine, engine
+
+    async def check():
+        try:
+            await check_schema(async_engine, mode="strict")
+        finally:
+            await async_engine.dispose()
+
+    try:
+        asyncio.run(check())
+    except SchemaOutOfDate as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    size = lambda value: max(1, round(value * args.scale))
+    start = time.perf_counter()
+    counts = generate_clinic(
+        engine,
+        therapists=size(args.therapists),
+        patients=size(args.patients),
+        drawings_per_patient=args.drawings_per_patient,
+        logs_per_patient=args.logs_per_patient,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    print(f"Generated {sum(counts.values())} rows in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+BENCH_RESULTS_DIR = BACKEND_DIR / "bench-results"
+
+
+def _git_commit() -> str | None:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+async def _bench_in_process(ctx: dict, args) -> dict:
+    from .core.benchmarks import run_in_process
+    from .main import app
+
+    return await run_in_process(app, ctx, args.scenarios, args.duration, seed=args.seed)
+
+
+def _bench_load(ctx: dict, args) -> dict:
+    from .core.benchmarks import run_load
+
+    if args.url:
+        return run_load(args.url, ctx, args.scenarios, args.duration, args.concurrency, seed=args.seed)
+    port = _free_port()
+    server = _launch_server(port, args.workers)
+    try:
+        _wait_until_ready(server, port, time.perf_counter())
+        return run_load(f"http://127.0.0.1:{port}", ctx, args.scenarios, args.duration, args.concurrency, seed=args.seed)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def bench_command(args) -> int:
+    """
+    Mide login, frases, dashboard, listado de pacientes, búsqueda y subida de dibujos sobre
+    la clínica sintética. `micro` llama a la app dentro del proceso, una petición tras otra;
+    `load` lanza un servidor (o usa --url) y lo carga con --concurrency clientes.
+    Guarda p50/p99 y throughput en JSON y, con --compare, los compara con otra ejecución.
+    """
+    from .core.benchmarks import SCENARIOS, compare, load_context
+    from .database import engine, DATABASE_URL
+
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    unknown = set(args.scenarios) - SCENARIOS.keys()
+    if unknown:
+        print(f"error: unknown scenarios {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    try:
+        ctx = load_context(engine, args.seed)
+    except LookupError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    engine.dispose()
+    try:
+        scenarios = asyncio.run(_bench_in_process(ctx, args)) if args.suite == "micro" else _bench_load(ctx, args)
+    except RuntimeError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    result = {
+        "suite": args.suite,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "database": DATABASE_URL.partition(":")[0],
+        "dataset": ctx["dataset"],
+        "config": {
+            "duration": args.duration, "seed": args.seed,
+            **({"concurrency": args.concurrency, "workers": args.workers, "url": args.url} if args.suite == "load" else {}),
+        },
+        "scenarios": scenarios,
+    }
+    output = Path(args.output) if args.output else BENCH_RESULTS_DIR / f"{args.suite}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+
+    for name, summary in scenarios.items():
+        print(
+            f"{name:<15} p50 {summary['p50_ms']:>9.2f} ms  p99 {summary['p99_ms']:>9.2f} ms  "
+            f"{summary['throughput_rps']:>8.1f} req/s  {summary['requests']:>6} requests  {summary['errors']} errors"
+        )
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        lines, regressed = compare(json.loads(Path(args.compare).read_text()), result, args.max_regression)
+        print(f"Compared with {args.compare}:")
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app", description="Herramientas de administración de Holo")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Exporta el historial completo de un paciente")
+    export.add_argument("user_id", type=int)
+    export.add_argument("--format", choices=("ndjson", "zip"), default="ndjson")
+    export.add_argument("-o", "--output", default="-", help="Fichero de salida ('-' para stdout)")
+    export.add_argument("--cursor", help="Reanuda después de este cursor (el último exportado)")
+    export.set_defaults(handler=export_command)
+
+    serve = commands.add_parser("serve", help="Arranca la API con varios workers (producción)")
+    serve.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    serve.add_argument("--port", type=int, default=int(os.getenv("PORT", 5000)))
+    serve.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    serve.add_argument(
+        "--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", 10000)),
+        help="Reinicia cada worker tras este número de peticiones (0: nunca)",
+    )
+    serve.add_argument(
+        "--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", 30)),
+        help="Segundos para terminar las peticiones en curso tras SIGTERM",
+    )
+    serve.add_argument(
+        "--db-connections", type=int, default=int(os.getenv("DB_MAX_CONNECTIONS", 40)),
+        help="Máximo de conexiones a la base de datos entre todos los workers",
+    )
+    serve.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    serve.add_argument("--log-level", default="info")
+    serve.set_defaults(handler=serve_command)
+
+    worker = commands.add_parser("worker", help="Arranca los workers de la cola de trabajos en segundo plano")
+    worker.add_argument("--processes", type=int, default=int(os.getenv("JOB_WORKERS", 2)))
+    worker.add_argument(
+        "--poll-interval", type=float, default=float(os.getenv("JOB_POLL_INTERVAL", 1)),
+        help="Segundos de espera entre consultas cuando no hay trabajos",
+    )
+    worker.add_argument("--log-level", default="info")
+    worker.set_defaults(handler=worker_command)
+
+    seed = commands.add_parser("seed", help="Crea los usuarios de prueba y las frases de ejemplo")
+    seed.set_defaults(handler=seed_command)
+
+    bench = commands.add_parser("bench-startup", help="Mide el tiempo de importación y de arranque del servidor")
+    bench.add_argument("--runs", type=int, default=5)
+    bench.add_argument("--json", action="store_true", help="Salida en una línea JSON")
+    bench.set_defaults(handler=bench_startup_command)
+
+    bench_json = commands.add_parser("bench-serialization", help="Mide la serialización de los listados grandes, antes y ahora")
+    bench_json.add_argument("--items", type=int, default=100, help="Elementos por listado")
+    bench_json.add_argument("--runs", type=int, default=50)
+    bench_json.add_argument("--json", action="store_true", help="Salida en una línea JSON")
+    bench_json.set_defaults(handler=bench_serialization_command)
+
+    generate = commands.add_parser("generate", help="Carga una clínica sintética para pruebas de carga")
+    generate.add_argument("--therapists", type=int, default=2000)
+    generate.add_argument("--patients", type=int, default=100_000)
+    generate.add_argument("--drawings-per-patient", type=int, default=20, help="Media por paciente")
+    generate.add_argument("--logs-per-patient", type=int, default=20, help="Media de conversaciones por paciente")
+    generate.add_argument("--scale", type=float, default=1.0, help="Multiplica el número de terapeutas y pacientes")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--batch-size", type=int, default=5000, help="Filas por INSERT")
+    generate.set_defaults(handler=generate_command)
+
+    bench_api = commands.add_parser("bench", help="Benchmarks de la API sobre la clínica sintética")
+    bench_api.add_argument("suite", choices=("micro", "load"))
+    bench_api.add_argument(
+        "--scenarios", nargs="+",
+        help="login, phrase, dashboard, roster, search y/o drawing_upload (por defecto, todos)",
+    )
+    bench_api.add_argument("--duration", type=float, default=5, help="Segundos por escenario")
+    bench_api.add_argument("--concurrency", type=int, default=16, help="Clientes simultáneos (load)")
+    bench_api.add_argument("--workers", type=int, default=1, help="Workers del servidor que se lanza (load)")
+    bench_api.add_argument("--url", help="Servidor ya arrancado (load), p. ej. http://127.0.0.1:5000")
+    bench_api.add_argument("--seed", type=int, default=0)
+    bench_api.add_argument("-o", "--output", help=f"Fichero JSON de resultados (por defecto en {BENCH_RESULTS_DIR.name}/)")
+    bench_api.add_argument("--compare", help="Resultado anterior (JSON) con el que comparar")
+    bench_api.add_argument(
+        "--max-regression", type=float, default=10,
+        help="Porcentaje de empeoramiento a partir del cual --compare termina con código 1",
+    )
+    bench_api.set_defaults(handler=bench_command)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
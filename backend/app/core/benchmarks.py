@@ -0,0 +1,238 @@
+# en backend/app/core/benchmarks.py
+# Benchmarks de la API sobre la clínica sintética (core/synthetic_data.py): las mismas
+# peticiones se miden dentro del proceso, llamando a la app ASGI sin red, o contra un
+# servidor real con varios clientes concurrentes. Los resultados se guardan en JSON para
+# comparar una ejecución con la anterior.
+import asyncio
+import http.client
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from sqlalchemy import func, select
+
+from .. import models
+from .synthetic_data import FIRST_NAMES, PATIENT_EMAIL, SURNAMES, SYNTHETIC_PASSWORD, TCA_TYPES, THERAPIST_EMAIL, draw_image
+
+# Métricas en las que un valor mayor es peor (en throughput_rps, al revés)
+LATENCY_METRICS = ("p50_ms", "p99_ms")
+
+
+def load_context(engine, seed: int = 0) -> dict:
+    """
+    Ids y datos de la clínica sintética que usan los escenarios. Lanza LookupError si no
+    se ha generado (python -m app generate) o faltan las frases (python -m app seed).
+    """
+    users = models.User.__table__
+    with engine.connect() as conn:
+        therapist_ids = conn.scalars(
+            select(users.c.id).where(users.c.email.like(THERAPIST_EMAIL.format("%"))).order_by(users.c.id)
+        ).all()
+        patient_ids = conn.scalars(
+            select(users.c.id).where(users.c.email.like(PATIENT_EMAIL.format("%"))).order_by(users.c.id)
+        ).all()
+        dataset = {
+            "users": conn.scalar(select(func.count()).select_from(users)),
+            "drawings": conn.scalar(select(func.count()).select_from(models.PatientDrawing.__table__)),
+            "conversation_logs": conn.scalar(select(func.count()).select_from(models.ConversationLog.__table__)),
+            "phrases": conn.scalar(select(func.count()).select_from(models.TcaPhrase.__table__)),
+        }
+    if not therapist_ids or not patient_ids:
+        raise LookupError("No synthetic clinic in this database, run `python -m app generate` first")
+    if not dataset["phrases"]:
+        raise LookupError("No phrases in this database, run `python -m app seed` first")
+    return {
+        "therapist_ids": therapist_ids,
+        "patient_ids": patient_ids,
+        "dataset": dataset,
+        "upload": draw_image(random.Random(seed)),
+    }
+
+
+# --- Escenarios: cada uno devuelve (método, ruta, cabeceras, cuerpo) de una petición ---
+
+def _login(ctx, rng):
+    email = PATIENT_EMAIL.format(rng.randint(1, len(ctx["patient_ids"])))
+    body = urlencode({"username": email, "password": SYNTHETIC_PASSWORD}).encode()
+    return "POST", "/api/auth/login", {"content-type": "application/x-www-form-urlencoded"}, body
+
+
+def _phrase(ctx, rng):
+    return "GET", f"/api/phrases/{rng.choice(TCA_TYPES)}", {}, b""
+
+
+def _dashboard(ctx, rng):
+    return "GET", f"/api/users/{rng.choice(ctx['patient_ids'])}/dashboard", {}, b""
+
+
+def _roster(ctx, rng):
+    return "GET", f"/api/users/therapists/{rng.choice(ctx['therapist_ids'])}/patients", {}, b""
+
+
+def _search(ctx, rng):
+    term = rng.choice((rng.choice(FIRST_NAMES), rng.choice(SURNAMES)))[: rng.randint(3, 6)]
+    return "GET", f"/api/users/search/?{urlencode({'name': term})}", {}, b""
+
+
+def _drawing_upload(ctx, rng):
+    # Escribe de verdad: cada ejecución añade dibujos (la imagen es siempre el mismo blob)
+    path = f"/api/drawings/users/{rng.choice(ctx['patient_ids'])}/drawings/upload?title=bench"
+    return "POST", path, {"content-type": "image/webp"}, ctx["upload"]
+
+
+SCENARIOS = {
+    "login": _login,
+    "phrase": _phrase,
+    "dashboard": _dashboard,
+    "roster": _roster,
+    "search": _search,
+    "drawing_upload": _drawing_upload,
+}
+
+
+def _percentile(ordered: list[float], percent: float) -> float:
+    return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": ms(statistics.fmean(ordered)) if ordered else None,
+        "p50_ms": ms(_percentile(ordered, 50)) if ordered else None,
+        "p99_ms": ms(_percentile(ordered, 99)) if ordered else None,
+        "max_ms": ms(ordered[-1]) if ordered else None,
+    }
+
+
+# --- Dentro del proceso ---
+
+async def _asgi_request(app, method: str, target: str, headers: dict, body: bytes) -> int:
+    # Una petición HTTP directamente a la app ASGI: mide la app, sin sockets ni cliente HTTP
+    path, _, query = target.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(name.encode(), value.encode()) for name, value in {**headers, "content-length": str(len(body))}.items()],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status, done, sent_body = 500, asyncio.Event(), False
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body"):
+            done.set()
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_in_process(app, ctx: dict, scenarios, duration: float, warmup: int = 5, seed: int = 0) -> dict:
+    """
+    Repite cada escenario durante `duration` segundos, una petición tras otra.
+    """
+    results = {}
+    await app.router.startup()
+    try:
+        for name in scenarios:
+            rng = random.Random(seed)
+            for _ in range(warmup):
+                await _asgi_request(app, *SCENARIOS[name](ctx, rng))
+            latencies, errors = [], 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < duration:
+                request = SCENARIOS[name](ctx, rng)
+                start = time.perf_counter()
+                status = await _asgi_request(app, *request)
+                latencies.append(time.perf_counter() - start)
+                errors += status >= 400
+            results[name] = summarize(latencies, errors, time.perf_counter() - started)
+    finally:
+        await app.router.shutdown()
+    return results
+
+
+# --- Carga contra un servidor ---
+
+def _client_loop(base_url: str, ctx: dict, scenario, deadline: float, seed: int) -> tuple[list[float], int]:
+    # Un cliente con conexión keep-alive; tras un error de red abre otra
+    url = urlsplit(base_url)
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        method, path, headers, body = scenario(ctx, rng)
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body or None, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            errors += response.status >= 400
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+    return latencies, errors
+
+
+def run_load(base_url: str, ctx: dict, scenarios, duration: float, concurrency: int, seed: int = 0) -> dict:
+    """
+    Para cada escenario, `concurrency` clientes lanzan peticiones sin pausa durante `duration` segundos.
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name in scenarios:
+            started = time.perf_counter()
+            deadline = started + duration
+            clients = [
+                pool.submit(_client_loop, base_url, ctx, SCENARIOS[name], deadline, seed + index)
+                for index in range(concurrency)
+            ]
+            latencies, errors = [], 0
+            for client in clients:
+                client_latencies, client_errors = client.result()
+                latencies.extend(client_latencies)
+                errors += client_errors
+            results[name] = summarize(latencies, errors, time.perf_counter() - started)
+    return results
+
+
+def compare(previous: dict, current: dict, max_regression: float) -> tuple[list[str], bool]:
+    """
+    Líneas con la variación de cada métrica entre dos resultados y si alguna empeora más
+    de `max_regression` por ciento.
+    """
+    lines, regressed = [], False
+    for name, result in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(name)
+        if not before:
+            lines.append(f"{name:<15} (new)")
+            continue
+        changes = []
+        for metric in (*LATENCY_METRICS, "throughput_rps"):
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = change > max_regression if metric in LATENCY_METRICS else -change > max_regression
+            regressed |= worse
+            changes.append(f"{metric} {old:g} -> {new:g} ({change:+.1f}%{' REGRESSION' if worse else ''})")
+        lines.append(f"{name:<15} " + "  ".join(changes))
+    return lines, regressed
@@ -0,0 +1,162 @@
+# en backend/app/core/blob_store.py
+import base64
+import binascii
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from urllib.parse import unquote
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "./blobs")
+
+
+class BlobTooLarge(ValueError):
+    pass
+
+
+class BlobStore:
+    """
+    Almacén de ficheros direccionado por contenido: cada blob se guarda una sola
+    vez con el nombre de su hash SHA-256, así los duplicados no ocupan espacio extra.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        # Dos niveles de subdirectorios para no tener miles de ficheros en una carpeta
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path_for(digest).is_file()
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if not path.is_file():
+            self._write_atomic(path, data)
+        return digest
+
+    def open_writer(self, max_bytes: int | None = None) -> "BlobWriter":
+        """
+        Para guardar un blob que llega por trozos (subidas) sin tenerlo entero en memoria.
+        """
+        return BlobWriter(self, max_bytes)
+
+    def derived_path_for(self, digest: str, variant: str) -> Path:
+        # Ficheros derivados de un blob (p. ej. miniaturas), indexados por el hash del original
+        return self.root / "derived" / variant / digest[:2] / digest
+
+    def put_derived(self, digest: str, variant: str, data: bytes) -> Path:
+        path = self.derived_path_for(digest, variant)
+        self._write_atomic(path, data)
+        return path
+
+    def _write_atomic(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Escribimos en un temporal del mismo directorio y lo renombramos de forma atómica
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._fsync_dir(path.parent)
+
+    def read(self, digest: str) -> bytes:
+        return self.path_for(digest).read_bytes()
+
+    @staticmethod
+    def _fsync_dir(directory: Path):
+        # En Windows no se pueden abrir directorios; el rename ya es suficiente allí
+        if os.name == "nt":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class BlobWriter:
+    """
+    Escribe en un temporal dentro del almacén calculando el SHA-256 a la vez; commit()
+    lo mueve a su ruta definitiva (o lo descarta si ese contenido ya existía).
+    """
+
+    def __init__(self, store: BlobStore, max_bytes: int | None = None):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+        incoming = store.root / "incoming"
+        incoming.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=incoming, prefix=".tmp-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise BlobTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        self._file.write(chunk)
+
+    def commit(self) -> str:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        digest = self._hash.hexdigest()
+        path = self.store.path_for(digest)
+        if path.is_file():
+            os.unlink(self._tmp_path)
+            return digest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self._tmp_path, path)
+        self.store._fsync_dir(path.parent)
+        return digest
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+def decode_image_data(image_data: str) -> tuple[bytes, str]:
+    """
+    Convierte lo que envía el frontend (data URL de canvas.toDataURL() o de los avatares,
+    base64 o SVG) en bytes y su tipo MIME. Lanza ValueError si no se puede decodificar.
+    """
+    image_data = image_data.strip()
+    if image_data.startswith("<svg") or image_data.startswith("<?xml"):
+        return image_data.encode("utf-8"), "image/svg+xml"
+
+    mime_type = "image/png"
+    payload = image_data
+    if image_data.startswith("data:"):
+        header, sep, payload = image_data.partition(",")
+        if not sep:
+            raise ValueError("Invalid data URL")
+        if not header.endswith(";base64"):
+            # Texto codificado como URL, p. ej. "data:image/svg+xml;utf8,%3Csvg..." (DiceBear)
+            mime_type = header[len("data:"):].split(";")[0]
+            if not mime_type.startswith("image/"):
+                raise ValueError("Unsupported data URL, expected an image")
+            return unquote(payload).encode("utf-8"), mime_type
+        mime_type = header[len("data:"):-len(";base64")] or mime_type
+
+    try:
+        return base64.b64decode(payload, validate=True), mime_type
+    except binascii.Error as exc:
+        raise ValueError("Invalid base64 image data") from exc
+
+
+blob_store = BlobStore(BLOB_STORE_DIR)
@@ -0,0 +1,57 @@
+# en backend/app/core/data_versions.py
+# Contador de versión por usuario (users.data_version). Las escrituras lo suben en la
+# misma transacción que el cambio y las lecturas lo usan como ETag: si no ha cambiado,
+# se responde 304 sin ejecutar el listado ni serializar nada.
+import hashlib
+from typing import Iterable
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+therapist_patients = models.therapist_patients
+
+
+async def bump_data_versions(db: AsyncSession, user_ids: Iterable[int], include_therapists: bool = False):
+    """
+    Sube la versión de los usuarios. Con include_therapists=True también la de sus
+    terapeutas (para cambios que se ven en el listado de pacientes del terapeuta).
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    condition = models.User.id.in_(user_ids)
+    if include_therapists:
+        condition = or_(
+            condition,
+            models.User.id.in_(
+                select(therapist_patients.c.therapist_id).where(therapist_patients.c.patient_id.in_(user_ids))
+            ),
+        )
+    await db.execute(
+        update(models.User)
+        .where(condition)
+        .values(data_version=models.User.data_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def read_data_versions(db: AsyncSession, user_id: int, include_therapists: bool = False) -> list[tuple[int, int]]:
+    """
+    [(id, versión)] del usuario y, si se pide, de sus terapeutas. Vacío si no existe.
+    """
+    condition = models.User.id == user_id
+    if include_therapists:
+        condition = or_(
+            condition,
+            models.User.id.in_(select(therapist_patients.c.therapist_id).where(therapist_patients.c.patient_id == user_id)),
+        )
+    rows = await db.execute(select(models.User.id, models.User.data_version).where(condition).order_by(models.User.id))
+    return [tuple(row) for row in rows]
+
+
+def make_etag(resource: str, versions: list[tuple[int, int]]) -> str:
+    # ETag fuerte: el mismo recurso (ruta y parámetros) con las mismas versiones da los mismos bytes
+    digest = hashlib.sha1(f"{resource}|{versions}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
@@ -0,0 +1,178 @@
+# en backend/app/core/event_broker.py
+# Avisos en tiempo real a los terapeutas: las escrituras de un paciente (dibujos,
+# conversaciones, avatares, perfil) publican un evento pequeño después del commit y el
+# broker lo reparte a los terapeutas de ese paciente que tengan abierto el feed
+# (GET /api/users/therapists/{id}/events). Así el panel no tiene que consultar cada poco.
+#
+# El reparto entre procesos lo hace un backend intercambiable (EVENT_BROKER_BACKEND):
+#   memory   - dentro del proceso; sirve con un solo worker
+#   postgres - LISTEN/NOTIFY de PostgreSQL; lo reciben todos los workers
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+
+load_dotenv()
+
+EVENT_BROKER_BACKEND = os.getenv("EVENT_BROKER_BACKEND", "memory")
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", 100))  # eventos pendientes por conexión
+POSTGRES_CHANNEL = "holo_patient_events"
+
+logger = logging.getLogger("holo.events")
+
+
+class MemoryBackend:
+    """
+    Entrega los eventos a los suscriptores del mismo proceso.
+    """
+    shared = False  # los demás procesos no reciben nada
+
+    async def start(self, deliver):
+        self._deliver = deliver
+
+    async def publish(self, event: dict):
+        self._deliver(event)
+
+    async def close(self):
+        pass
+
+
+class PostgresBackend:
+    """
+    NOTIFY en un canal de PostgreSQL; cada proceso escucha con su propia conexión (asyncpg).
+    """
+    shared = True
+
+    def __init__(self, url: str):
+        from sqlalchemy.engine import make_url
+
+        # asyncpg quiere la URL sin el "+asyncpg" de SQLAlchemy
+        self.dsn = make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, deliver):
+        import asyncpg
+
+        self._connection = await asyncpg.connect(self.dsn)
+        await self._connection.add_listener(POSTGRES_CHANNEL, lambda *args: deliver(json.loads(args[-1])))
+
+    async def publish(self, event: dict):
+        # Una conexión asyncpg no admite dos consultas a la vez
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", POSTGRES_CHANNEL, json.dumps(event))
+
+    async def close(self):
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class EventBroker:
+    """
+    Suscripciones por terapeuta. Cada conexión tiene su cola acotada: si un cliente no da
+    abasto, se vacía y recibe un evento "resync" para que vuelva a pedir los listados.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._published = 0
+        self._dropped = 0
+        self._started = False
+
+    async def start(self):
+        if not self._started:
+            await self.backend.start(self._deliver)
+            self._started = True
+
+    async def close(self):
+        # Despierta a los feeds abiertos para que terminen
+        for queues in self._subscribers.values():
+            for queue in queues:
+                _put_latest(queue, None)
+        await self.backend.close()
+        self._started = False
+
+    def subscribe(self, therapist_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self._subscribers.setdefault(therapist_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, therapist_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(therapist_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[therapist_id]
+
+    def _deliver(self, event: dict):
+        message = {key: value for key, value in event.items() if key != "therapists"}
+        for therapist_id in event["therapists"]:
+            for queue in self._subscribers.get(therapist_id, ()):
+                if queue.full():
+                    self._dropped += queue.qsize()
+                    _put_latest(queue, {"type": "resync"})
+                else:
+                    queue.put_nowait(message)
+
+    async def publish(self, db: AsyncSession, patient_id: int, event_type: str, **data):
+        """
+        Avisa a los terapeutas del paciente. Se llama después del commit y nunca falla:
+        un error al publicar solo se registra, la escritura ya está hecha.
+        """
+        if not self._started or (not self.backend.shared and not self._subscribers):
+            return  # nadie escuchando: ni siquiera se consulta quiénes son sus terapeutas
+        try:
+            therapists = (await db.scalars(
+                select(models.therapist_patients.c.therapist_id).where(models.therapist_patients.c.patient_id == patient_id)
+            )).all()
+            if not therapists:
+                return
+            event = {
+                "type": event_type,
+                "patient_id": patient_id,
+                "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                **data,
+                "therapists": therapists,
+            }
+            await self.backend.publish(event)
+            self._published += 1
+        except Exception:
+            logger.exception("Could not publish %s for patient %s", event_type, patient_id)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self._published,
+            "dropped": self._dropped,
+        }
+
+
+def _put_latest(queue: asyncio.Queue, item):
+    # Descarta lo pendiente y deja solo `item`
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+def _make_backend(name: str):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "postgres":
+        from ..database import ASYNC_DATABASE_URL
+
+        return PostgresBackend(ASYNC_DATABASE_URL)
+    raise ValueError(f"Unknown EVENT_BROKER_BACKEND {name!r}, expected 'memory' or 'postgres'")
+
+
+# Instancia global (una por proceso)
+event_broker = EventBroker(_make_backend(EVENT_BROKER_BACKEND))
@@ -0,0 +1,227 @@
+# en backend/app/core/jobs.py
+# Cola de trabajos duradera. Lo que una escritura no necesita para responder (p. ej. la
+# miniatura de un dibujo) se guarda como fila de `jobs` en el mismo commit que la propia
+# escritura, y lo ejecutan los workers (python -m app worker): procesos aparte que van
+# sacando trabajos de la tabla por prioridad. Si uno falla se reintenta más tarde, con
+# una espera que se duplica en cada intento; agotados los intentos queda como "failed".
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable
+
+from dotenv import load_dotenv
+from sqlalchemy import case, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import models
+from .thumbnails import ensure_thumbnail
+
+load_dotenv()
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", 10))  # 10 s, 20 s, 40 s...
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", 3600))
+# Un trabajo que lleva más que esto en "running" es de un worker que murió: vuelve a la cola
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", 600))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))  # espera cuando no hay trabajo
+
+THUMBNAIL_JOB = "drawing.thumbnail"
+
+logger = logging.getLogger("holo.jobs")
+
+
+def new_job(kind: str, payload: dict, priority: int = 0, delay: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> models.Job:
+    """
+    Trabajo para añadir a la sesión de la escritura que lo origina: se guarda con su commit
+    (o con write_queue.add(obj, jobs=...)). Con mayor `priority` se ejecuta antes.
+    """
+    return models.Job(
+        kind=kind, payload=payload, priority=priority, status="pending", attempts=0,
+        max_attempts=max_attempts, run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+
+
+def _drawing_thumbnail(payload: dict):
+    ensure_thumbnail(payload["image_hash"])
+
+
+# Qué hace cada tipo de trabajo (en el proceso del worker, fuera del bucle de eventos)
+HANDLERS: dict[str, Callable[[dict], None]] = {
+    THUMBNAIL_JOB: _drawing_thumbnail,
+}
+
+
+def retry_delay(attempts: int) -> float:
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)  # que los fallos de una misma caída no vuelvan a la vez
+
+
+def requeue_stale(engine) -> int:
+    """
+    Devuelve a la cola los trabajos que un worker dejó a medias (o los da por fallidos si
+    ya no les quedan intentos). Devuelve cuántos había.
+    """
+    jobs = models.Job.__table__
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+    with engine.begin() as conn:
+        result = conn.execute(
+            jobs.update()
+            .where(jobs.c.status == "running", jobs.c.locked_at < cutoff)
+            .values(
+                status=case((jobs.c.attempts >= jobs.c.max_attempts, "failed"), else_="pending"),
+                locked_by=None, locked_at=None, last_error="Worker lost while running the job",
+            )
+        )
+    return result.rowcount
+
+
+class JobWorker:
+    """
+    Ejecuta los trabajos de uno en uno con el motor síncrono. Varios workers pueden
+    compartir la tabla: cada trabajo lo reserva uno solo (status "running").
+    """
+
+    def __init__(self, engine, name: str | None = None, handlers: dict = HANDLERS):
+        self.engine = engine
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.handlers = handlers
+        self.done = 0
+        self.failed = 0
+
+    def _claim(self):
+        jobs = models.Job.__table__
+        now = datetime.utcnow()
+        ready = (jobs.c.status == "pending", jobs.c.run_at <= now)
+        # Primero solo se mira: en SQLite el UPDATE toma el bloqueo de escritura aunque no encuentre nada
+        with self.engine.connect() as conn:
+            if conn.scalar(select(jobs.c.id).where(*ready).limit(1)) is None:
+                return None
+        next_id = select(jobs.c.id).where(*ready).order_by(jobs.c.priority.desc(), jobs.c.run_at, jobs.c.id).limit(1)
+        if self.engine.dialect.name == "postgresql":
+            next_id = next_id.with_for_update(skip_locked=True)  # no esperar al que está reservando otro worker
+        with self.engine.begin() as conn:
+            return conn.execute(
+                jobs.update()
+                .where(jobs.c.id == next_id.scalar_subquery(), jobs.c.status == "pending")
+                .values(status="running", locked_by=self.name, locked_at=now, attempts=jobs.c.attempts + 1)
+                .returning(jobs.c.id, jobs.c.kind, jobs.c.payload, jobs.c.attempts, jobs.c.max_attempts)
+            ).first()
+
+    def _finish(self, job, error: str | None):
+        jobs = models.Job.__table__
+        with self.engine.begin() as conn:
+            if error is None:
+                conn.execute(jobs.delete().where(jobs.c.id == job.id))
+            elif job.attempts >= job.max_attempts:
+                conn.execute(
+                    jobs.update().where(jobs.c.id == job.id)
+                    .values(status="failed", locked_by=None, locked_at=None, last_error=error)
+                )
+            else:
+                conn.execute(
+                    jobs.update().where(jobs.c.id == job.id).values(
+                        status="pending", locked_by=None, locked_at=None, last_error=error,
+                        run_at=datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts)),
+                    )
+                )
+
+    def run_once(self) -> bool:
+        """
+        Ejecuta el siguiente trabajo pendiente. Devuelve False si no había ninguno.
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        start = time.perf_counter()
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise LookupError(f"No handler for job kind {job.kind!r}")
+            handler(job.payload)
+        except Exception as exc:
+            self.failed += 1
+            logger.warning("Job %s (%s) failed, attempt %s of %s", job.id, job.kind, job.attempts, job.max_attempts, exc_info=True)
+            self._finish(job, "".join(traceback.format_exception_only(exc)).strip())
+        else:
+            self.done += 1
+            logger.info("Job %s (%s) done in %.1f ms", job.id, job.kind, (time.perf_counter() - start) * 1000)
+            self._finish(job, None)
+        return True
+
+    def run(self, stop, poll_interval: float = JOB_POLL_INTERVAL):
+        """
+        Saca trabajos hasta que se activa `stop` (un Event); el trabajo en curso se termina.
+        """
+        while not stop.is_set():
+            try:
+                if not self.run_once():
+                    stop.wait(poll_interval)
+            except SQLAlchemyError:
+                # Base de datos caída o bloqueada: se reintenta en el siguiente ciclo
+                logger.exception("Job worker %s could not reach the database", self.name)
+                stop.wait(poll_interval)
+
+
+def _stop_on_signal(stop: threading.Event, signums):
+    # set() toma el lock del Event, que el hilo principal puede tener cogido dentro de
+    # wait() justo cuando llega la señal: se hace desde otro hilo para no bloquearse
+    for signum in signums:
+        signal.signal(signum, lambda *_: threading.Thread(target=stop.set).start())
+
+
+def _worker_process(poll_interval: float, log_level: str):
+    # Ctrl+C llega a todo el grupo de procesos: quien decide parar es el supervisor (con SIGTERM)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    stop = threading.Event()
+    _stop_on_signal(stop, (signal.SIGTERM,))
+    logging.basicConfig(level=log_level, format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    from ..database import engine
+
+    JobWorker(engine).run(stop, poll_interval)
+
+
+def run_workers(processes: int, poll_interval: float = JOB_POLL_INTERVAL, log_level: str = "INFO"):
+    """
+    Supervisor de `processes` workers: reinicia los que terminan de forma inesperada y
+    recupera los trabajos de los que murieron a medias. Con SIGTERM o Ctrl+C cada worker
+    acaba su trabajo en curso y sale.
+    """
+    from ..database import engine
+
+    # spawn: procesos nuevos, sin las conexiones abiertas de este
+    context = multiprocessing.get_context("spawn")
+
+    def start():
+        process = context.Process(target=_worker_process, args=(poll_interval, log_level), name="holo-worker")
+        process.start()
+        return process
+
+    # Cada proceso para con su propio Event: uno compartido se queda bloqueado si muere un worker que lo esperaba
+    stop = threading.Event()
+    _stop_on_signal(stop, (signal.SIGINT, signal.SIGTERM))
+    children = [start() for _ in range(processes)]
+    next_requeue = 0.0
+    while not stop.is_set():
+        if time.monotonic() >= next_requeue:
+            try:
+                if requeued := requeue_stale(engine):
+                    logger.warning("Requeued %s jobs left running by lost workers", requeued)
+            except SQLAlchemyError:
+                logger.exception("Could not requeue stale jobs")
+            next_requeue = time.monotonic() + JOB_LOCK_TIMEOUT_SECONDS / 2
+        for index, child in enumerate(children):
+            if not child.is_alive():
+                logger.warning("Job worker %s exited with code %s, restarting it", child.pid, child.exitcode)
+                children[index] = start()
+        stop.wait(1)
+    for child in children:
+        child.terminate()  # SIGTERM: termina el trabajo en curso
+    for child in children:
+        child.join()
@@ -0,0 +1,99 @@
+# en backend/app/core/password_pool.py
+# Pool de procesos dedicado a bcrypt: el hash (~250 ms de CPU) no ocupa los hilos
+# compartidos de Starlette y, si hay demasiadas peticiones en cola, se rechazan rápido.
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+from passlib.context import CryptContext
+
+load_dotenv()
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", PASSWORD_HASH_WORKERS * 8))  # máx. peticiones en vuelo
+PASSWORD_HASH_RETRY_AFTER = int(os.getenv("PASSWORD_HASH_RETRY_AFTER", 1))  # segundos
+
+# Este módulo se importa también en los procesos del pool: solo depende de passlib
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPoolBusy(Exception):
+    """
+    El pool está lleno; el endpoint responde 503 con Retry-After.
+    """
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_QUEUE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: no se hereda por fork el estado del servidor (bucle de eventos, conexiones, hilos)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.in_flight >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolBusy()
+            self.in_flight += 1
+            executor = self._get_executor()
+        start = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.total_seconds += elapsed
+                self.max_seconds = max(self.max_seconds, elapsed)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_latency_ms": round(1000 * self.total_seconds / self.completed, 2) if self.completed else 0.0,
+                "max_latency_ms": round(1000 * self.max_seconds, 2),
+            }
+
+
+password_pool = PasswordHashPool()
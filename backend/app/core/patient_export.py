@@ -0,0 +1,177 @@
+# en backend/app/core/patient_export.py
+# Exportación del historial completo de un paciente (perfil, dibujos, avatares y
+# conversaciones) como NDJSON o ZIP. Se recorre la base de datos con cursores de
+# servidor (yield_per) y se emite por trozos: la memoria no crece con el historial.
+import asyncio
+import io
+import json
+import logging
+import mimetypes
+import zipfile
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.orm import defer, selectinload
+
+from .. import models, schemas
+from ..database import AsyncSessionLocal
+from .blob_store import blob_store, decode_image_data
+
+EXPORT_FORMATS = ("ndjson", "zip")
+EXPORT_BATCH_SIZE = 100   # filas por viaje al servidor
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Orden de las secciones; el cursor "<sección>:<id>" reanuda justo después de ese elemento
+SECTIONS = ("profile", "drawings", "avatars", "conversations")
+
+logger = logging.getLogger("holo.export")
+
+
+def parse_cursor(cursor: str | None) -> tuple[int, int]:
+    """
+    Devuelve (índice de la sección, último id exportado). Lanza ValueError si no es válido.
+    """
+    if not cursor:
+        return 0, 0
+    section, sep, last_id = cursor.partition(":")
+    if not sep or section not in SECTIONS or not last_id.isdigit():
+        raise ValueError("Invalid cursor")
+    return SECTIONS.index(section), int(last_id)
+
+
+def _section_start(section: str, cursor: tuple[int, int]) -> int | None:
+    # None: la sección ya se exportó entera; si no, el id a partir del cual seguir
+    index = SECTIONS.index(section)
+    if index < cursor[0]:
+        return None
+    return cursor[1] if index == cursor[0] else 0
+
+
+async def _records(db, patient_id: int, cursor: tuple[int, int]) -> AsyncIterator[tuple[str, str, dict]]:
+    """
+    Genera (sección, cursor, datos) en el orden de SECTIONS.
+    """
+    if _section_start("profile", cursor) == 0:
+        user = await db.scalar(
+            select(models.User)
+            .options(selectinload(models.User.patient_profile), selectinload(models.User.psychologist_profile))
+            .where(models.User.id == patient_id)
+        )
+        if user is not None:
+            yield "profile", "profile:1", schemas.UserReadWithProfile.model_validate(user).model_dump(mode="json")
+
+    sections = (
+        ("drawings", models.PatientDrawing, schemas.DrawingRead, (defer(models.PatientDrawing.image_data),)),
+        ("avatars", models.PatientAvatar, schemas.AvatarRead, ()),
+        ("conversations", models.ConversationLog, schemas.ConversationLogRead, (selectinload(models.ConversationLog.turns),)),
+    )
+    for section, model, schema, options in sections:
+        after_id = _section_start(section, cursor)
+        if after_id is None:
+            continue
+        result = await db.stream_scalars(
+            select(model)
+            .options(*options)
+            .where(model.patient_id == patient_id, model.id > after_id)
+            .order_by(model.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for item in result:
+            yield section, f"{section}:{item.id}", schema.model_validate(item).model_dump(mode="json")
+            db.expunge(item)  # no acumular filas en el identity map de la sesión
+
+
+async def export_ndjson(patient_id: int, cursor: str | None = None) -> AsyncIterator[bytes]:
+    """
+    Una línea JSON por elemento: {"type": ..., "cursor": ..., "data": {...}}.
+    Las imágenes no van en línea: cada dibujo trae su image_url.
+    """
+    start = parse_cursor(cursor)
+    async with AsyncSessionLocal() as db:
+        async for section, item_cursor, data in _records(db, patient_id, start):
+            line = {"type": section, "cursor": item_cursor, "data": data}
+            yield (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class _ChunkBuffer(io.RawIOBase):
+    # Destino no "seekable" para ZipFile: lo que se escribe se recoge y se emite por trozos
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _image_name(drawing_id: int, mime: str | None) -> str:
+    extension = mimetypes.guess_extension(mime or "") or ".bin"
+    return f"drawings/{drawing_id}{extension}"
+
+
+async def export_zip(patient_id: int, cursor: str | None = None) -> AsyncIterator[bytes]:
+    """
+    ZIP con profile.json, <sección>.ndjson (mismo formato que export_ndjson) y las
+    imágenes de los dibujos como ficheros binarios en drawings/<id>.<ext>.
+    """
+    start = parse_cursor(cursor)
+    buffer = _ChunkBuffer()
+    archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED)
+    async with AsyncSessionLocal() as db:
+        entry, entry_section = None, None
+        async for section, item_cursor, data in _records(db, patient_id, start):
+            if section != entry_section:
+                if entry is not None:
+                    entry.close()
+                name = "profile.json" if section == "profile" else f"{section}.ndjson"
+                entry, entry_section = archive.open(name, mode="w"), section
+            line = {"type": section, "cursor": item_cursor, "data": data}
+            entry.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+            yield buffer.drain()
+        if entry is not None:
+            entry.close()
+
+        # Segunda pasada por los dibujos para copiar las imágenes (una entrada abierta a la vez)
+        after_id = _section_start("drawings", start)
+        if after_id is not None:
+            rows = await db.stream(
+                select(models.PatientDrawing.id, models.PatientDrawing.image_hash, models.PatientDrawing.image_mime)
+                .where(models.PatientDrawing.patient_id == patient_id, models.PatientDrawing.id > after_id)
+                .order_by(models.PatientDrawing.id)
+                .execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            async for drawing_id, image_hash, image_mime in rows:
+                if image_hash and blob_store.exists(image_hash):
+                    with archive.open(_image_name(drawing_id, image_mime), mode="w") as target, \
+                            open(blob_store.path_for(image_hash), "rb") as source:
+                        while chunk := await asyncio.to_thread(source.read, FILE_CHUNK_SIZE):
+                            target.write(chunk)
+                            yield buffer.drain()
+                    continue
+                # Fila antigua que aún guarda el base64 en la tabla
+                image_data = await db.scalar(
+                    select(models.PatientDrawing.image_data).where(models.PatientDrawing.id == drawing_id)
+                )
+                if image_data:
+                    try:
+                        data, mime_type = decode_image_data(image_data)
+                    except ValueError:
+                        # La migración 0002 deja estas filas tal cual: el dibujo sale en el NDJSON, sin imagen
+                        logger.warning("Drawing %s has undecodable image data, exported without image", drawing_id)
+                        continue
+                    archive.writestr(_image_name(drawing_id, mime_type), data)
+                    yield buffer.drain()
+
+    archive.close()
+    yield buffer.drain()
+
+
+EXPORTERS = {"ndjson": export_ndjson, "zip": export_zip}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "zip": "application/zip"}
@@ -0,0 +1,126 @@
+# en backend/app/core/phrase_catalog.py
+# Catálogo de frases TCA en memoria: se carga una vez por proceso y evita
+# el ORDER BY random() contra la base de datos en cada turno de conversación.
+# Cada PHRASE_CATALOG_TTL segundos se compara una huella barata (número de frases e id
+# máximo) para ver frases añadidas por el seed, una migración u otro worker.
+import os
+import random
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import models
+from ..database import AsyncSessionLocal
+
+load_dotenv()
+
+FALLBACK_TCA_TYPE = "general"
+MAX_SESSIONS = 10000  # sesiones recordadas para no repetir frases (LRU)
+PHRASE_CATALOG_TTL = float(os.getenv("PHRASE_CATALOG_TTL", 30))  # segundos entre comprobaciones
+
+
+class PhraseCatalog:
+    def __init__(self, ttl: float = PHRASE_CATALOG_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0          # se incrementa cuando este proceso cambia las frases
+        self._loaded_version = -1
+        self._fingerprint: tuple[int, int | None] | None = None  # (frases, id máximo) de la última carga
+        self._checked_at = 0.0
+        # tca_type -> (ids, frases), en arrays compactos indexados por posición
+        self._by_type: dict[str, tuple[array, tuple[str, ...]]] = {}
+        # (session_id, tca_type) -> (tamaño de la baraja, posiciones pendientes barajadas)
+        self._sessions: OrderedDict[tuple[str, str], tuple[int, list[int]]] = OrderedDict()
+
+    @property
+    def is_stale(self) -> bool:
+        # Un catálogo vacío siempre está obsoleto: las frases pueden llegar desde otro proceso
+        return (
+            self._loaded_version != self._version
+            or not self._by_type
+            or time.monotonic() - self._checked_at >= self.ttl
+        )
+
+    def invalidate(self):
+        """
+        Marca el catálogo como obsoleto en este proceso; se recarga en la siguiente petición.
+        Los demás procesos lo notan al comprobar la huella (como mucho tras PHRASE_CATALOG_TTL).
+        """
+        with self._lock:
+            self._version += 1
+
+    async def load(self, db: AsyncSession):
+        version = self._version
+        rows = (await db.execute(
+            select(models.TcaPhrase.id, models.TcaPhrase.tca_type, models.TcaPhrase.phrase).order_by(models.TcaPhrase.id)
+        )).all()
+        grouped: dict[str, tuple[list[int], list[str]]] = {}
+        for phrase_id, tca_type, phrase in rows:
+            ids, phrases = grouped.setdefault(tca_type, ([], []))
+            ids.append(phrase_id)
+            phrases.append(phrase)
+        with self._lock:
+            self._by_type = {t: (array("i", ids), tuple(phrases)) for t, (ids, phrases) in grouped.items()}
+            self._loaded_version = version
+            self._fingerprint = (len(rows), rows[-1][0] if rows else None)
+            self._checked_at = time.monotonic()
+            self._sessions.clear()
+
+    async def refresh(self, db: AsyncSession):
+        """
+        Recarga el catálogo solo si su huella ha cambiado (o si está vacío o invalidado).
+        """
+        if self._loaded_version == self._version and self._by_type:
+            # Mientras se comprueba, las demás peticiones siguen usando el catálogo actual
+            self._checked_at = time.monotonic()
+            count, max_id = (await db.execute(select(func.count(), func.max(models.TcaPhrase.id)))).one()
+            if (count, max_id) == self._fingerprint:
+                return
+        await self.load(db)
+
+    async def ensure_loaded(self):
+        # Solo se abre sesión cuando toca comprobar: el caso normal no usa la base de datos
+        if self.is_stale:
+            async with AsyncSessionLocal() as db:
+                await self.refresh(db)
+
+    def sample(self, tca_type: str, session_id: str | None = None) -> dict | None:
+        """
+        Devuelve una frase aleatoria del tipo pedido (o de 'general' si no hay ninguna).
+        Con session_id no se repite ninguna frase hasta haber oído todas las de ese tipo.
+        """
+        by_type = self._by_type
+        if tca_type not in by_type:
+            tca_type = FALLBACK_TCA_TYPE
+        entry = by_type.get(tca_type)
+        if not entry:
+            return None
+        ids, phrases = entry
+
+        if session_id is None:
+            index = random.randrange(len(ids))
+        else:
+            index = self._next_for_session(session_id, tca_type, len(ids))
+        return {"id": ids[index], "tca_type": tca_type, "phrase": phrases[index]}
+
+    def _next_for_session(self, session_id: str, tca_type: str, size: int) -> int:
+        key = (session_id, tca_type)
+        with self._lock:
+            deck_size, remaining = self._sessions.pop(key, (size, []))
+            if deck_size != size or not remaining:
+                # Nueva baraja: una permutación por ciclo, así cada frase sale en O(1)
+                remaining = list(range(size))
+                random.shuffle(remaining)
+            index = remaining.pop()
+            self._sessions[key] = (size, remaining)
+            while len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+        return index
+
+
+phrase_catalog = PhraseCatalog()
@@ -0,0 +1,103 @@
+# en backend/app/core/principal_cache.py
+# Caché del usuario autenticado: evita ir a la base de datos en cada petición con token.
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 300))  # segundos
+
+
+class Principal:
+    """
+    Lo mínimo del usuario que necesita la autenticación (sin avatar ni perfiles completos).
+    """
+    __slots__ = ("id", "email", "role", "patient_profile_id", "psychologist_profile_id")
+
+    def __init__(self, id: int, email: str, role: str, patient_profile_id: int | None = None, psychologist_profile_id: int | None = None):
+        self.id = id
+        self.email = email
+        self.role = role
+        self.patient_profile_id = patient_profile_id
+        self.psychologist_profile_id = psychologist_profile_id
+
+    def __repr__(self):
+        return f"Principal(id={self.id}, email={self.email!r}, role={self.role!r})"
+
+
+class PrincipalCache:
+    """
+    LRU acotada con caducidad (TTL), indexada por el 'sub' del token (el email).
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._subject_by_user_id: dict[int, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, subject: str) -> Principal | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    self._remove(subject)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, subject: str, principal: Principal):
+        with self._lock:
+            if subject in self._entries:
+                self._remove(subject)
+            self._entries[subject] = (time.monotonic() + self.ttl, principal)
+            self._subject_by_user_id[principal.id] = subject
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *user_ids: int):
+        """
+        Descarta los usuarios indicados; se llama desde las funciones crud que los modifican.
+        """
+        with self._lock:
+            for user_id in user_ids:
+                subject = self._subject_by_user_id.get(user_id)
+                if subject is not None:
+                    self._remove(subject)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._subject_by_user_id.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, subject: str):
+        _, principal = self._entries.pop(subject)
+        if self._subject_by_user_id.get(principal.id) == subject:
+            del self._subject_by_user_id[principal.id]
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,59 @@
+# en backend/app/core/schema_check.py
+# Comprobación rápida al arrancar: la base de datos tiene que estar en la última
+# migración de Alembic. El esquema lo gestiona solo `alembic upgrade head`.
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+load_dotenv()
+
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "strict")  # strict: no arranca | warn: solo avisa | off
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+logger = logging.getLogger("holo.schema")
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def expected_revisions() -> set[str]:
+    # Lee solo las cabeceras de los ficheros de alembic/versions, sin conectarse a la base de datos.
+    # Alembic se importa aquí y no al cargar el módulo: solo hace falta al arrancar.
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+async def current_revisions(engine) -> set[str]:
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return set(result.scalars())
+    except (OperationalError, ProgrammingError):
+        return set()  # base de datos vacía o creada antes de usar Alembic
+
+
+async def check_schema(engine, mode: str = SCHEMA_CHECK):
+    """
+    Lanza SchemaOutOfDate (o solo lo registra, con mode="warn") si la base de datos
+    no está en la última revisión.
+    """
+    if mode == "off":
+        return
+    current, expected = await current_revisions(engine), expected_revisions()
+    if current == expected:
+        return
+    message = (
+        f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+        f"expected {', '.join(sorted(expected))}. Run `alembic upgrade head`."
+    )
+    if mode == "warn":
+        logger.warning(message)
+        return
+    raise SchemaOutOfDate(message)
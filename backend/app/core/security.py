@@ -6,20 +6,19 @@ from dotenv import load_dotenv
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
 
 # Usamos importaciones absolutas desde 'app' para más claridad
 from .. import crud, models, schemas
-from ..database import get_db
+from ..database import AsyncSessionLocal
+from .principal_cache import Principal, principal_cache
+from .password_pool import pwd_context
 
 
 # Cargar variables de entorno desde .env
 load_dotenv()
 
 # --- Hashing de Contraseñas ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# Versiones síncronas (seed, scripts). En los endpoints usa password_pool (core/password_pool.py).
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -46,7 +45,9 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 # --- Dependencia para obtener el usuario actual ---
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+# Devuelve un Principal (id, email, rol, ids de perfil) desde la caché; solo consulta la
+# base de datos (con su propia sesión) si no está en caché. Si necesitas el User completo, cárgalo con crud.get_user.
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -62,8 +63,11 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    user = crud.get_user_by_email(db, email=token_data.sub)
-    
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get(token_data.sub)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            principal = await crud.get_principal_by_email(db, email=token_data.sub)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.put(token_data.sub, principal)
+    return principal
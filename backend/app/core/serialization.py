@@ -0,0 +1,21 @@
+# en backend/app/core/serialization.py
+# Vía rápida para respuestas grandes. Si el endpoint devuelve objetos, FastAPI los valida
+# con su response_model, los convierte a dicts y listas y después los codifica a JSON.
+# Aquí un TypeAdapter creado una sola vez (al importar el router) valida y escribe el JSON
+# directamente en pydantic-core, sin pasos intermedios en Python.
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(adapter: TypeAdapter, content, response: Response | None = None) -> Response:
+    """
+    Respuesta JSON con `content` (objetos ORM, dicts o modelos) serializado según `adapter`.
+    `response` es la respuesta de la petición: se copian las cabeceras que le hayan puesto
+    las dependencias (p. ej. el ETag de conditional_get), que FastAPI no añade por su cuenta
+    cuando el endpoint devuelve su propia Response.
+    """
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    result = Response(content=body, media_type="application/json")
+    if response is not None:
+        result.headers.raw.extend(response.headers.raw)
+    return result
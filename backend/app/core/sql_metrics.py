@@ -0,0 +1,238 @@
+# en backend/app/core/sql_metrics.py
+# Instrumentación por petición: cuántas sentencias SQL lanza cada ruta, cuánto tiempo
+# pasa en la base de datos y cuánto espera por una conexión del pool. Sirve para
+# detectar regresiones N+1 y falta de conexiones sin activar echo=True.
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+load_dotenv()
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000)
+
+slow_query_logger = logging.getLogger("holo.slow_query")
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "db_seconds", "slowest_seconds", "slowest_sql", "pool_wait_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_sql = None
+        self.pool_wait_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # FastAPI deja la ruta resuelta en el scope: agrupamos por plantilla, no por URL
+        route = self.scope.get("route")
+        if route is None:
+            return "unmatched"
+        return f"{self.scope['method']} {route.path}"
+
+
+# Estadísticas de la petición en curso (None fuera de una petición, p. ej. en la cola del escritor)
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # el último es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        # Cubos acumulados, como en Prometheus ("le" = menor o igual que)
+        cumulative, total = {}, 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            cumulative[str(bound)] = total
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": cumulative}
+
+
+class SQLMetrics:
+    """
+    Histogramas de latencia y de número de sentencias por plantilla de ruta
+    (p. ej. "GET /api/users/{user_id}/dashboard") y de espera por conexión del pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict[str, dict[str, Histogram]] = {}
+        self._slowest: dict[str, dict] = {}  # sentencia más lenta vista en cada ruta
+        self.pool_wait_ms = Histogram(POOL_WAIT_BUCKETS_MS)
+        self.slow_queries = 0
+
+    def observe_request(self, stats: RequestStats, elapsed_ms: float):
+        with self._lock:
+            route = self._routes.get(stats.route)
+            if route is None:
+                route = self._routes[stats.route] = {
+                    "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+                    "db_ms": Histogram(LATENCY_BUCKETS_MS),
+                    "statements": Histogram(STATEMENT_BUCKETS),
+                }
+            route["latency_ms"].observe(elapsed_ms)
+            route["db_ms"].observe(stats.db_seconds * 1000)
+            route["statements"].observe(stats.statements)
+            slowest = self._slowest.get(stats.route)
+            if stats.slowest_sql and (slowest is None or stats.slowest_seconds * 1000 > slowest["ms"]):
+                self._slowest[stats.route] = {"ms": round(stats.slowest_seconds * 1000, 3), "sql": normalize_sql(stats.slowest_sql)}
+
+    def observe_pool_wait(self, seconds: float):
+        with self._lock:
+            self.pool_wait_ms.observe(seconds * 1000)
+
+    def observe_slow_query(self):
+        with self._lock:
+            self.slow_queries += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "routes": {
+                    name: {**{key: h.to_dict() for key, h in hists.items()}, "slowest_statement": self._slowest.get(name)}
+                    for name, hists in sorted(self._routes.items())
+                },
+                "pool_wait_ms": self.pool_wait_ms.to_dict(),
+                "slow_queries": self.slow_queries,
+                "slow_query_threshold_ms": SLOW_QUERY_MS,
+            }
+
+
+sql_metrics = SQLMetrics()
+
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAM_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def normalize_sql(statement: str) -> str:
+    # Quita literales y colapsa las listas IN (?, ?, ...) para agrupar consultas iguales
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _PARAM_LIST.sub("(?, ...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        if elapsed > stats.slowest_seconds:
+            stats.slowest_seconds = elapsed
+            stats.slowest_sql = statement
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        sql_metrics.observe_slow_query()
+        slow_query_logger.warning(
+            "slow query %.1f ms route=%s sql=%s",
+            elapsed * 1000, stats.route if stats else "-", normalize_sql(statement),
+        )
+
+
+def _handle_error(exception_context):
+    # Una sentencia que falla no llega a after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine):
+    """
+    Registra los eventos en un Engine síncrono (para un AsyncEngine, su .sync_engine).
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def record_pool_wait(seconds: float):
+    stats = current_request.get()
+    if stats is not None:
+        stats.pool_wait_seconds += seconds
+    sql_metrics.observe_pool_wait(seconds)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool que mide cuánto se espera al pedir una conexión (incluido abrirla si hay hueco).
+    Se mide aquí y no en la sesión: así solo cuenta cuando la petición usa de verdad la base de datos.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            record_pool_wait(time.perf_counter() - start)
+
+
+class SQLTimingMiddleware:
+    """
+    Middleware ASGI que abre las estadísticas de cada petición HTTP, añade la cabecera
+    Server-Timing a la respuesta y alimenta los histogramas por ruta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - start).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            sql_metrics.observe_request(stats, (time.perf_counter() - start) * 1000)
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    metrics = [
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"',
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.1f}",
+        f"db-pool;dur={stats.pool_wait_seconds * 1000:.1f}",
+        f"app;dur={elapsed * 1000:.1f}",
+    ]
+    return ", ".join(metrics)
@@ -0,0 +1,249 @@
+# en backend/app/core/synthetic_data.py
+# Clínica sintética para pruebas de carga: terapeutas, pacientes con su perfil, dibujos
+# (imágenes reales en el blob store) y conversaciones con transcripts de tamaño realista.
+# Se inserta por lotes (executemany) con el motor síncrono, sin pasar por la API.
+import io
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Iterator
+
+from sqlalchemy import func, insert, select, text
+
+from .. import models
+from ..models.conversation_log import join_turns
+from .blob_store import blob_store
+from .password_pool import pwd_context
+
+# Todos los usuarios sintéticos comparten contraseña (un único hash bcrypt)
+SYNTHETIC_PASSWORD = "synthetic"
+THERAPIST_EMAIL = "synthetic-t{}@example.com"
+PATIENT_EMAIL = "synthetic-p{}@example.com"
+
+IMAGE_POOL_SIZE = 24  # dibujos distintos; el blob store guarda cada uno una sola vez
+TURN_SESSION_RATIO = 0.2  # parte de las conversaciones que son sesiones por turnos
+HISTORY_DAYS = 730
+
+FIRST_NAMES = (
+    "Lucía", "Martina", "Sofía", "Julia", "Paula", "Valeria", "Daniela", "Alba", "Carla", "Noa",
+    "Hugo", "Martín", "Lucas", "Mateo", "Leo", "Daniel", "Pablo", "Álvaro", "Adrián", "Manuel",
+)
+SURNAMES = (
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez", "Martín",
+    "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Muñoz", "Álvarez", "Romero", "Alonso", "Gutiérrez",
+)
+CENTERS = ("Hospital Clínico", "Centro de Salud Norte", "Unidad TCA Sur", "Clínica del Parque", "Hospital General")
+SPECIALTIES = ("Psicología clínica", "Trastornos de la conducta alimentaria", "Psicología infantil", "Psiquiatría")
+TREATMENTS = ("Anorexia nerviosa", "Bulimia nerviosa", "Trastorno por atracón", "TCA no especificado")
+TCA_TYPES = ("anorexia", "bulimia", "general")
+AI_LINES = (
+    "You shouldn't eat that, it has too many calories.",
+    "Skipping one meal isn't a big deal, it will help you compensate.",
+    "No one has to know. You can make up for it later.",
+    "Everyone is staring at your body.",
+    "You can start over tomorrow, today doesn't count.",
+    "These clothes don't fit you well, they highlight your flaws.",
+)
+PATIENT_LINES = (
+    "That's not true, I need to eat to feel well and have energy for the day.",
+    "I'm not going to listen to you today. My body deserves care and food.",
+    "I know this thought comes from the disorder, not from me.",
+    "I had lunch with my family and I felt calm for most of the meal.",
+    "It was hard, but I finished the plate and talked about it with my therapist.",
+    "I'll write down how I feel instead of doing what you say.",
+)
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def draw_image(rng: random.Random) -> bytes:
+    # Trazos al azar sobre un lienzo del tamaño del de la app, en WebP como lo sube el frontend
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (800, 600), "white")
+    canvas = ImageDraw.Draw(image)
+    for _ in range(rng.randint(20, 60)):
+        color = tuple(rng.randrange(256) for _ in range(3))
+        points = [(rng.randrange(800), rng.randrange(600)) for _ in range(rng.randint(3, 12))]
+        canvas.line(points, fill=color, width=rng.randint(2, 18), joint="curve")
+    out = io.BytesIO()
+    image.save(out, format="WEBP", quality=90)
+    return out.getvalue()
+
+
+def _image_pool(rng: random.Random) -> list[tuple[str, int]]:
+    pool = []
+    for _ in range(IMAGE_POOL_SIZE):
+        data = draw_image(rng)
+        pool.append((blob_store.put(data), len(data)))
+    return pool
+
+
+def _transcript_lines(rng: random.Random) -> list[tuple[str, str]]:
+    lines = []
+    for _ in range(rng.randint(6, 30)):
+        lines.append(("ai", rng.choice(AI_LINES)))
+        lines.append(("patient", " ".join(rng.sample(PATIENT_LINES, rng.randint(1, 3)))))
+    return lines
+
+
+class _Ids:
+    # Ids explícitos a partir del máximo actual de cada tabla: así las filas hijas pueden
+    # referirse a las padres sin leer lo insertado
+    def __init__(self, conn, tables):
+        self.next = {table.name: (conn.scalar(select(func.max(table.c.id))) or 0) + 1 for table in tables}
+
+    def take(self, table, count: int) -> range:
+        start = self.next[table.name]
+        self.next[table.name] = start + count
+        return range(start, start + count)
+
+
+def generate_clinic(
+    engine,
+    therapists: int,
+    patients: int,
+    drawings_per_patient: int,
+    logs_per_patient: int,
+    seed: int = 0,
+    batch_size: int = 5000,
+    progress: Callable[[str], None] = print,
+) -> dict:
+    """
+    Añade a la base de datos de `engine` una clínica sintética. Cada paciente tiene un
+    terapeuta (uno de cada diez, dos) y de media los dibujos y conversaciones indicados.
+    Se puede repetir: los usuarios nuevos se numeran a continuación de los que ya haya.
+    Devuelve cuántas filas se han creado en cada tabla.
+    """
+    rng = random.Random(seed)
+    users, drawings = models.User.__table__, models.PatientDrawing.__table__
+    logs, turns = models.ConversationLog.__table__, models.ConversationTurn.__table__
+    patient_profiles, psychologist_profiles = models.PatientProfile.__table__, models.PsychologistProfile.__table__
+    counts = dict.fromkeys(("users", "therapist_patients", "patient_drawings", "conversation_logs", "conversation_turns"), 0)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    def insert_all(table, rows: Iterable[dict]):
+        counts.setdefault(table.name, 0)
+        for batch in _batches(rows, batch_size):
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            counts[table.name] += len(batch)
+        progress(f"{table.name}: {counts[table.name]}")
+
+    with engine.connect() as conn:
+        ids = _Ids(conn, (users, patient_profiles, psychologist_profiles, drawings, logs, turns))
+        first_therapist = conn.scalar(select(func.count()).where(users.c.email.like(THERAPIST_EMAIL.format("%")))) + 1
+        first_patient = conn.scalar(select(func.count()).where(users.c.email.like(PATIENT_EMAIL.format("%")))) + 1
+
+    hashed_password = pwd_context.hash(SYNTHETIC_PASSWORD)
+    therapist_ids = ids.take(users, therapists)
+    patient_ids = ids.take(users, patients)
+
+    def user_rows():
+        for number, user_id in enumerate(therapist_ids, first_therapist):
+            yield {
+                "id": user_id, "email": THERAPIST_EMAIL.format(number), "hashed_password": hashed_password,
+                "role": "psychologist", "name": rng.choice(FIRST_NAMES), "surname": rng.choice(SURNAMES),
+                "center": rng.choice(CENTERS), "phone": f"6{rng.randrange(10**8):08d}", "data_version": 0,
+            }
+        for number, user_id in enumerate(patient_ids, first_patient):
+            yield {
+                "id": user_id, "email": PATIENT_EMAIL.format(number), "hashed_password": hashed_password,
+                "role": "patient", "name": rng.choice(FIRST_NAMES), "surname": f"{rng.choice(SURNAMES)} {rng.choice(SURNAMES)}",
+                "center": rng.choice(CENTERS), "phone": f"6{rng.randrange(10**8):08d}", "data_version": 0,
+            }
+
+    insert_all(users, user_rows())
+    insert_all(psychologist_profiles, (
+        {"id": profile_id, "user_id": user_id, "specialty": rng.choice(SPECIALTIES)}
+        for profile_id, user_id in zip(ids.take(psychologist_profiles, therapists), therapist_ids)
+    ))
+    insert_all(patient_profiles, (
+        {
+            "id": profile_id, "user_id": user_id, "treatment": rng.choice(TREATMENTS),
+            "gender": rng.choice(("female", "male", "other")),
+            "birthdate": (now - timedelta(days=rng.randint(12 * 365, 40 * 365))).date(),
+            "notes": " ".join(rng.sample(PATIENT_LINES, 3)), "last_tca_type": rng.choice(TCA_TYPES),
+        }
+        for profile_id, user_id in zip(ids.take(patient_profiles, patients), patient_ids)
+    ))
+
+    def assignment_rows():
+        for patient_id in patient_ids:
+            assigned = {rng.choice(therapist_ids)}
+            if rng.random() < 0.1:
+                assigned.add(rng.choice(therapist_ids))
+            for therapist_id in assigned:
+                yield {"therapist_id": therapist_id, "patient_id": patient_id}
+
+    if therapists:
+        insert_all(models.therapist_patients, assignment_rows())
+
+    def created_at() -> datetime:
+        return now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+
+    if drawings_per_patient:
+        images = _image_pool(rng)
+
+        def drawing_rows():
+            for patient_id in patient_ids:
+                for drawing_id in ids.take(drawings, rng.randint(0, 2 * drawings_per_patient)):
+                    image_hash, image_size = rng.choice(images)
+                    yield {
+                        "id": drawing_id, "patient_id": patient_id, "title": f"Dibujo {drawing_id}",
+                        "description": " ".join(rng.sample(PATIENT_LINES, rng.randint(0, 2))) or None,
+                        "image_hash": image_hash, "image_size": image_size, "image_mime": "image/webp",
+                        "created_at": created_at(),
+                    }
+
+        insert_all(drawings, drawing_rows())
+
+    # Cada lote de logs va en la misma transacción que los turnos de sus sesiones
+    log_batch, turn_batch = [], []
+
+    def flush_logs():
+        with engine.begin() as conn:
+            conn.execute(insert(logs), log_batch)
+            if turn_batch:
+                conn.execute(insert(turns), turn_batch)
+        counts["conversation_logs"] += len(log_batch)
+        counts["conversation_turns"] += len(turn_batch)
+        log_batch.clear()
+        turn_batch.clear()
+
+    for patient_id in patient_ids:
+        for log_id in ids.take(logs, rng.randint(0, 2 * logs_per_patient)):
+            lines = _transcript_lines(rng)
+            if rng.random() < TURN_SESSION_RATIO:
+                turn_ids = ids.take(turns, len(lines))
+                turn_batch.extend(
+                    {"id": turn_id, "conversation_id": log_id, "seq": seq, "speaker": speaker, "text": line}
+                    for seq, (turn_id, (speaker, line)) in enumerate(zip(turn_ids, lines))
+                )
+                transcript = None
+            else:
+                transcript = join_turns(lines)
+            log_batch.append({"id": log_id, "patient_id": patient_id, "transcript": transcript, "created_at": created_at()})
+        if len(log_batch) >= batch_size:
+            flush_logs()
+    if log_batch:
+        flush_logs()
+    progress(f"conversation_logs: {counts['conversation_logs']} ({counts['conversation_turns']} turns)")
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Los ids se han puesto a mano: las secuencias tienen que seguir desde el máximo
+            for table in (users, patient_profiles, psychologist_profiles, drawings, logs, turns):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), (SELECT MAX(id) FROM {table.name}))"
+                ))
+        conn.execute(text("ANALYZE"))
+    return counts
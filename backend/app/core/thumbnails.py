@@ -0,0 +1,53 @@
+# en backend/app/core/thumbnails.py
+import io
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from .blob_store import blob_store
+
+load_dotenv()
+
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", 256))  # lado máximo en píxeles
+THUMBNAIL_VARIANT = f"thumb{THUMBNAIL_SIZE}"
+THUMBNAIL_MIME = "image/webp"
+
+
+def make_thumbnail(source: bytes | Path) -> bytes | None:
+    """
+    Reduce una imagen a THUMBNAIL_SIZE px de lado como máximo y la codifica en WebP.
+    `source` son los bytes de la imagen o la ruta del fichero (así no se cargan enteros en memoria).
+    Devuelve None si Pillow no sabe leer el formato (p. ej. SVG).
+    """
+    from PIL import Image, UnidentifiedImageError  # Pillow tarda en importarse: solo al generar la primera
+
+    try:
+        with Image.open(source if isinstance(source, Path) else io.BytesIO(source)) as img:
+            img.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA")
+            out = io.BytesIO()
+            img.save(out, format="WEBP", quality=80)
+            return out.getvalue()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def has_thumbnail(digest: str) -> bool:
+    return blob_store.derived_path_for(digest, THUMBNAIL_VARIANT).is_file()
+
+
+def ensure_thumbnail(digest: str, data: bytes | None = None) -> Path | None:
+    """
+    Devuelve la ruta de la miniatura de un blob, generándola la primera vez.
+    Si ya se tienen los bytes del original (al guardar un dibujo) se pasan en `data`.
+    """
+    if has_thumbnail(digest):
+        return blob_store.derived_path_for(digest, THUMBNAIL_VARIANT)
+    if data is None and not blob_store.exists(digest):
+        return None
+    thumbnail = make_thumbnail(data if data is not None else blob_store.path_for(digest))
+    if thumbnail is None:
+        return None
+    return blob_store.put_derived(digest, THUMBNAIL_VARIANT, thumbnail)
@@ -0,0 +1,176 @@
+# en backend/app/core/write_queue.py
+# Cola de escrituras con un único escritor: en SQLite dos transacciones de escritura
+# simultáneas acaban en "database is locked", así que todas pasan por aquí en orden.
+# Los inserts pequeños (conversaciones, avatares, dibujos) se agrupan en un solo commit.
+# En PostgreSQL no hace falta serializar: cada escritura va directa en su propia sesión.
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from ..database import IS_SQLITE, WriterSessionLocal
+from .data_versions import bump_data_versions
+from .sql_metrics import current_request
+
+load_dotenv()
+
+WRITE_QUEUE_MAX_BATCH = int(os.getenv("WRITE_QUEUE_MAX_BATCH", 64))
+WRITE_QUEUE_DELAY_MS = float(os.getenv("WRITE_QUEUE_DELAY_MS", 2))  # espera para agrupar inserts
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        session_factory=WriterSessionLocal,
+        max_batch: int = WRITE_QUEUE_MAX_BATCH,
+        delay_ms: float = WRITE_QUEUE_DELAY_MS,
+        serialize: bool = IS_SQLITE,
+    ):
+        self.session_factory = session_factory
+        self.serialize = serialize
+        self.max_batch = max_batch
+        self.delay = delay_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.commits = 0
+        self.inserts = 0
+        self.jobs = 0
+
+    async def add(self, obj, touch: tuple[int, ...] = (), jobs: tuple = ()):
+        """
+        Inserta `obj` (agrupado con otros inserts en el mismo commit) y lo devuelve ya
+        refrescado, con id y valores por defecto del servidor. En el mismo commit sube
+        la versión de los usuarios de `touch` (invalida sus ETag) y guarda los trabajos
+        de `jobs` (core/jobs.py) que dependen de esta escritura.
+        """
+        if not self.serialize:
+            return await self._add_now(obj, touch, jobs)
+        return await self._submit("add", (obj, touch, jobs))
+
+    async def run(self, fn):
+        """
+        Ejecuta `await fn(session)` en exclusiva en la conexión de escritura, hace commit
+        y devuelve su resultado. Si fn lanza una excepción se hace rollback y se propaga.
+        """
+        if not self.serialize:
+            return await self._run_now(fn)
+        return await self._submit("run", fn)
+
+    async def _add_now(self, obj, touch, jobs):
+        async with self.session_factory() as db:
+            db.add(obj)
+            db.add_all(jobs)
+            await bump_data_versions(db, set(touch))
+            await db.commit()
+            await db.refresh(obj)
+        self.commits += 1
+        self.inserts += 1
+        return obj
+
+    async def _run_now(self, fn):
+        async with self.session_factory() as db:
+            result = await fn(db)
+            await db.commit()
+        self.commits += 1
+        self.jobs += 1
+        return result
+
+    async def _submit(self, kind: str, payload):
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((kind, payload, future))
+        return await future
+
+    def _ensure_started(self):
+        # Se arranca con la primera escritura, en el bucle de eventos que la pide
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._worker())
+
+    async def shutdown(self):
+        if self._task is None or self._task.done():
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _worker(self):
+        # La tarea hereda el contexto de la petición que la arrancó: sus consultas no son de esa petición
+        current_request.set(None)
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            if job[0] == "run":
+                await self._run_job(job)
+                continue
+
+            batch = [job]
+            if self.delay and self._queue.empty():
+                await asyncio.sleep(self.delay)
+            pending = None
+            while len(batch) < self.max_batch and not self._queue.empty():
+                job = self._queue.get_nowait()
+                if job is None or job[0] != "add":
+                    pending = job  # se procesa después del lote, respetando el orden
+                    break
+                batch.append(job)
+            await self._insert_batch(batch)
+
+            if pending is None:
+                continue
+            if pending[0] == "run":
+                await self._run_job(pending)
+            else:
+                return
+
+    async def _insert_batch(self, batch: list):
+        try:
+            async with self.session_factory() as db:
+                db.add_all([obj for _, (obj, _, _), _ in batch])
+                db.add_all([job for _, (_, _, jobs), _ in batch for job in jobs])
+                await bump_data_versions(db, {user_id for _, (_, touch, _), _ in batch for user_id in touch})
+                await db.commit()
+                for _, (obj, _, _), _ in batch:
+                    await db.refresh(obj)
+        except Exception as exc:
+            if len(batch) == 1:
+                _set_exception(batch[0][2], exc)
+                return
+            # Un insert inválido no debe tumbar al resto: se reintentan uno a uno
+            for job in batch:
+                await self._insert_batch([job])
+            return
+        self.commits += 1
+        self.inserts += len(batch)
+        for _, (obj, _, _), future in batch:
+            if not future.done():
+                future.set_result(obj)
+
+    async def _run_job(self, job):
+        _, fn, future = job
+        try:
+            result = await self._run_now(fn)
+        except Exception as exc:
+            _set_exception(future, exc)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "commits": self.commits,
+            "inserts": self.inserts,
+            "jobs": self.jobs,
+        }
+
+
+def _set_exception(future: asyncio.Future, exc: Exception):
+    # La petición pudo cancelarse mientras esperaba
+    if not future.done():
+        future.set_exception(exc)
+
+
+write_queue = WriteQueue()
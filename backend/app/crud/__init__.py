@@ -1,5 +1,6 @@
-from .crud_user import get_user_by_email, create_user, assign_patient_to_therapist, remove_patient_from_therapist, search_users_by_name, update_patient_profile, update_user_avatar
-from .crud_drawings import create_patient_drawing, get_drawings_by_patient, get_patient_drawings_for_therapist
-from .crud_avatars import create_patient_avatar, get_avatars_by_patient
-from .crud_tca_phrases import get_random_phrase_by_type
-from .crud_conversation_logs import create_conversation_log, get_conversation_logs_by_patient
\ No newline at end of file
+from .crud_user import get_user_by_email, create_user, assign_patient_to_therapist, remove_patient_from_therapist, search_users_by_name, update_patient_profile, update_user_avatar, get_user, get_user_avatar, get_user_with_profiles, get_principal_by_email, get_therapist_with_patients, get_patient_with_therapists, is_patient_assigned, SEARCH_PAGE_SIZE, SEARCH_MAX_RESULTS
+from .crud_drawings import create_patient_drawing, create_patient_drawings_bulk, create_patient_drawing_from_stream, DRAWING_MAX_BYTES, UPLOAD_SIGNATURES, get_drawings_by_patient, get_patient_drawings_for_therapist, get_drawing, ensure_drawing_blob, get_drawing_summaries_by_patient, get_patient_drawing_summaries_for_therapist, get_latest_drawing
+from .crud_avatars import create_patient_avatar, create_patient_avatars_bulk, get_avatars_by_patient, get_latest_avatar
+from .crud_tca_phrases import get_random_phrase_by_type, create_tca_phrases
+from .crud_conversation_logs import create_conversation_log, create_conversation_logs_bulk, get_conversation_logs_by_patient, get_latest_conversation_log, get_conversation_log, create_conversation_session, is_turn_session, append_conversation_turns, search_conversations_for_therapist
+from .crud_dashboard import get_patient_dashboard
@@ -0,0 +1,111 @@
+# en backend/app/crud/bulk_ingest.py
+# Inserción en lote con claves de idempotencia del cliente: un único INSERT de varias
+# filas en una sola transacción, y los reenvíos (misma client_key) no se duplican.
+import asyncio
+from typing import Callable
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.data_versions import bump_data_versions
+from ..core.event_broker import event_broker
+from ..core.write_queue import write_queue
+
+# INSERT ... ON CONFLICT DO NOTHING sobre el índice único (patient_id, client_key)
+DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def _insert_ignoring_duplicates(db: AsyncSession, model):
+    dialect_insert = DIALECT_INSERTS.get(db.bind.dialect.name)
+    if dialect_insert is None:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=["patient_id", "client_key"])
+
+
+async def _existing_ids(db: AsyncSession, model, patient_id: int, keys) -> dict[str, int]:
+    if not keys:
+        return {}
+    rows = await db.execute(
+        select(model.client_key, model.id).where(model.patient_id == patient_id, model.client_key.in_(keys))
+    )
+    return dict(rows.all())
+
+
+def _prepare_all(items: list, prepare: Callable) -> list:
+    # (fila, None) si el elemento es válido; (None, error) si no
+    prepared = []
+    for item in items:
+        try:
+            prepared.append((prepare(item), None))
+        except ValueError as exc:
+            prepared.append((None, str(exc)))
+    return prepared
+
+
+async def bulk_ingest(
+    db: AsyncSession, model, patient_id: int, items: list, prepare: Callable, blocking: bool = False,
+    event_type: str | None = None, jobs: Callable | None = None,
+) -> dict:
+    """
+    Inserta `items` (esquemas con client_key) para el paciente. `prepare(item)` devuelve
+    las columnas de la fila o lanza ValueError; con blocking=True se ejecuta en un hilo.
+    Si se indica `event_type`, avisa a los terapeutas con los ids creados. `jobs(row)`
+    devuelve los trabajos de cada fila insertada, que se guardan en el mismo commit.
+    Devuelve el estado de cada elemento en el formato de schemas.BulkIngestResult.
+    """
+    existing = await _existing_ids(db, model, patient_id, {item.client_key for item in items})
+
+    # Solo se preparan (y validan) los que no están guardados ni repetidos en la petición
+    pending, seen = [], set(existing)
+    for item in items:
+        if item.client_key not in seen:
+            seen.add(item.client_key)
+            pending.append(item)
+    if blocking:
+        prepared = await asyncio.to_thread(_prepare_all, pending, prepare)
+    else:
+        prepared = _prepare_all(pending, prepare)
+
+    errors = {item.client_key: error for item, (_, error) in zip(pending, prepared) if error}
+    rows = [
+        {**row, "patient_id": patient_id, "client_key": item.client_key}
+        for item, (row, _) in zip(pending, prepared) if row is not None
+    ]
+
+    created = {}
+    if rows:
+        async def insert_rows(session):
+            result = await session.execute(
+                _insert_ignoring_duplicates(session, model).returning(model.client_key, model.id), rows
+            )
+            inserted = dict(result.all())
+            if inserted:
+                await bump_data_versions(session, [patient_id])
+            if inserted and jobs:
+                session.add_all([job for row in rows if row["client_key"] in inserted for job in jobs(row)])
+            return inserted
+
+        created = await write_queue.run(insert_rows)
+        if created and event_type:
+            await event_broker.publish(db, patient_id, event_type, ids=sorted(created.values()))
+        # Otra petición con las mismas claves pudo adelantarse entre la consulta y el insert
+        raced = {row["client_key"] for row in rows} - created.keys()
+        existing.update(await _existing_ids(db, model, patient_id, raced))
+
+    results, reported = [], set()
+    for item in items:
+        key = item.client_key
+        if key in errors:
+            results.append({"client_key": key, "status": "error", "detail": errors[key]})
+        elif key in created and key not in reported:
+            results.append({"client_key": key, "status": "created", "id": created[key]})
+        else:
+            results.append({"client_key": key, "status": "duplicate", "id": existing.get(key, created.get(key))})
+        reported.add(key)
+    return {
+        "created": sum(result["status"] == "created" for result in results),
+        "duplicates": sum(result["status"] == "duplicate" for result in results),
+        "errors": sum(result["status"] == "error" for result in results),
+        "items": results,
+    }
@@ -1,19 +1,26 @@
 # en backend/app/crud/crud_avatars.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
+from ..core.write_queue import write_queue
+from ..core.event_broker import event_broker
+from .pagination import DEFAULT_PAGE_SIZE, keyset_page, latest
+from .bulk_ingest import bulk_ingest
 
-def get_avatars_by_patient(db: Session, patient_id: int, skip: int = 0, limit: int = 100):
-    return (
-        db.query(models.PatientAvatar)
-        .filter(models.PatientAvatar.patient_id == patient_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+async def get_avatars_by_patient(db: AsyncSession, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(models.PatientAvatar).where(models.PatientAvatar.patient_id == patient_id)
+    return await keyset_page(db, stmt, models.PatientAvatar, cursor, limit)
+
+async def get_latest_avatar(db: AsyncSession, patient_id: int):
+    stmt = select(models.PatientAvatar).where(models.PatientAvatar.patient_id == patient_id)
+    return await latest(db, stmt, models.PatientAvatar)
 
-def create_patient_avatar(db: Session, avatar: schemas.AvatarCreate, patient_id: int):
-    db_avatar = models.PatientAvatar(**avatar.model_dump(), patient_id=patient_id)
-    db.add(db_avatar)
-    db.commit()
-    db.refresh(db_avatar)
+async def create_patient_avatar(db: AsyncSession, avatar: schemas.AvatarCreate, patient_id: int):
+    db_avatar = await write_queue.add(models.PatientAvatar(**avatar.model_dump(), patient_id=patient_id), touch=(patient_id,))
+    await event_broker.publish(db, patient_id, "avatar.created", ids=[db_avatar.id])
     return db_avatar
+
+async def create_patient_avatars_bulk(db: AsyncSession, items: list[schemas.AvatarBulkItem], patient_id: int):
+    return await bulk_ingest(
+        db, models.PatientAvatar, patient_id, items, lambda item: item.model_dump(exclude={"client_key"}), event_type="avatar.created"
+    )
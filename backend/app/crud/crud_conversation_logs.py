@@ -1,24 +1,199 @@
 # en backend/app/crud/crud_conversation_logs.py
-from sqlalchemy.orm import Session
+import asyncio
+import re
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from .. import models, schemas
-from sqlalchemy import desc
+from ..models.conversation_log import join_turns
+from ..core.write_queue import write_queue
+from ..core.event_broker import event_broker
+from .bulk_ingest import bulk_ingest
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_rank_cursor, encode_rank_cursor, keyset_page, latest
 
-def create_conversation_log(db: Session, log: schemas.ConversationLogCreate, patient_id: int):
+# El transcript de las sesiones por turnos se monta a partir de sus turnos
+WITH_TURNS = selectinload(models.ConversationLog.turns)
+
+async def create_conversation_log(db: AsyncSession, log: schemas.ConversationLogCreate, patient_id: int):
     db_log = models.ConversationLog(
-        transcript=log.transcript,
+        stored_transcript=log.transcript,
         patient_id=patient_id
     )
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    # Los logs llegan en ráfagas: la cola del escritor agrupa varios en un mismo commit
+    db_log = await write_queue.add(db_log, touch=(patient_id,))
+    await event_broker.publish(db, patient_id, "conversation.created", ids=[db_log.id])
     return db_log
 
-def get_conversation_logs_by_patient(db: Session, patient_id: int, skip: int = 0, limit: int = 100):
-    return (
-        db.query(models.ConversationLog)
-        .filter(models.ConversationLog.patient_id == patient_id)
-        .order_by(desc(models.ConversationLog.created_at))
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
\ No newline at end of file
+async def create_conversation_logs_bulk(db: AsyncSession, items: list[schemas.ConversationLogBulkItem], patient_id: int):
+    return await bulk_ingest(
+        db, models.ConversationLog, patient_id, items, lambda item: {"stored_transcript": item.transcript},
+        event_type="conversation.created",
+    )
+
+async def _turn_transcripts(db: AsyncSession, log_ids: list[int]) -> dict[int, str]:
+    # Transcript de varias sesiones por turnos con una sola consulta
+    if not log_ids:
+        return {}
+    rows = await db.execute(
+        select(models.ConversationTurn.conversation_id, models.ConversationTurn.speaker, models.ConversationTurn.text)
+        .where(models.ConversationTurn.conversation_id.in_(log_ids))
+        .order_by(models.ConversationTurn.conversation_id, models.ConversationTurn.seq)
+    )
+    turns = {log_id: [] for log_id in log_ids}
+    for log_id, speaker, turn_text in rows:
+        turns[log_id].append((speaker, turn_text))
+    return {log_id: join_turns(log_turns) for log_id, log_turns in turns.items()}
+
+async def get_conversation_logs_by_patient(db: AsyncSession, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Página de logs como dicts (ConversationLogRead), leídos como filas sueltas sin objetos ORM.
+    """
+    stmt = select(
+        models.ConversationLog.id,
+        models.ConversationLog.patient_id,
+        models.ConversationLog.created_at,
+        models.ConversationLog.stored_transcript.label("transcript"),
+    ).where(models.ConversationLog.patient_id == patient_id)
+    page = await keyset_page(db, stmt, models.ConversationLog, cursor, limit, as_mappings=True)
+    sessions = await _turn_transcripts(db, [log["id"] for log in page["items"] if log["transcript"] is None])
+    for log in page["items"]:
+        if log["transcript"] is None:
+            log["transcript"] = sessions[log["id"]]
+    return page
+
+async def get_latest_conversation_log(db: AsyncSession, patient_id: int):
+    stmt = select(models.ConversationLog).options(WITH_TURNS).where(models.ConversationLog.patient_id == patient_id)
+    return await latest(db, stmt, models.ConversationLog)
+
+async def get_conversation_log(db: AsyncSession, log_id: int):
+    return await db.scalar(select(models.ConversationLog).options(WITH_TURNS).where(models.ConversationLog.id == log_id))
+
+async def create_conversation_session(db: AsyncSession, patient_id: int):
+    """
+    Abre una sesión por turnos: un log sin transcript al que se van añadiendo turnos.
+    """
+    db_log = await write_queue.add(models.ConversationLog(patient_id=patient_id), touch=(patient_id,))
+    await event_broker.publish(db, patient_id, "conversation.created", ids=[db_log.id])
+    return db_log
+
+async def is_turn_session(db: AsyncSession, log_id: int) -> bool:
+    # Solo se pueden añadir turnos a sesiones abiertas con create_conversation_session
+    is_open = await db.scalar(
+        select(models.ConversationLog.stored_transcript.is_(None)).where(models.ConversationLog.id == log_id)
+    )
+    return bool(is_open)
+
+async def _store_turn(log_id: int, patient_id: int, turn: schemas.ConversationTurnCreate) -> int:
+    try:
+        await write_queue.add(models.ConversationTurn(conversation_id=log_id, **turn.model_dump()), touch=(patient_id,))
+    except IntegrityError:
+        pass  # ese seq ya estaba guardado (el cliente reintentó): no es un error
+    return turn.seq
+
+async def append_conversation_turns(db: AsyncSession, log_id: int, turns: list[schemas.ConversationTurnCreate]):
+    """
+    Guarda los turnos (varios turnos, de esta y de otras sesiones, comparten commit en la
+    cola del escritor). Devuelve los seq guardados, o None si la sesión no existe.
+    """
+    patient_id = await db.scalar(
+        select(models.ConversationLog.patient_id)
+        .where(models.ConversationLog.id == log_id, models.ConversationLog.stored_transcript.is_(None))
+    )
+    if patient_id is None:
+        return None
+    stored = list(await asyncio.gather(*[_store_turn(log_id, patient_id, turn) for turn in turns]))
+    await event_broker.publish(db, patient_id, "conversation.updated", ids=[log_id])
+    return stored
+
+# Marcas alrededor de los términos encontrados en los fragmentos (texto plano, no HTML)
+SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_ELLIPSIS = "«", "»", "…"
+SNIPPET_TOKENS = 16
+
+# Una fila por texto indexado (transcript o turno); en SQLite, hit_id es el rowid de FTS5
+SQLITE_TRANSCRIPT_SEARCH = f"""
+SELECT s.rowid AS hit_id, s.conversation_id, s.patient_id, l.created_at, s.rank AS score,
+       snippet({models.CONVERSATION_SEARCH_TABLE}, 0, :open, :close, :ellipsis, {SNIPPET_TOKENS}) AS snippet
+FROM {models.CONVERSATION_SEARCH_TABLE} s
+JOIN conversation_logs l ON l.id = s.conversation_id
+WHERE {models.CONVERSATION_SEARCH_TABLE} MATCH :query
+  AND s.patient_id IN (SELECT patient_id FROM therapist_patients WHERE therapist_id = :therapist_id)
+  AND (:patient_id IS NULL OR s.patient_id = :patient_id)
+  AND (:after_score IS NULL OR s.rank > :after_score OR (s.rank = :after_score AND s.rowid > :after_id))
+ORDER BY s.rank, s.rowid
+LIMIT :limit
+"""
+
+# En PostgreSQL hit_id distingue transcripts (pares) y turnos (impares); ts_rank es mayor cuanto
+# más relevante, así que se niega para ordenar igual que bm25. Las expresiones to_tsvector son
+# las de los índices GIN (columnas sin calificar) y el fragmento solo se calcula para la página.
+POSTGRES_TRANSCRIPT_SEARCH = f"""
+WITH hits AS (
+    SELECT l.id * 2 AS hit_id, l.id AS conversation_id, l.patient_id, l.created_at, l.transcript AS body,
+           -ts_rank({models.POSTGRES_TRANSCRIPT_VECTOR}, to_tsquery('simple', :query)) AS score
+    FROM conversation_logs l
+    WHERE {models.POSTGRES_TRANSCRIPT_VECTOR} @@ to_tsquery('simple', :query)
+    UNION ALL
+    SELECT t.id * 2 + 1, l.id, l.patient_id, l.created_at, t.text,
+           -ts_rank({models.POSTGRES_TURN_VECTOR}, to_tsquery('simple', :query))
+    FROM conversation_turns t JOIN conversation_logs l ON l.id = t.conversation_id
+    WHERE {models.POSTGRES_TURN_VECTOR} @@ to_tsquery('simple', :query)
+), page AS (
+    SELECT * FROM hits
+    WHERE patient_id IN (SELECT patient_id FROM therapist_patients WHERE therapist_id = :therapist_id)
+      AND (CAST(:patient_id AS INTEGER) IS NULL OR patient_id = :patient_id)
+      AND (CAST(:after_score AS DOUBLE PRECISION) IS NULL OR score > :after_score OR (score = :after_score AND hit_id > :after_id))
+    ORDER BY score, hit_id
+    LIMIT :limit
+)
+SELECT hit_id, conversation_id, patient_id, created_at, score,
+       ts_headline('simple', body, to_tsquery('simple', :query),
+                   'StartSel=' || :open || ', StopSel=' || :close || ', FragmentDelimiter=' || :ellipsis
+                   || ', MaxWords={SNIPPET_TOKENS}, MinWords=4, MaxFragments=1') AS snippet
+FROM page
+ORDER BY score, hit_id
+"""
+
+async def search_conversations_for_therapist(
+    db: AsyncSession,
+    therapist_id: int,
+    query: str,
+    patient_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    Busca en las conversaciones de los pacientes asignados al terapeuta (todos los términos,
+    por prefijo) y devuelve {"items": [...], "next_cursor": ...} ordenado por relevancia,
+    con un fragmento de texto alrededor de cada coincidencia. Lanza ValueError si el cursor
+    no es válido.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return {"items": [], "next_cursor": None}
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after_score, after_id = decode_rank_cursor(cursor) if cursor else (None, None)
+
+    if db.get_bind().dialect.name == "postgresql":
+        statement, match = POSTGRES_TRANSCRIPT_SEARCH, " & ".join(f"{term}:*" for term in terms)
+    else:
+        statement, match = SQLITE_TRANSCRIPT_SEARCH, " ".join(f'"{term}"*' for term in terms)
+
+    # Pedimos uno de más para saber si hay página siguiente
+    rows = (await db.execute(text(statement), {
+        "query": match,
+        "therapist_id": therapist_id,
+        "patient_id": patient_id,
+        "after_score": after_score,
+        "after_id": after_id,
+        "limit": limit + 1,
+        "open": SNIPPET_OPEN,
+        "close": SNIPPET_CLOSE,
+        "ellipsis": SNIPPET_ELLIPSIS,
+    })).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_rank_cursor(rows[-1]["score"], rows[-1]["hit_id"])
+    return {"items": [dict(row) for row in rows], "next_cursor": next_cursor}
@@ -0,0 +1,50 @@
+# en backend/app/crud/crud_dashboard.py
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+
+async def get_patient_dashboard(db: AsyncSession, patient_id: int):
+    """
+    Resumen de actividad de un paciente en una sola consulta: cada dato es una
+    subconsulta COUNT/MAX que se resuelve con los índices por patient_id.
+    Devuelve None si el paciente no existe.
+    """
+    Drawing, Avatar, Log = models.PatientDrawing, models.PatientAvatar, models.ConversationLog
+
+    def count_of(model):
+        return select(func.count()).select_from(model).where(model.patient_id == patient_id).scalar_subquery()
+
+    def last_created_at(model):
+        return select(func.max(model.created_at)).where(model.patient_id == patient_id).scalar_subquery()
+
+    latest_drawing_id = (
+        select(Drawing.id)
+        .where(Drawing.patient_id == patient_id)
+        .order_by(desc(Drawing.created_at), desc(Drawing.id))
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    row = (await db.execute(
+        select(
+            models.User.id,
+            count_of(Drawing).label("drawings_count"),
+            count_of(Avatar).label("avatars_count"),
+            count_of(Log).label("conversations_count"),
+            last_created_at(Drawing).label("last_drawing_at"),
+            last_created_at(Log).label("last_conversation_at"),
+            latest_drawing_id.label("latest_drawing_id"),
+        ).where(models.User.id == patient_id)
+    )).first()
+    if row is None:
+        return None
+
+    activity = [ts for ts in (row.last_drawing_at, row.last_conversation_at) if ts is not None]
+    return {
+        "patient_id": row.id,
+        "drawings_count": row.drawings_count,
+        "avatars_count": row.avatars_count,
+        "conversations_count": row.conversations_count,
+        "last_activity_at": max(activity) if activity else None,
+        "latest_drawing_id": row.latest_drawing_id,
+    }
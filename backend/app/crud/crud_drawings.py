@@ -1,32 +1,188 @@
-from sqlalchemy.orm import Session
+import asyncio
+import os
+from typing import AsyncIterator
+from dotenv import load_dotenv
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
+from sqlalchemy.orm.attributes import set_committed_value
 from .. import models, schemas
+from ..core.write_queue import write_queue
+from ..core.data_versions import bump_data_versions
+from ..core.event_broker import event_broker
+from .pagination import DEFAULT_PAGE_SIZE, keyset_page, latest
+from .bulk_ingest import bulk_ingest
+from .crud_user import is_patient_assigned
+from ..core.blob_store import blob_store, decode_image_data
+from ..core.thumbnails import has_thumbnail
+from ..core.jobs import THUMBNAIL_JOB, new_job
 
-def get_drawings_by_patient(db: Session, patient_id: int, skip: int = 0, limit: int = 100):
-    return (
-        db.query(models.PatientDrawing)
-        .filter(models.PatientDrawing.patient_id == patient_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+load_dotenv()
+
+DRAWING_MAX_BYTES = int(os.getenv("DRAWING_MAX_BYTES", 10 * 1024 * 1024))
+
+# Formatos admitidos en la subida binaria y los primeros bytes que los identifican
+UPLOAD_SIGNATURES = {
+    "image/png": lambda head: head.startswith(b"\x89PNG\r\n\x1a\n"),
+    "image/webp": lambda head: head[:4] == b"RIFF" and head[8:12] == b"WEBP",
+    "image/jpeg": lambda head: head.startswith(b"\xff\xd8\xff"),
+}
+SIGNATURE_BYTES = 12
+
+# Columnas de los listados (DrawingRead y DrawingSummary): se leen como filas sueltas, sin objetos ORM
+DRAWING_READ_COLUMNS = (
+    models.PatientDrawing.id,
+    models.PatientDrawing.patient_id,
+    models.PatientDrawing.created_at,
+    models.PatientDrawing.title,
+    models.PatientDrawing.description,
+    models.PatientDrawing.image_hash,
+    models.PatientDrawing.image_size,
+    models.PatientDrawing.image_mime,
+)
+DRAWING_SUMMARY_COLUMNS = (models.PatientDrawing.id, models.PatientDrawing.title, models.PatientDrawing.created_at)
+
+async def get_drawings_by_patient(db: AsyncSession, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    stmt = select(*DRAWING_READ_COLUMNS).where(models.PatientDrawing.patient_id == patient_id)
+    return await keyset_page(db, stmt, models.PatientDrawing, cursor, limit, as_mappings=True)
+
+async def get_drawing_summaries_by_patient(db: AsyncSession, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Listado ligero (id, título y fecha) sin cargar ninguna columna de imagen.
+    """
+    stmt = select(*DRAWING_SUMMARY_COLUMNS).where(models.PatientDrawing.patient_id == patient_id)
+    return await keyset_page(db, stmt, models.PatientDrawing, cursor, limit, as_mappings=True)
+
+async def get_latest_drawing(db: AsyncSession, patient_id: int):
+    """
+    Devuelve el dibujo más reciente del paciente (o None).
+    """
+    stmt = (
+        select(models.PatientDrawing)
+        .options(defer(models.PatientDrawing.image_data))
+        .where(models.PatientDrawing.patient_id == patient_id)
     )
+    return await latest(db, stmt, models.PatientDrawing)
 
-def get_drawing(db: Session, drawing_id: int):
+async def get_drawing(db: AsyncSession, drawing_id: int):
     """
     Devuelve un dibujo por su ID.
     """
-    return db.query(models.PatientDrawing).filter(models.PatientDrawing.id == drawing_id).first()
+    return await db.get(models.PatientDrawing, drawing_id)
+
+# Las subidas sueltas se ven enseguida en el panel; las del lote (sincronización) pueden esperar
+UPLOAD_THUMBNAIL_PRIORITY = 10
+BULK_THUMBNAIL_PRIORITY = 0
+
+def _thumbnail_jobs(image_hash: str, priority: int) -> tuple:
+    # La miniatura la genera un worker; si la imagen ya estaba (mismo hash), ya la tiene
+    if has_thumbnail(image_hash):
+        return ()
+    return (new_job(THUMBNAIL_JOB, {"image_hash": image_hash}, priority=priority),)
+
+def _store_image_columns(image_data: str) -> dict:
+    # Guarda los bytes en el blob store; en la fila solo quedan hash, tamaño y MIME
+    data, mime_type = decode_image_data(image_data)
+    image_hash = blob_store.put(data)
+    return {"image_hash": image_hash, "image_size": len(data), "image_mime": mime_type, "image_data": None}
 
-def create_patient_drawing(db: Session, drawing: schemas.DrawingCreate, patient_id: int):
-    db_drawing = models.PatientDrawing(**drawing.model_dump(), patient_id=patient_id)
-    db.add(db_drawing)          # <- corregido (antes db.session.add)
-    db.commit()
-    db.refresh(db_drawing)
+def _store_image(db_drawing: models.PatientDrawing, image_data: str) -> tuple:
+    for column, value in _store_image_columns(image_data).items():
+        setattr(db_drawing, column, value)
+    return _thumbnail_jobs(db_drawing.image_hash, UPLOAD_THUMBNAIL_PRIORITY)
+
+async def create_patient_drawing(db: AsyncSession, drawing: schemas.DrawingCreate, patient_id: int):
+    db_drawing = models.PatientDrawing(**drawing.model_dump(exclude={"image_data"}), patient_id=patient_id)
+    # Decodificar y escribir en disco bloquea: lo hacemos en un hilo
+    jobs = await asyncio.to_thread(_store_image, db_drawing, drawing.image_data)  # ValueError si la imagen no es válida
+    db_drawing = await write_queue.add(db_drawing, touch=(patient_id,), jobs=jobs)
+    await event_broker.publish(db, patient_id, "drawing.created", ids=[db_drawing.id])
     return db_drawing
 
+def _prepare_bulk_drawing(item: schemas.DrawingBulkItem) -> dict:
+    return {**item.model_dump(exclude={"image_data", "client_key"}), **_store_image_columns(item.image_data)}
+
+async def create_patient_drawings_bulk(db: AsyncSession, items: list[schemas.DrawingBulkItem], patient_id: int):
+    """
+    Subida en lote: una imagen no válida solo marca su elemento como error.
+    """
+    return await bulk_ingest(
+        db, models.PatientDrawing, patient_id, items, _prepare_bulk_drawing, blocking=True, event_type="drawing.created",
+        jobs=lambda row: _thumbnail_jobs(row["image_hash"], BULK_THUMBNAIL_PRIORITY),
+    )
+
+async def create_patient_drawing_from_stream(
+    db: AsyncSession, patient_id: int, chunks: AsyncIterator[bytes], mime_type: str,
+    title: str | None = None, description: str | None = None,
+):
+    """
+    Guarda un dibujo que llega como bytes (sin base64) escribiéndolo por trozos en el
+    blob store. Lanza BlobTooLarge si pasa de DRAWING_MAX_BYTES y ValueError si los
+    primeros bytes no son del formato declarado; en ambos casos se corta al detectarlo.
+    """
+    writer = await asyncio.to_thread(blob_store.open_writer, DRAWING_MAX_BYTES)
+    head = b""
+    try:
+        async for chunk in chunks:
+            if len(head) < SIGNATURE_BYTES:
+                head += chunk[:SIGNATURE_BYTES]
+                if len(head) >= SIGNATURE_BYTES and not UPLOAD_SIGNATURES[mime_type](head):
+                    raise ValueError(f"Body is not a valid {mime_type} image")
+            await asyncio.to_thread(writer.write, chunk)
+        if not UPLOAD_SIGNATURES[mime_type](head):
+            raise ValueError(f"Body is not a valid {mime_type} image")
+        image_hash = await asyncio.to_thread(writer.commit)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+    jobs = await asyncio.to_thread(_thumbnail_jobs, image_hash, UPLOAD_THUMBNAIL_PRIORITY)
+    db_drawing = models.PatientDrawing(
+        title=title, description=description, patient_id=patient_id,
+        image_hash=image_hash, image_size=writer.size, image_mime=mime_type,
+    )
+    db_drawing = await write_queue.add(db_drawing, touch=(patient_id,), jobs=jobs)
+    await event_broker.publish(db, patient_id, "drawing.created", ids=[db_drawing.id])
+    return db_drawing
+
+async def ensure_drawing_blob(db: AsyncSession, db_drawing: models.PatientDrawing):
+    """
+    Mueve al blob store la imagen de una fila antigua que aún guarda el base64.
+    Devuelve None si no hay imagen o el base64 no se puede decodificar (la fila se deja
+    como está, igual que en la migración 0002).
+    """
+    if db_drawing.image_hash and blob_store.exists(db_drawing.image_hash):
+        return db_drawing
+    if db_drawing.image_data is None:
+        return None
+    try:
+        columns = await asyncio.to_thread(_store_image_columns, db_drawing.image_data)
+    except ValueError:
+        return None
+    jobs = await asyncio.to_thread(_thumbnail_jobs, columns["image_hash"], UPLOAD_THUMBNAIL_PRIORITY)
+
+    # Se llama desde los GET: la escritura va por la cola del escritor, no por la sesión de lectura
+    async def _migrate(writer: AsyncSession):
+        await writer.execute(
+            update(models.PatientDrawing).where(models.PatientDrawing.id == db_drawing.id).values(**columns)
+        )
+        writer.add_all(jobs)
+        await bump_data_versions(writer, [db_drawing.patient_id])  # cambian image_hash, image_size...
+
+    await write_queue.run(_migrate)
+    for column, value in columns.items():
+        set_committed_value(db_drawing, column, value)
+    return db_drawing
+
+async def get_patient_drawing_summaries_for_therapist(db: AsyncSession, therapist_id: int, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Igual que get_drawing_summaries_by_patient, pero devuelve None si el paciente no está asignado al terapeuta.
+    """
+    if not await is_patient_assigned(db, therapist_id, patient_id):
+        return None
+    return await get_drawing_summaries_by_patient(db, patient_id, cursor=cursor, limit=limit)
+
 # Obtener dibujos de paciente solo si pertenece al terapeuta
-def get_patient_drawings_for_therapist(db: Session, therapist_id: int, patient_id: int):
-    therapist = db.query(models.User).filter(models.User.id == therapist_id, models.User.role == "psychologist").first()
-    patient = db.query(models.User).filter(models.User.id == patient_id, models.User.role == "patient").first()
-    if not therapist or not patient or patient not in therapist.patients:
-        return []
-    return patient.drawings
\ No newline at end of file
+async def get_patient_drawings_for_therapist(db: AsyncSession, therapist_id: int, patient_id: int, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE):
+    if not await is_patient_assigned(db, therapist_id, patient_id):
+        return None
+    return await get_drawings_by_patient(db, patient_id, cursor=cursor, limit=limit)
@@ -1,15 +1,24 @@
 # en backend/app/crud/crud_tca_phrases.py
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.expression import func
 from .. import models
+from ..core.phrase_catalog import phrase_catalog
 
-def get_random_phrase_by_type(db: Session, tca_type: str):
+async def get_random_phrase_by_type(db: AsyncSession, tca_type: str):
     """
     Obtiene una frase aleatoria de la base de datos para un tipo de TCA específico.
+    El endpoint usa el catálogo en memoria (core/phrase_catalog.py); esto queda para scripts.
     """
-    return (
-        db.query(models.TcaPhrase)
-        .filter(models.TcaPhrase.tca_type == tca_type)
+    return await db.scalar(
+        select(models.TcaPhrase)
+        .where(models.TcaPhrase.tca_type == tca_type)
         .order_by(func.random()) # func.random() es para SQLite. En PostgreSQL sería func.rand()
-        .first()
+        .limit(1)
     )
+
+async def create_tca_phrases(db: AsyncSession, phrases: list[models.TcaPhrase]):
+    db.add_all(phrases)
+    await db.commit()
+    phrase_catalog.invalidate()
+    return phrases
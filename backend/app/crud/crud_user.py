@@ -1,18 +1,104 @@
-from sqlalchemy.orm import Session
+import asyncio
+import re
+from sqlalchemy import delete, exists, func, insert, literal_column, or_, select, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from .. import models, schemas
+from ..schemas.user import avatar_url
 from ..core.security import get_password_hash
+from ..core.principal_cache import Principal, principal_cache
+from ..core.write_queue import write_queue
+from ..core.blob_store import blob_store, decode_image_data
+from ..core.data_versions import bump_data_versions
+from ..core.event_broker import event_broker
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+# Carga anticipada para serializar TherapistWithProfile: en async no hay lazy loads.
+# Los perfiles (uno a uno) van en JOIN y los pacientes en una sola consulta IN (...):
+# el listado se sirve con un número fijo de consultas (2) sea cual sea su tamaño.
+PROFILE_OPTIONS = (joinedload(models.User.patient_profile), joinedload(models.User.psychologist_profile))
+ROSTER_OPTIONS = PROFILE_OPTIONS + (selectinload(models.User.patients).options(*PROFILE_OPTIONS),)
 
-def search_users_by_name(db: Session, name: str):
-    return db.query(models.User).filter(
-        models.User.name.ilike(f"%{name}%"),
-        models.User.role == "patient"
-    ).all()
+async def get_user_by_email(db: AsyncSession, email: str):
+    return await db.scalar(select(models.User).where(models.User.email == email))
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+async def get_user(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+async def get_user_avatar(db: AsyncSession, user_id: int):
+    """
+    (hash, MIME) del avatar del usuario, o None si no tiene.
+    """
+    row = (await db.execute(
+        select(models.User.avatar_hash, models.User.avatar_mime)
+        .where(models.User.id == user_id, models.User.avatar_hash.is_not(None))
+    )).first()
+    return tuple(row) if row else None
+
+async def get_user_with_profiles(db: AsyncSession, user_id: int):
+    # Perfiles en la misma consulta (JOIN) para serializar UserReadWithProfile sin lazy loads
+    return await db.scalar(
+        select(models.User)
+        .options(*PROFILE_OPTIONS)
+        .where(models.User.id == user_id)
+    )
+
+async def get_principal_by_email(db: AsyncSession, email: str):
+    """
+    Carga solo id, email, rol y los ids de perfil en una consulta.
+    """
+    row = (await db.execute(
+        select(models.User.id, models.User.email, models.User.role, models.PatientProfile.id, models.PsychologistProfile.id)
+        .outerjoin(models.PatientProfile, models.PatientProfile.user_id == models.User.id)
+        .outerjoin(models.PsychologistProfile, models.PsychologistProfile.user_id == models.User.id)
+        .where(models.User.email == email)
+    )).first()
+    return Principal(*row) if row else None
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_RESULTS = 100  # tope absoluto, también paginando
+
+# Solo las columnas que muestra el buscador (sin el hash de la contraseña)
+SEARCH_COLUMNS = (models.User.id, models.User.name, models.User.surname, models.User.email, models.User.center, models.User.role)
+
+async def search_users_by_name(db: AsyncSession, name: str, limit: int = SEARCH_PAGE_SIZE, offset: int = 0):
+    """
+    Busca pacientes por prefijo de nombre, apellidos, email o centro usando el índice
+    de texto completo (ver models/user_search.py), ordenados por relevancia.
+    """
+    terms = re.findall(r"\w+", name.lower())
+    limit = min(limit, SEARCH_MAX_RESULTS - offset)
+    if not terms or limit <= 0:
+        return []
+
+    stmt = select(*SEARCH_COLUMNS).where(models.User.role == "patient")
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # Cada término entre comillas (sin sintaxis FTS5 del usuario) y con * para buscar por prefijo
+        match = " ".join(f'"{term}"*' for term in terms)
+        search = table(models.USERS_SEARCH_TABLE, column("rowid"))
+        stmt = (
+            stmt.join(search, search.c.rowid == models.User.id)
+            .where(literal_column(models.USERS_SEARCH_TABLE).op("MATCH")(match))
+            .order_by(func.bm25(literal_column(models.USERS_SEARCH_TABLE)))
+        )
+    elif dialect == "postgresql":
+        # LIKE '%término%' sobre la expresión indexada con trigramas (GIN)
+        document = literal_column(models.POSTGRES_SEARCH_EXPRESSION)
+        stmt = (
+            stmt.where(*[document.contains(term, autoescape=True) for term in terms])
+            .order_by(func.similarity(document, " ".join(terms)).desc())
+        )
+    else:
+        stmt = stmt.where(*[
+            or_(*[col.ilike(f"%{term}%") for col in SEARCH_COLUMNS[1:5]]) for term in terms
+        ])
+    stmt = stmt.order_by(models.User.id).limit(limit).offset(offset)
+    return (await db.execute(stmt)).all()
+
+async def create_user(db: AsyncSession, user: schemas.UserCreate, hashed_password: str | None = None):
+    # Los endpoints pasan el hash ya calculado en el pool de bcrypt
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         email=user.email,
         name=user.name,
@@ -26,65 +112,135 @@ def create_user(db: Session, user: schemas.UserCreate):
         db_user.patient_profile = models.PatientProfile()
     elif user.role == 'psychologist':
         db_user.psychologist_profile = models.PsychologistProfile()
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return await write_queue.add(db_user)
+
+async def get_therapist_with_patients(db: AsyncSession, therapist_id: int):
+    """
+    Terapeuta con sus pacientes y los perfiles de todos ya cargados (o None).
+    """
+    return await db.scalar(
+        select(models.User)
+        .options(*ROSTER_OPTIONS)
+        .where(models.User.id == therapist_id, models.User.role == "psychologist")
+        .execution_options(populate_existing=True)
+    )
+
+async def get_patient_with_therapists(db: AsyncSession, patient_id: int):
+    """
+    Paciente con sus terapeutas (y la lista de pacientes de cada uno) ya cargados (o None).
+    """
+    return await db.scalar(
+        select(models.User)
+        .options(selectinload(models.User.therapists).options(*ROSTER_OPTIONS))
+        .where(models.User.id == patient_id, models.User.role == "patient")
+    )
+
+async def is_patient_assigned(db: AsyncSession, therapist_id: int, patient_id: int) -> bool:
+    return await db.scalar(
+        select(
+            exists().where(
+                models.therapist_patients.c.therapist_id == therapist_id,
+                models.therapist_patients.c.patient_id == patient_id,
+            )
+        )
+    )
 
 # --- FUNCIÓN DE ACTUALIZACIÓN MEJORADA ---
-def update_patient_profile(db: Session, patient_id: int, profile_in: schemas.PatientProfileUpdate):
-    # Busca el usuario y su perfil
-    patient_user = db.query(models.User).filter(models.User.id == patient_id, models.User.role == 'patient').first()
-    if not patient_user or not patient_user.patient_profile:
-        return None
-    
-    # Extrae los datos para cada modelo
-    profile_data = profile_in.model_dump(exclude_unset=True)
-    user_update_data = {}
-    profile_update_data = {}
-
-    # Separa los datos para el modelo User y para PatientProfile
-    for key, value in profile_data.items():
-        if hasattr(patient_user, key):
-            user_update_data[key] = value
-        if hasattr(patient_user.patient_profile, key):
-            profile_update_data[key] = value
-
-    # Actualiza los campos del usuario
-    for key, value in user_update_data.items():
-        setattr(patient_user, key, value)
-
-    # Actualiza los campos del perfil
-    for key, value in profile_update_data.items():
-        setattr(patient_user.patient_profile, key, value)
-    
-    db.commit()
-    db.refresh(patient_user.patient_profile)
-    db.refresh(patient_user)
+async def update_patient_profile(db: AsyncSession, patient_id: int, profile_in: schemas.PatientProfileUpdate):
+    # La lectura y la escritura van juntas en la conexión del escritor
+    async def _update(writer: AsyncSession):
+        # Busca el usuario y su perfil
+        patient_user = await writer.scalar(
+            select(models.User).options(*PROFILE_OPTIONS).where(models.User.id == patient_id, models.User.role == 'patient')
+        )
+        if not patient_user or not patient_user.patient_profile:
+            return None
+
+        # Extrae los datos para cada modelo
+        profile_data = profile_in.model_dump(exclude_unset=True)
+        user_update_data = {}
+        profile_update_data = {}
+
+        # Separa los datos para el modelo User y para PatientProfile
+        for key, value in profile_data.items():
+            if hasattr(patient_user, key):
+                user_update_data[key] = value
+            if hasattr(patient_user.patient_profile, key):
+                profile_update_data[key] = value
+
+        # Actualiza los campos del usuario
+        for key, value in user_update_data.items():
+            setattr(patient_user, key, value)
+
+        # Actualiza los campos del perfil
+        for key, value in profile_update_data.items():
+            setattr(patient_user.patient_profile, key, value)
+        # El perfil también aparece en el listado de pacientes de sus terapeutas
+        await bump_data_versions(writer, [patient_id], include_therapists=True)
+        return patient_user
+
+    patient_user = await write_queue.run(_update)
+    principal_cache.invalidate(patient_id)
+    if patient_user is not None:
+        await event_broker.publish(db, patient_id, "profile.updated")
     return patient_user # Devolvemos el usuario completo actualizado
 
-def assign_patient_to_therapist(db: Session, therapist_id: int, patient_id: int):
-    therapist = db.query(models.User).filter(models.User.id == therapist_id, models.User.role == "psychologist").first()
-    patient = db.query(models.User).filter(models.User.id == patient_id, models.User.role == "patient").first()
-    if not therapist or not patient:
+async def _get_user_with_role(db: AsyncSession, user_id: int, role: str):
+    return await db.scalar(select(models.User.id).where(models.User.id == user_id, models.User.role == role))
+
+async def assign_patient_to_therapist(db: AsyncSession, therapist_id: int, patient_id: int):
+    if not await _get_user_with_role(db, therapist_id, "psychologist") or not await _get_user_with_role(db, patient_id, "patient"):
+        return None
+
+    async def _assign(writer: AsyncSession):
+        if not await is_patient_assigned(writer, therapist_id, patient_id):
+            await writer.execute(insert(models.therapist_patients).values(therapist_id=therapist_id, patient_id=patient_id))
+            await bump_data_versions(writer, [therapist_id, patient_id])
+
+    await write_queue.run(_assign)
+    principal_cache.invalidate(therapist_id, patient_id)
+    return await get_therapist_with_patients(db, therapist_id)
+
+async def remove_patient_from_therapist(db: AsyncSession, therapist_id: int, patient_id: int):
+    async def _remove(writer: AsyncSession):
+        await writer.execute(
+            delete(models.therapist_patients).where(
+                models.therapist_patients.c.therapist_id == therapist_id,
+                models.therapist_patients.c.patient_id == patient_id,
+            )
+        )
+        await bump_data_versions(writer, [therapist_id, patient_id])
+
+    if await is_patient_assigned(db, therapist_id, patient_id):
+        await write_queue.run(_remove)
+        principal_cache.invalidate(therapist_id, patient_id)
+    return await get_therapist_with_patients(db, therapist_id)
+
+def _store_avatar(avatar_data: str) -> tuple[str, str]:
+    data, mime_type = decode_image_data(avatar_data)
+    return blob_store.put(data), mime_type
+
+async def update_user_avatar(db: AsyncSession, user_id: int, avatar_data: str):
+    """
+    Guarda la imagen en el blob store y en el usuario solo su hash. Lanza ValueError si
+    avatar_data no es una imagen.
+    """
+    if await get_user(db, user_id) is None:
         return None
-    if patient not in therapist.patients:
-        therapist.patients.append(patient)
-        db.commit()
-    return therapist
-
-def remove_patient_from_therapist(db: Session, therapist_id: int, patient_id: int):
-    therapist = db.query(models.User).filter(models.User.id == therapist_id, models.User.role == "psychologist").first()
-    patient = db.query(models.User).filter(models.User.id == patient_id, models.User.role == "patient").first()
-    if therapist and patient and patient in therapist.patients:
-        therapist.patients.remove(patient)
-        db.commit()
-    return therapist
-
-def update_user_avatar(db: Session, user_id: int, avatar_data: str):
-    db_user = db.query(models.User).filter(models.User.id == user_id).first()
-    if db_user:
-        db_user.avatar = avatar_data
-        db.commit()
-        db.refresh(db_user)
+    avatar_hash, avatar_mime = await asyncio.to_thread(_store_avatar, avatar_data)
+
+    async def _update(writer: AsyncSession):
+        db_user = await writer.get(models.User, user_id)
+        if db_user:
+            db_user.avatar_hash = avatar_hash
+            db_user.avatar_mime = avatar_mime
+            # El avatar también sale en el listado de pacientes de sus terapeutas
+            await bump_data_versions(writer, [user_id], include_therapists=True)
+        return db_user
+
+    db_user = await write_queue.run(_update)
+    principal_cache.invalidate(user_id)
+    if db_user is not None:
+        # Solo llega a alguien si el usuario es paciente de algún terapeuta
+        await event_broker.publish(db, user_id, "profile.updated", avatar=avatar_url(user_id, avatar_hash))
     return db_user
@@ -0,0 +1,95 @@
+# en backend/app/crud/pagination.py
+# Paginación por cursor (keyset) sobre (created_at, id), de más reciente a más antiguo.
+# A diferencia de OFFSET, pedir la página N cuesta lo mismo que pedir la primera.
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import Select, String, cast, desc, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: str, item_id: int) -> str:
+    raw = json.dumps([created_at, item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Lanza ValueError si el cursor no es uno generado por encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        datetime.fromisoformat(created_at)
+        return created_at, int(item_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def encode_rank_cursor(score: float, item_id: int) -> str:
+    # Cursor de resultados ordenados por relevancia: (puntuación, id) del último de la página
+    raw = json.dumps([score, item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Lanza ValueError si el cursor no es uno generado por encode_rank_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, item_id = json.loads(raw)
+        return float(score), int(item_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def newest_first(stmt: Select, model) -> Select:
+    return stmt.order_by(desc(model.created_at), desc(model.id))
+
+
+def _row_as_dict(row) -> dict:
+    return {key: value for key, value in row._mapping.items() if key != "cursor_created_at"}
+
+
+async def keyset_page(
+    db: AsyncSession, stmt: Select, model, cursor: str | None = None, limit: int = DEFAULT_PAGE_SIZE, as_mappings: bool = False
+) -> dict:
+    """
+    Ejecuta `stmt` (un select(model) ya filtrado) y devuelve {"items": [...], "next_cursor": str | None}
+    con como mucho `limit` elementos posteriores al cursor. `model` debe tener columnas created_at e id.
+    Con as_mappings=True `stmt` selecciona columnas sueltas (entre ellas model.id) y los elementos
+    son dicts: para listados de solo lectura, sin crear objetos ORM ni llenar el identity map.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # SQLite guarda las fechas como texto y server_default (CURRENT_TIMESTAMP) usa otro formato
+    # que SQLAlchemy; comparamos contra el texto tal cual está guardado para no saltar filas.
+    is_sqlite = db.get_bind().dialect.name == "sqlite"
+    raw_created_at = (cast(model.created_at, String) if is_sqlite else model.created_at).label("cursor_created_at")
+
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        bound = literal(created_at, String) if is_sqlite else datetime.fromisoformat(created_at)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(bound, item_id))
+
+    # Pedimos uno de más para saber si hay página siguiente sin hacer un COUNT
+    result = await db.execute(newest_first(stmt.add_columns(raw_created_at), model).limit(limit + 1))
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [_row_as_dict(row) for row in rows] if as_mappings else [row[0] for row in rows]
+    next_cursor = None
+    if has_more:
+        last_created_at = rows[-1].cursor_created_at
+        if not is_sqlite:
+            last_created_at = last_created_at.isoformat()
+        next_cursor = encode_cursor(last_created_at, items[-1]["id"] if as_mappings else items[-1].id)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def latest(db: AsyncSession, stmt: Select, model):
+    return await db.scalar(newest_first(stmt, model).limit(1))
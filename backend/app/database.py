@@ -1,20 +1,77 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
 from dotenv import load_dotenv
+from .core.sql_metrics import TimedAsyncQueuePool, instrument_engine
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db") # Default to a local SQLite DB for ease of setup
 
+# Drivers asíncronos equivalentes a los síncronos de DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Conexiones por proceso; `python -m app serve` las reparte entre sus workers
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+# Perfil de producción de SQLite: WAL deja leer mientras se escribe y NORMAL solo
+# hace fsync en los checkpoints (en WAL sigue siendo seguro ante caídas del proceso)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 64 * 1024)),  # negativo = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+}
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 engine = create_engine(
     DATABASE_URL, 
     # The connect_args are only for SQLite. You might need to remove this for other databases like PostgreSQL.
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {}
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Motor asíncrono: lo usan los routers (todas las rutas son async def).
+# El síncrono queda para Alembic, scripts y tareas fuera de la API.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=TimedAsyncQueuePool, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW
+)
+# expire_on_commit=False: tras un commit no se recargan atributos de forma perezosa (no se puede en async)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# En SQLite solo puede haber un escritor a la vez: las escrituras de la API pasan por una
+# única conexión (ver core/write_queue.py) y las lecturas usan el pool de async_engine
+if IS_SQLITE:
+    writer_engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=1, max_overflow=0)
+    for _engine in (engine, async_engine.sync_engine, writer_engine.sync_engine):
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
+else:
+    writer_engine = async_engine
+WriterSessionLocal = async_sessionmaker(writer_engine, autoflush=False, expire_on_commit=False)
+
+for _engine in {engine, async_engine.sync_engine, writer_engine.sync_engine}:
+    instrument_engine(_engine)
+
 Base = declarative_base()
 
 def get_db():
@@ -23,3 +80,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    # La sesión no toma conexión hasta su primera consulta (la espera la mide TimedAsyncQueuePool)
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,23 +1,24 @@
 # en backend/app/initial_data.py
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from . import crud, schemas, models
 
-def seed_db(db: Session):
+async def seed_db(db: AsyncSession):
     # --- Creación de usuarios de test ---
-    patient_user = crud.get_user_by_email(db, email="patient@test.com")
+    patient_user = await crud.get_user_by_email(db, email="patient@test.com")
     if not patient_user:
         print("Creating test patient user...")
         patient_in = schemas.UserCreate(email="patient@test.com", password="123456", name="Test Patient", role="patient")
-        crud.create_user(db=db, user=patient_in)
+        await crud.create_user(db=db, user=patient_in)
     
-    therapist_user = crud.get_user_by_email(db, email="psyco@test.com")
+    therapist_user = await crud.get_user_by_email(db, email="psyco@test.com")
     if not therapist_user:
         print("Creating test psychologist user...")
         therapist_in = schemas.UserCreate(email="psyco@test.com", password="123456", name="Test Psychologist", role="psychologist")
-        crud.create_user(db=db, user=therapist_in)
+        await crud.create_user(db=db, user=therapist_in)
 
     # --- Creación de frases de ejemplo (en inglés) ---
-    phrase_count = db.query(models.TcaPhrase).count()
+    phrase_count = await db.scalar(select(func.count()).select_from(models.TcaPhrase))
     if phrase_count == 0:
         print("Seeding TCA phrases in English...")
         phrases = [
@@ -40,5 +41,4 @@ def seed_db(db: Session):
             models.TcaPhrase(tca_type="general", phrase="You'll never look like those people on social media."),
             models.TcaPhrase(tca_type="general", phrase="These clothes don't fit you well, they highlight your flaws.")
         ]
-        db.add_all(phrases)
-        db.commit()
+        await crud.create_tca_phrases(db, phrases)
@@ -1,11 +1,19 @@
 # backend/app/main.py
+# Importar este módulo no toca la base de datos: el esquema lo crea `alembic upgrade head`
+# y los datos de prueba, `python -m app seed`.
+import asyncio
+import os
 from fastapi import FastAPI
-from fastapi.routing import APIRoute
-from .database import engine, Base, SessionLocal
-from . import models
-from .initial_data import seed_db
-
-Base.metadata.create_all(bind=engine)
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import text
+from .database import async_engine, writer_engine, AsyncSessionLocal
+from .core.phrase_catalog import phrase_catalog
+from .core.schema_check import check_schema
+from .core.principal_cache import principal_cache
+from .core.password_pool import password_pool
+from .core.write_queue import write_queue
+from .core.event_broker import event_broker
+from .core.sql_metrics import SQLTimingMiddleware, sql_metrics
 
 # Importa los routers
 from .api.endpoints import auth as auth_router
@@ -15,19 +23,24 @@ from .api.endpoints import avatars as avatars_router
 from .api.endpoints import phrases as phrases_router
 from .api.endpoints import conversation_logs as conversation_logs_router # <-- AÑADIDO
 
-app = FastAPI(title="Mi Super Proyecto TFG API")
+# orjson codifica las respuestas que no pasan por core.serialization (más rápido que json.dumps)
+app = FastAPI(title="Mi Super Proyecto TFG API", default_response_class=ORJSONResponse)
+app.add_middleware(SQLTimingMiddleware)
 
 @app.on_event("startup")
-def startup_event():
-    db = SessionLocal()
-    seed_db(db)
-    db.close()
-    print("--- Initial data seeded successfully ---")
-    print("--- RUTAS REGISTRADAS ---")
-    for route in app.routes:
-        if isinstance(route, APIRoute):
-            print(f"Path: {route.path}, Name: {route.name}, Methods: {route.methods}")
-    print("-------------------------")
+async def startup_event():
+    await check_schema(async_engine)
+    async with AsyncSessionLocal() as db:
+        await phrase_catalog.load(db)
+    await event_broker.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_pool.shutdown()
+    await event_broker.close()  # cierra los feeds de eventos abiertos
+    await write_queue.shutdown()  # termina los commits pendientes antes de cerrar conexiones
+    await writer_engine.dispose()
+    await async_engine.dispose()
 
 # Incluimos los routers
 app.include_router(auth_router.router, prefix="/api/auth", tags=["Authentication"])
@@ -37,6 +50,39 @@ app.include_router(avatars_router.router, prefix="/api/avatars", tags=["Avatars"
 app.include_router(phrases_router.router, prefix="/api", tags=["Phrases"])
 app.include_router(conversation_logs_router.router, prefix="/api", tags=["Conversation Logs"]) # <-- AÑADIDO
 
+# Sondas del balanceador: /healthz solo dice que el proceso responde; /readyz además
+# comprueba que la base de datos contesta (si no, 503 y deja de recibir tráfico)
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", 2))  # segundos
+
+@app.get("/healthz", include_in_schema=False)
+def healthz():
+    return {"status": "ok"}
+
+async def _ping_database():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    try:
+        await asyncio.wait_for(_ping_database(), READINESS_TIMEOUT)
+    except Exception as exc:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "detail": type(exc).__name__})
+    return {"status": "ready"}
+
 @app.get("/api")
 def read_root():
     return {"message": "Welcome to Holo's API"}
+
+@app.get("/api/metrics")
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    # Contadores internos para monitorización
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hashing": password_pool.stats(),
+        "write_queue": write_queue.stats(),
+        "events": event_broker.stats(),
+        "sql": sql_metrics.stats(),
+        "pool": {"checked_out": async_engine.pool.checkedout(), "status": async_engine.pool.status()},
+    }
@@ -5,4 +5,8 @@ from .patient_drawing import PatientDrawing
 from .therapist_patients import therapist_patients
 from .patient_avatar import PatientAvatar
 from .tca_phrase import TcaPhrase
-from .conversation_log import ConversationLog # <-- AÑADIDO
\ No newline at end of file
+from .conversation_log import ConversationLog # <-- AÑADIDO
+from .conversation_turn import ConversationTurn
+from .user_search import USERS_SEARCH_TABLE, POSTGRES_SEARCH_EXPRESSION
+from .conversation_search import CONVERSATION_SEARCH_TABLE, POSTGRES_TRANSCRIPT_VECTOR, POSTGRES_TURN_VECTOR
+from .job import Job
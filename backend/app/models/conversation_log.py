@@ -1,18 +1,41 @@
 # en backend/app/models/conversation_log.py
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
+# Prefijos del transcript, los mismos que usaba el frontend ("AI: ...\nPatient: ...")
+SPEAKER_LABELS = {"ai": "AI", "patient": "Patient"}
+
+def join_turns(turns) -> str:
+    # turns: pares (speaker, text) ya ordenados por seq
+    return "\n".join(f"{SPEAKER_LABELS.get(speaker, speaker)}: {text}" for speaker, text in turns)
+
 class ConversationLog(Base):
     __tablename__ = "conversation_logs"
+    __table_args__ = (
+        Index("ix_conversation_logs_patient_created", "patient_id", "created_at"),
+        Index("uq_conversation_logs_patient_client_key", "patient_id", "client_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    transcript = Column(Text, nullable=False) # Guardará el diálogo completo
+    # Diálogo completo de las sesiones guardadas de una vez (las antiguas y POST /conversations/).
+    # Las sesiones por turnos lo dejan a NULL y el texto se monta a partir de `turns`.
+    stored_transcript = Column("transcript", Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Reenviar el mismo log en una subida en lote no lo duplica
+    client_key = Column(String(64), nullable=True)
     
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     patient = relationship("User")
+    turns = relationship("ConversationTurn", order_by="ConversationTurn.seq", cascade="all, delete-orphan")
 
     # Opcional: Se podría añadir una relación al dibujo o avatar específico
     # drawing_id = Column(Integer, ForeignKey("patient_drawings.id"), nullable=True)
+
+    @property
+    def transcript(self) -> str:
+        # Requiere `turns` ya cargado (selectinload) en las sesiones por turnos
+        if self.stored_transcript is not None:
+            return self.stored_transcript
+        return join_turns((turn.speaker, turn.text) for turn in self.turns)
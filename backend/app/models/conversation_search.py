@@ -0,0 +1,43 @@
+# Índice de texto completo de las conversaciones: transcripts guardados de una vez
+# y turnos de las sesiones por turnos. En SQLite es una tabla FTS5 que rellenan
+# triggers al insertar; en PostgreSQL, índices GIN sobre to_tsvector de cada texto.
+# Base.metadata.create_all lo crea junto a las tablas; en bases existentes lo crea
+# la migración 0007_conversation_search_index.
+from sqlalchemy import DDL, event
+from .conversation_log import ConversationLog
+from .conversation_turn import ConversationTurn
+
+CONVERSATION_SEARCH_TABLE = "conversation_search"
+
+# Expresiones indexadas en PostgreSQL (las consultas tienen que usar exactamente estas)
+POSTGRES_TRANSCRIPT_VECTOR = "to_tsvector('simple', coalesce(transcript, ''))"
+POSTGRES_TURN_VECTOR = "to_tsvector('simple', text)"
+
+SQLITE_SEARCH_DDL = [
+    # conversation_id y patient_id no se indexan: solo sirven para filtrar y agrupar los resultados
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {CONVERSATION_SEARCH_TABLE} USING fts5(
+        body, conversation_id UNINDEXED, patient_id UNINDEXED,
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversation_search_log_ai AFTER INSERT ON conversation_logs
+    WHEN new.transcript IS NOT NULL BEGIN
+        INSERT INTO {CONVERSATION_SEARCH_TABLE}(body, conversation_id, patient_id)
+        VALUES (new.transcript, new.id, new.patient_id);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversation_search_log_ad AFTER DELETE ON conversation_logs BEGIN
+        DELETE FROM {CONVERSATION_SEARCH_TABLE} WHERE conversation_id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS conversation_search_turn_ai AFTER INSERT ON conversation_turns BEGIN
+        INSERT INTO {CONVERSATION_SEARCH_TABLE}(body, conversation_id, patient_id)
+        SELECT new.text, l.id, l.patient_id FROM conversation_logs l WHERE l.id = new.conversation_id;
+    END""",
+]
+
+POSTGRES_TRANSCRIPT_DDL = f"CREATE INDEX IF NOT EXISTS ix_conversation_logs_transcript_fts ON conversation_logs USING gin ({POSTGRES_TRANSCRIPT_VECTOR})"
+POSTGRES_TURN_DDL = f"CREATE INDEX IF NOT EXISTS ix_conversation_turns_text_fts ON conversation_turns USING gin ({POSTGRES_TURN_VECTOR})"
+
+# conversation_turns se crea después de conversation_logs (por la clave foránea): los triggers van ahí
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(ConversationTurn.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(ConversationLog.__table__, "after_create", DDL(POSTGRES_TRANSCRIPT_DDL).execute_if(dialect="postgresql"))
+event.listen(ConversationTurn.__table__, "after_create", DDL(POSTGRES_TURN_DDL).execute_if(dialect="postgresql"))
@@ -0,0 +1,20 @@
+# en backend/app/models/conversation_turn.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from ..database import Base
+
+class ConversationTurn(Base):
+    """
+    Un turno de una sesión de conversación (la frase de la IA o la respuesta del paciente).
+    Se guarda en cuanto ocurre, así una caída no pierde la sesión entera.
+    """
+    __tablename__ = "conversation_turns"
+    # seq lo pone el cliente: reenviar un turno ya guardado no lo duplica
+    __table_args__ = (UniqueConstraint("conversation_id", "seq", name="uq_conversation_turns_conversation_seq"),)
+
+    id = Column(Integer, primary_key=True)
+    conversation_id = Column(Integer, ForeignKey("conversation_logs.id"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    speaker = Column(String(20), nullable=False)  # "ai" o "patient"
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
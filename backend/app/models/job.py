@@ -0,0 +1,29 @@
+# en backend/app/models/job.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from ..database import Base
+
+class Job(Base):
+    """
+    Trabajo pendiente para los workers (python -m app worker). Se inserta en la misma
+    transacción que la escritura que lo origina; ver core/jobs.py.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Lo que consulta el worker al buscar el siguiente: pendientes por prioridad y fecha
+        Index("ix_jobs_status_priority_run_at", "status", "priority", "run_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)  # mayor = antes
+    status = Column(String(20), nullable=False, default="pending")  # pending | running | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # Fechas en UTC calculadas en Python: el worker las compara con las suyas
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,10 +1,15 @@
 # en backend/app/models/patient_avatar.py
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from ..database import Base
 
 class PatientAvatar(Base):
     __tablename__ = "patient_avatars"
+    __table_args__ = (
+        Index("ix_patient_avatars_patient_created", "patient_id", "created_at"),
+        Index("uq_patient_avatars_patient_client_key", "patient_id", "client_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -15,6 +20,9 @@ class PatientAvatar(Base):
     eyebrow_style = Column(String(50))
     skin_tone = Column(String(50))
     face_shape = Column(String(50))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Igual que PatientDrawing.client_key
+    client_key = Column(String(64), nullable=True)
 
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     patient = relationship("User") # Relación simple, no se necesita back_populates aquí si User no necesita acceder a avatares directamente
@@ -1,17 +1,27 @@
 # en backend/app/models/patient_drawing.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
 
 class PatientDrawing(Base):
     __tablename__ = "patient_drawings"
+    __table_args__ = (
+        Index("ix_patient_drawings_patient_created", "patient_id", "created_at"),
+        Index("uq_patient_drawings_patient_client_key", "patient_id", "client_key", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(100), nullable=True)
     description = Column(Text, nullable=True)
-    image_data = Column(Text, nullable=False)  # Para base64 o SVG
+    # Solo filas antiguas: el base64 se mueve al blob store (ver core/blob_store.py)
+    image_data = Column(Text, nullable=True)
+    image_hash = Column(String(64), index=True, nullable=True)  # SHA-256 del fichero en el blob store
+    image_size = Column(Integer, nullable=True)
+    image_mime = Column(String(100), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Clave de idempotencia de la subida en lote (la genera la tablet al crear el elemento sin conexión)
+    client_key = Column(String(64), nullable=True)
     
     patient_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    patient = relationship("User", back_populates="drawings")
\ No newline at end of file
+    patient = relationship("User", back_populates="drawings")
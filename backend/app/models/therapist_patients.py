@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Index, Table
 from ..database import Base
 
 therapist_patients = Table(
@@ -6,4 +6,5 @@ therapist_patients = Table(
     Base.metadata,
     Column("therapist_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
     Column("patient_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_therapist_patients_patient_id", "patient_id"),
 )
@@ -14,7 +14,11 @@ class User(Base):
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False)  # "patient" o "psychologist"
-    avatar = Column(String(100000), nullable=True)
+    # La imagen del avatar está en el blob store; en la fila solo su hash (la tabla queda estrecha)
+    avatar_hash = Column(String(64), nullable=True)
+    avatar_mime = Column(String(100), nullable=True)
+    # Sube con cada cambio en los datos que se sirven de este usuario (ver core/data_versions.py)
+    data_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relaciones uno a uno
     patient_profile = relationship("PatientProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
@@ -0,0 +1,47 @@
+# Índice de búsqueda de usuarios (nombre, apellidos, email y centro).
+# En SQLite es una tabla virtual FTS5 sincronizada con triggers; en PostgreSQL,
+# un índice GIN de trigramas sobre la misma expresión que usa la búsqueda.
+# Base.metadata.create_all lo crea junto a la tabla users; en bases existentes
+# lo crea la migración 0005_user_search_index.
+from sqlalchemy import DDL, event
+from .user import User
+
+USERS_SEARCH_TABLE = "users_search"
+
+# Texto indexado en PostgreSQL (la búsqueda tiene que usar exactamente esta expresión)
+POSTGRES_SEARCH_EXPRESSION = (
+    "lower(coalesce(name, '') || ' ' || coalesce(surname, '') || ' ' || email || ' ' || coalesce(center, ''))"
+)
+
+SQLITE_SEARCH_DDL = [
+    # prefix='2 3': índices extra para que las búsquedas por prefijo ("an*") no recorran todo el vocabulario
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {USERS_SEARCH_TABLE} USING fts5(
+        name, surname, email, center,
+        content='users', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_search_ai AFTER INSERT ON users BEGIN
+        INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, surname, email, center)
+        VALUES (new.id, new.name, new.surname, new.email, new.center);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_search_ad AFTER DELETE ON users BEGIN
+        INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, surname, email, center)
+        VALUES ('delete', old.id, old.name, old.surname, old.email, old.center);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_search_au AFTER UPDATE OF name, surname, email, center ON users BEGIN
+        INSERT INTO {USERS_SEARCH_TABLE}({USERS_SEARCH_TABLE}, rowid, name, surname, email, center)
+        VALUES ('delete', old.id, old.name, old.surname, old.email, old.center);
+        INSERT INTO {USERS_SEARCH_TABLE}(rowid, name, surname, email, center)
+        VALUES (new.id, new.name, new.surname, new.email, new.center);
+    END""",
+]
+
+POSTGRES_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users USING gin (({POSTGRES_SEARCH_EXPRESSION}) gin_trgm_ops)",
+]
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(User.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
@@ -1,7 +1,10 @@
-from .user import UserBase, UserCreate, UserRead, PatientWithProfile, TherapistWithProfile, PatientWithTherapists, UserReadWithProfile, UserAvatarUpdate
+from .user import UserBase, UserCreate, UserRead, PatientWithProfile, PatientRosterEntry, TherapistWithProfile, PatientWithTherapists, UserReadWithProfile, UserAvatarUpdate, UserSearchResult
 from .token import Token, TokenData
-from .patient_drawing import DrawingBase, DrawingCreate, DrawingRead
-from .patient_avatar import AvatarBase, AvatarCreate, AvatarRead
+from .patient_drawing import DrawingBase, DrawingCreate, DrawingBulkItem, DrawingBulkCreate, DrawingRead, DrawingSummary
+from .patient_avatar import AvatarBase, AvatarCreate, AvatarBulkItem, AvatarBulkCreate, AvatarRead
 from .patient_profile import PatientProfileRead, PatientProfileUpdate
 from .tca_phrase import TcaPhraseRead
-from .conversation_log import ConversationLogCreate, ConversationLogRead # <-- AÑADIDO # <-- AÑADIDO
+from .conversation_log import ConversationLogCreate, ConversationLogBulkItem, ConversationLogBulkCreate, ConversationLogRead, ConversationSessionRead, ConversationTurnCreate, ConversationTurnBatch, ConversationTurnAck, ConversationSearchHit # <-- AÑADIDO # <-- AÑADIDO
+from .dashboard import PatientDashboardRead
+from .pagination import Page
+from .bulk import BulkItemResult, BulkIngestResult
@@ -0,0 +1,21 @@
+# en backend/app/schemas/bulk.py
+# Respuesta común de las subidas en lote (tablets que sincronizan lo guardado sin conexión)
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+BULK_MAX_ITEMS = 500
+
+# La genera el cliente al crear cada elemento; reenviarla no duplica el elemento
+ClientKey = Field(min_length=1, max_length=64)
+
+class BulkItemResult(BaseModel):
+    client_key: str
+    status: Literal["created", "duplicate", "error"]
+    id: Optional[int] = None  # el id guardado (también para los duplicados)
+    detail: Optional[str] = None
+
+class BulkIngestResult(BaseModel):
+    created: int
+    duplicates: int
+    errors: int
+    items: List[BulkItemResult]  # en el mismo orden que la petición
@@ -1,6 +1,8 @@
 # en backend/app/schemas/conversation_log.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import List, Literal
+from .bulk import BULK_MAX_ITEMS, ClientKey
 
 class ConversationLogBase(BaseModel):
     transcript: str
@@ -8,6 +10,12 @@ class ConversationLogBase(BaseModel):
 class ConversationLogCreate(ConversationLogBase):
     pass
 
+class ConversationLogBulkItem(ConversationLogCreate):
+    client_key: str = ClientKey
+
+class ConversationLogBulkCreate(BaseModel):
+    items: List[ConversationLogBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
 class ConversationLogRead(ConversationLogBase):
     id: int
     patient_id: int
@@ -15,3 +23,31 @@ class ConversationLogRead(ConversationLogBase):
 
     class Config:
         from_attributes = True
+
+# --- Sesiones por turnos ---
+class ConversationSessionRead(BaseModel):
+    id: int
+    patient_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ConversationTurnCreate(BaseModel):
+    seq: int = Field(ge=0)  # lo numera el cliente; reenviar el mismo seq no duplica el turno
+    speaker: Literal["ai", "patient"]
+    text: str = Field(max_length=10000)
+
+class ConversationTurnBatch(BaseModel):
+    turns: List[ConversationTurnCreate] = Field(min_length=1, max_length=100)
+
+class ConversationTurnAck(BaseModel):
+    stored: List[int]  # seq de los turnos guardados (incluidos los que ya lo estaban)
+
+# --- Búsqueda en conversaciones ---
+class ConversationSearchHit(BaseModel):
+    conversation_id: int
+    patient_id: int
+    created_at: datetime
+    snippet: str  # fragmento con los términos entre « »
+    score: float  # menor = más relevante
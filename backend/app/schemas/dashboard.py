@@ -0,0 +1,12 @@
+# en backend/app/schemas/dashboard.py
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class PatientDashboardRead(BaseModel):
+    patient_id: int
+    drawings_count: int
+    avatars_count: int
+    conversations_count: int
+    last_activity_at: Optional[datetime] = None  # último dibujo o conversación
+    latest_drawing_id: Optional[int] = None
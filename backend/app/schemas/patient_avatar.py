@@ -1,5 +1,8 @@
 # en backend/app/schemas/patient_avatar.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+from .bulk import BULK_MAX_ITEMS, ClientKey
 
 class AvatarBase(BaseModel):
     hair_style: str
@@ -12,9 +15,16 @@ class AvatarBase(BaseModel):
 class AvatarCreate(AvatarBase):
     pass
 
+class AvatarBulkItem(AvatarCreate):
+    client_key: str = ClientKey
+
+class AvatarBulkCreate(BaseModel):
+    items: List[AvatarBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
 class AvatarRead(AvatarBase):
     id: int
     patient_id: int
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True # Pydantic v2
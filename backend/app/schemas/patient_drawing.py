@@ -1,20 +1,54 @@
 # backend/app/schemas/drawing.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
+from typing import List
+from .bulk import BULK_MAX_ITEMS, ClientKey
 
 class DrawingBase(BaseModel):
     title: str | None = None
     description: str | None = None
-    # image_data como base64 o ruta/URL. Si vas a guardar archivo, cambia a `image_url: str`
-    image_data: str
 
 class DrawingCreate(DrawingBase):
-    pass
+    # data URL de canvas.toDataURL(), base64 o SVG; el servidor lo guarda en el blob store
+    image_data: str
+
+class DrawingBulkItem(DrawingCreate):
+    client_key: str = ClientKey
+
+class DrawingBulkCreate(BaseModel):
+    items: List[DrawingBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
 
 class DrawingRead(DrawingBase):
     id: int
     patient_id: int
     created_at: datetime
+    image_hash: str | None = None
+    image_size: int | None = None
+    image_mime: str | None = None
+
+    @computed_field
+    @property
+    def image_url(self) -> str:
+        return f"/api/drawings/{self.id}/image"
 
     class Config:
         from_attributes = True  # Pydantic v2: permite model_validate desde ORM
+
+class DrawingSummary(BaseModel):
+    # Versión ligera para listados: sin descripción ni datos de la imagen
+    id: int
+    title: str | None = None
+    created_at: datetime
+
+    @computed_field
+    @property
+    def thumbnail_url(self) -> str:
+        return f"/api/drawings/{self.id}/thumbnail"
+
+    @computed_field
+    @property
+    def image_url(self) -> str:
+        return f"/api/drawings/{self.id}/image"
+
+    class Config:
+        from_attributes = True
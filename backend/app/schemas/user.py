@@ -1,5 +1,5 @@
 # backend/app/schemas/user.py
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, computed_field
 from typing import Optional, List
 from .patient_profile import PatientProfileRead, PatientProfileUpdate
 from .psychologist_profile import PsychologistProfileRead
@@ -15,14 +15,39 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+AVATAR_MAX_LENGTH = 100000
+
+def avatar_url(user_id: int, avatar_hash: Optional[str]) -> Optional[str]:
+    # La URL cambia con el contenido, así el navegador puede guardarla en caché sin revalidar
+    return f"/api/users/{user_id}/avatar?v={avatar_hash[:12]}" if avatar_hash else None
+
 class UserRead(UserBase):
     id: int
-    avatar: Optional[str] = None
+    # Viene de la base de datos, validado al registrarse: volver a validarlo en cada respuesta es caro
+    email: str
+    avatar_hash: Optional[str] = None
+
+    @computed_field
+    @property
+    def avatar(self) -> Optional[str]:
+        return avatar_url(self.id, self.avatar_hash)
+
+    class Config:
+        from_attributes = True
+
+class UserSearchResult(BaseModel):
+    # Resultado del buscador de pacientes: sin avatar
+    id: int
+    name: str
+    surname: Optional[str] = None
+    email: str
+    center: Optional[str] = None
+    role: str
     class Config:
         from_attributes = True
 
 class UserAvatarUpdate(BaseModel):
-    avatar: str
+    avatar: str = Field(max_length=AVATAR_MAX_LENGTH)  # data URL (SVG o imagen en base64)
 
 # --- NUEVO ESQUEMA GENÉRICO CON PERFIL ---
 class UserReadWithProfile(UserRead):
@@ -32,8 +57,24 @@ class UserReadWithProfile(UserRead):
 class PatientWithProfile(UserReadWithProfile):
     pass # Hereda todo de UserReadWithProfile
 
+class PatientRosterEntry(UserBase):
+    # Paciente dentro del listado de un terapeuta (el avatar es solo una URL)
+    id: int
+    email: str
+    avatar_hash: Optional[str] = None
+    patient_profile: Optional[PatientProfileRead] = None
+    psychologist_profile: Optional[PsychologistProfileRead] = None
+
+    @computed_field
+    @property
+    def avatar(self) -> Optional[str]:
+        return avatar_url(self.id, self.avatar_hash)
+
+    class Config:
+        from_attributes = True
+
 class TherapistWithProfile(UserReadWithProfile):
-    patients: List[PatientWithProfile] = []
+    patients: List[PatientRosterEntry] = []
 
 class PatientWithTherapists(UserRead):
     therapists: List[TherapistWithProfile] = []
\ No newline at end of file
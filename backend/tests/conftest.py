@@ -0,0 +1,10 @@
+# en backend/tests/conftest.py
+# Cada ejecución usa su propia base de datos SQLite y su blob store en un directorio
+# temporal. Las variables se fijan antes de que algún test importe app.database.
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="holo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["BLOB_STORE_DIR"] = os.path.join(_TMP_DIR, "blobs")
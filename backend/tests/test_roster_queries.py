@@ -0,0 +1,99 @@
+# en backend/tests/test_roster_queries.py
+# El listado de pacientes de un terapeuta (y el de terapeutas de un paciente) se sirve con
+# un número fijo de consultas: si vuelve un N+1, el recuento crece con el tamaño.
+import asyncio
+from itertools import count
+
+import pytest
+from sqlalchemy import event, insert
+
+from app import crud, models, schemas
+from app.database import Base, AsyncSessionLocal, async_engine, engine
+
+_ids = count(1)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def schema():
+    Base.metadata.create_all(engine)
+    yield
+    asyncio.run(async_engine.dispose())
+
+
+def _user(role: str) -> int:
+    user_id = next(_ids)
+    with engine.begin() as conn:
+        conn.execute(insert(models.User.__table__).values(
+            id=user_id, email=f"{role}{user_id}@example.com", hashed_password="x", role=role,
+            name="Nombre", surname="Apellido", data_version=0,
+        ))
+        if role == "patient":
+            conn.execute(insert(models.PatientProfile.__table__).values(user_id=user_id, treatment="TCA"))
+        else:
+            conn.execute(insert(models.PsychologistProfile.__table__).values(user_id=user_id, specialty="Clínica"))
+    return user_id
+
+
+def _assign(therapist_id: int, patient_id: int):
+    with engine.begin() as conn:
+        conn.execute(insert(models.therapist_patients).values(therapist_id=therapist_id, patient_id=patient_id))
+
+
+def _count_statements(load) -> int:
+    # Consultas que lanza load(db) sobre una sesión nueva, incluida la serialización
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await load(db)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        asyncio.run(run())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+        asyncio.run(async_engine.dispose())  # el pool no puede pasar de un bucle de eventos a otro
+    return len(statements)
+
+
+def _therapist_with(patients: int) -> int:
+    therapist_id = _user("psychologist")
+    for _ in range(patients):
+        _assign(therapist_id, _user("patient"))
+    return therapist_id
+
+
+def _patient_with(therapists: int) -> int:
+    patient_id = _user("patient")
+    for _ in range(therapists):
+        # Cada terapeuta tiene además otros pacientes, que también se serializan
+        therapist_id = _therapist_with(2)
+        _assign(therapist_id, patient_id)
+    return patient_id
+
+
+def test_therapist_roster_statement_count_is_constant():
+    def roster(therapist_id):
+        async def load(db):
+            therapist = await crud.get_therapist_with_patients(db, therapist_id)
+            schemas.TherapistWithProfile.model_validate(therapist).model_dump()
+        return load
+
+    small = _count_statements(roster(_therapist_with(1)))
+    large = _count_statements(roster(_therapist_with(25)))
+    assert small == large
+
+
+def test_therapists_of_patient_statement_count_is_constant():
+    def therapists(patient_id):
+        async def load(db):
+            patient = await crud.get_patient_with_therapists(db, patient_id)
+            schemas.PatientWithTherapists.model_validate(patient).model_dump()
+        return load
+
+    small = _count_statements(therapists(_patient_with(1)))
+    large = _count_statements(therapists(_patient_with(10)))
+    assert small == large
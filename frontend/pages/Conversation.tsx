@@ -92,6 +92,12 @@ const Conversation = () => {
   const [voices, setVoices] = useState<SpeechSynthesisVoice[]>([]);
   const [loadedDrawingData, setLoadedDrawingData] = useState<string | null>(null);
   const recognitionRef = useRef<any>(null);
+  // Identificador de esta sesión: el servidor no repite frases dentro de ella
+  const phraseSessionId = useRef(crypto.randomUUID());
+  // Sesión de conversación en el servidor: cada frase y cada respuesta se guardan como un turno
+  const conversationId = useRef<number | null>(null);
+  const socketRef = useRef<WebSocket | null>(null);
+  const nextSeq = useRef(0);
 
   const speak = (text: string) => {
     if (!text.trim() || !selectedVoiceUri || voices.length === 0) return;
@@ -102,14 +108,46 @@ const Conversation = () => {
     utterance.voice = voice;
     window.speechSynthesis.speak(utterance);
   };
+  // El socket recibe frases fuera del render: usamos siempre la última versión de speak
+  const speakRef = useRef(speak);
+  speakRef.current = speak;
+
+  const pendingTurns = useRef<{ seq: number, speaker: string, text: string }[]>([]);
+
+  const recordTurn = (speaker: 'ai' | 'patient', text: string) => {
+    if (!text.trim()) return;
+    const turn = { seq: nextSeq.current++, speaker, text };
+    if (conversationId.current === null) {
+      // La sesión aún se está creando: se envía en cuanto exista
+      pendingTurns.current.push(turn);
+      return;
+    }
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: 'turn', ...turn }));
+    } else {
+      // Sin WebSocket: mismo turno por HTTP (el seq evita duplicados si se reintenta)
+      api.post(`/conversations/${conversationId.current}/turns`, { turns: [turn] })
+        .catch(error => console.error("Error saving turn:", error));
+    }
+  };
+
+  const showPhrase = (newPhrase: string) => {
+    setTextToSpeak(newPhrase);
+    speakRef.current(newPhrase);
+    recordTurn('ai', newPhrase);
+  };
 
   const getNewPhrase = async () => {
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: 'next_phrase' }));
+      return;
+    }
     try {
-      const phraseResponse = await api.get(`/phrases/${tcaType}`);
+      const phraseResponse = await api.get(`/phrases/${tcaType}`, { params: { session_id: phraseSessionId.current } });
       if (phraseResponse.data?.phrase) {
-        const newPhrase = phraseResponse.data.phrase;
-        setTextToSpeak(newPhrase);
-        speak(newPhrase);
+        showPhrase(phraseResponse.data.phrase);
       }
     } catch (error) { console.error("Error fetching new phrase:", error); }
   };
@@ -129,7 +167,11 @@ const Conversation = () => {
       setTimeout(() => getNewPhrase(), 2000);
     };
     recognitionRef.current.onerror = () => setIsListening(false);
-    recognitionRef.current.onresult = (event: any) => setPatientResponse(event.results[0][0].transcript);
+    recognitionRef.current.onresult = (event: any) => {
+      const response = event.results[0][0].transcript;
+      setPatientResponse(response);
+      recordTurn('patient', response);
+    };
     recognitionRef.current.start();
   };
 
@@ -140,6 +182,38 @@ const Conversation = () => {
     return () => { window.speechSynthesis.onvoiceschanged = null; };
   }, []);
 
+  useEffect(() => {
+    if (!user) return;
+    let closed = false;
+    const openSession = async () => {
+      try {
+        const response = await api.post(`/users/${user.id}/conversations/sessions`);
+        if (closed) return;
+        conversationId.current = response.data.id;
+        if (pendingTurns.current.length > 0) {
+          api.post(`/conversations/${response.data.id}/turns`, { turns: pendingTurns.current })
+            .catch(error => console.error("Error saving turns:", error));
+          pendingTurns.current = [];
+        }
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}/api/conversations/${response.data.id}/ws?tca_type=${encodeURIComponent(tcaType)}`);
+        socket.onmessage = (event) => {
+          const message = JSON.parse(event.data);
+          if (message.type === 'phrase' && message.phrase?.phrase) showPhrase(message.phrase.phrase);
+          else if (message.type === 'error') console.error("Conversation socket error:", message.detail);
+        };
+        socket.onclose = () => { if (socketRef.current === socket) socketRef.current = null; };
+        socketRef.current = socket;
+      } catch (error) { console.error("Error opening conversation session:", error); }
+    };
+    openSession();
+    return () => {
+      closed = true;
+      socketRef.current?.close();
+      socketRef.current = null;
+    };
+  }, [user]);
+
   useEffect(() => {
     if (voices.length > 0) {
       setTimeout(() => getNewPhrase(), 500);
@@ -150,9 +224,9 @@ const Conversation = () => {
     const fetchDrawing = async () => {
       if (activity === 'drawing' && user) {
         try {
-          const response = await api.get(`/drawings/users/${user.id}/drawings/`);
-          if (response.data && response.data.length > 0) {
-            setLoadedDrawingData(response.data[0].image_data);
+          const response = await api.get(`/drawings/users/${user.id}/drawings/latest`);
+          if (response.data) {
+            setLoadedDrawingData(response.data.image_url);
           }
         } catch (error) { console.error("Error fetching drawing:", error); }
       }
@@ -162,9 +236,13 @@ const Conversation = () => {
 
   const handleEndSession = async () => {
     if (!user) return;
-    const transcript = `AI: ${textToSpeak}\nPatient: ${patientResponse}`;
     try {
-      await api.post(`/users/${user.id}/conversations/`, { transcript });
+      if (conversationId.current === null) {
+        // No se pudo abrir la sesión por turnos: guardamos el diálogo de una vez, como antes
+        const transcript = `AI: ${textToSpeak}\nPatient: ${patientResponse}`;
+        await api.post(`/users/${user.id}/conversations/`, { transcript });
+      }
+      socketRef.current?.close();
       toast({ title: "Session Saved", description: "Your conversation has been saved." });
       navigate('/patient/dashboard');
     } catch (error) { console.error("Failed to save session:", error); toast({ title: "Error", description: "Could not save your session.", variant: "destructive" }); }
@@ -79,11 +79,13 @@ const Drawing = () => {
   const saveAndContinue = async () => {
     const canvas = canvasRef.current;
     if (!canvas || !user) return;
-    const imageData = canvas.toDataURL();
     try {
-      await api.post(`/drawings/users/${user.id}/drawings/`, {
-        title: `Drawing - ${new Date().toLocaleString()}`,
-        image_data: imageData,
+      // Se envían los bytes de la imagen tal cual (sin base64): WebP si el navegador lo sabe codificar, si no PNG
+      const image = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, 'image/webp'));
+      if (!image) throw new Error("Could not encode the canvas");
+      await api.post(`/drawings/users/${user.id}/drawings/upload`, image, {
+        headers: { 'Content-Type': image.type },
+        params: { title: `Drawing - ${new Date().toLocaleString()}` },
       });
       toast({ title: "Drawing Saved!", description: "Your creation has been saved to your profile." });
       // Navegar al siguiente paso
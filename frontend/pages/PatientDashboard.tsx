@@ -17,14 +17,10 @@ const PatientDashboard = () => {
     const fetchData = async () => {
       if (user) {
         try {
-          const drawingsResponse = await api.get(`/drawings/users/${user.id}/drawings/`);
-          setDrawingsCount(drawingsResponse.data.length);
-        } catch (error) { console.error("Error fetching drawings:", error); }
-
-        try {
-          const avatarsResponse = await api.get(`/avatars/users/${user.id}/avatars/`);
-          setAvatarsCount(avatarsResponse.data.length);
-        } catch (error) { console.error("Error fetching avatars:", error); }
+          const response = await api.get(`/users/${user.id}/dashboard`);
+          setDrawingsCount(response.data.drawings_count);
+          setAvatarsCount(response.data.avatars_count);
+        } catch (error) { console.error("Error fetching dashboard:", error); }
       }
     };
     fetchData();
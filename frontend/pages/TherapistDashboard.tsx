@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '@/contexts/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import { Button } from '@/components/ui/button';
@@ -28,7 +28,8 @@ interface PatientData extends Patient {
 interface Drawing {
   id: number;
   title: string;
-  image_data: string;
+  thumbnail_url: string;
+  image_url: string;
   created_at: string;
 }
 
@@ -72,17 +73,35 @@ const TherapistDashboard = () => {
 
   useEffect(() => { fetchPatients(); }, [user]);
 
+  const fetchDrawings = async (patient: PatientData | null) => {
+    if (patient && user) {
+      try {
+        const response = await api.get<{ items: Drawing[] }>(`/drawings/therapists/${user.id}/patients/${patient.id}/drawings/summary`);
+        setPatientDrawings(response.data.items);
+      } catch (error) { setPatientDrawings([]); }
+    } else { setPatientDrawings([]); }
+  };
+
+  useEffect(() => { fetchDrawings(selectedPatient); }, [selectedPatient, user]);
+
+  // El feed de eventos se abre una sola vez; el paciente seleccionado se lee de la ref
+  const selectedPatientRef = useRef<PatientData | null>(null);
+  selectedPatientRef.current = selectedPatient;
+
   useEffect(() => {
-    const fetchDrawings = async () => {
-      if (selectedPatient && user) {
-        try {
-          const response = await api.get<Drawing[]>(`/drawings/therapists/${user.id}/patients/${selectedPatient.id}/drawings`);
-          setPatientDrawings(response.data);
-        } catch (error) { setPatientDrawings([]); }
-      } else { setPatientDrawings([]); }
+    if (!user || user.role !== 'psychologist') return;
+    // Actividad de los pacientes en tiempo real (EventSource vuelve a conectar solo)
+    const source = new EventSource(`/api/users/therapists/${user.id}/events`);
+    const refresh = (event: MessageEvent) => {
+      const data = JSON.parse(event.data);
+      fetchPatients();
+      const current = selectedPatientRef.current;
+      if (current && (data.type === 'resync' || String(data.patient_id) === String(current.id))) fetchDrawings(current);
     };
-    fetchDrawings();
-  }, [selectedPatient, user]);
+    ['drawing.created', 'avatar.created', 'conversation.created', 'conversation.updated', 'profile.updated', 'resync']
+      .forEach((type) => source.addEventListener(type, refresh));
+    return () => source.close();
+  }, [user]);
 
   const handleSearchChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     const query = e.target.value;
@@ -244,7 +263,7 @@ const TherapistDashboard = () => {
                     <div><label className="text-sm text-gray-400">Type of Eating Disorder</label><p className="text-white">{selectedPatient.patient_profile?.treatment || 'N/A'}</p></div>
                   </TabsContent>
                   <TabsContent value="drawings" className="mt-4">
-                    {patientDrawings.length > 0 ? (<div className="grid grid-cols-2 md:grid-cols-3 gap-4">{patientDrawings.map(drawing => (<div key={drawing.id} className="border border-gray-700 rounded-lg p-2"><img src={drawing.image_data} alt={drawing.title || 'Patient drawing'} className="rounded-md w-full h-auto" /><p className="text-xs text-gray-400 mt-2">{new Date(drawing.created_at).toLocaleString()}</p></div>))}</div>) : (<div className="text-center py-8"><Palette className="w-12 h-12 text-gray-500 mx-auto mb-4"/><h3 className="font-medium text-white">No Drawings Found</h3><p className="text-sm text-gray-400">This patient has not created any drawings yet.</p></div>)}
+                    {patientDrawings.length > 0 ? (<div className="grid grid-cols-2 md:grid-cols-3 gap-4">{patientDrawings.map(drawing => (<div key={drawing.id} className="border border-gray-700 rounded-lg p-2"><a href={drawing.image_url} target="_blank" rel="noreferrer"><img src={drawing.thumbnail_url} alt={drawing.title || 'Patient drawing'} loading="lazy" className="rounded-md w-full h-auto" /></a><p className="text-xs text-gray-400 mt-2">{new Date(drawing.created_at).toLocaleString()}</p></div>))}</div>) : (<div className="text-center py-8"><Palette className="w-12 h-12 text-gray-500 mx-auto mb-4"/><h3 className="font-medium text-white">No Drawings Found</h3><p className="text-sm text-gray-400">This patient has not created any drawings yet.</p></div>)}
                   </TabsContent>
                   <TabsContent value="notes" className="mt-4">
                     <h4 className="font-medium text-white mb-2">Therapeutic Notes</h4>
@@ -9,6 +9,7 @@ export default defineConfig({
       '/api': {
         target: 'http://127.0.0.1:5000',
         changeOrigin: true,
+        ws: true, // WebSocket de las sesiones de conversación
       }
     }
   },